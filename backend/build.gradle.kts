@@ -65,6 +65,11 @@ tasks.withType<Test> {
     useJUnitPlatform()
 }
 
+// Old sheet_db.json backup copies are not resources (backups now live in scripts/.state/backups)
+tasks.processResources {
+    exclude("data/*.backup.*")
+}
+
 // Detekt Configuration
 detekt {
     config.setFrom(files("${rootProject.projectDir}/detekt.yml"))
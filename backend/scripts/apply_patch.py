@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Apply or revert sheet patches (see sheet_patch.py) on sheet_db.json.
+
+Patches are applied in the order given (reverted in reverse order). Every cell
+is checked against the value the patch recorded; if any cell conflicts, nothing
+is written unless --skip-conflicts is passed, which applies the rest and leaves
+the conflicting cells alone. Cells already at the patched value are skipped,
+so applying a patch twice is harmless.
+
+Only the rows a patch touches are parsed and rewritten; the rest of the file is
+copied through byte for byte (sheet_stream.splice).
+
+USAGE:
+    python apply_patch.py run1.patch.jsonl run2.patch.jsonl
+    python apply_patch.py --revert run2.patch.jsonl
+    python apply_patch.py --dry-run --sheet path/to/sheet_db.json run1.patch.jsonl
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import sheet_patch
+import sheet_stream
+
+DATA_DIR = Path(__file__).parent.parent / "src" / "main" / "resources" / "data"
+
+# Conflicts printed before the rest are summarised
+MAX_CONFLICTS_SHOWN = 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply or revert sheet patches with conflict checks")
+    parser.add_argument("patches", nargs="+", type=Path, help="Patch files, in the order they were made")
+    parser.add_argument("--sheet", type=Path, default=DATA_DIR / "sheet_db.json", help="Sheet to patch")
+    parser.add_argument("--revert", action="store_true", help="Undo the patches instead of applying them")
+    parser.add_argument("--skip-conflicts", action="store_true",
+                        help="Apply the non-conflicting cells instead of refusing the whole patch set")
+    parser.add_argument("--dry-run", action="store_true", help="Check for conflicts without writing")
+    args = parser.parse_args()
+
+    if not args.sheet.exists():
+        print(f"ERROR: Data file not found: {args.sheet}")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    patches = []
+    for path in args.patches:
+        try:
+            patches.append(sheet_patch.Patch.read(path))
+        except (OSError, ValueError) as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+        patch = patches[-1]
+        base = patch.header.get("base")
+        note = f" (made for {base})" if base and Path(base) != args.sheet.resolve() else ""
+        print(f"{path}: {len(patch.changes):,} changes in {len(patch.rows()):,} rows{note}")
+
+    fingerprint = sheet_stream.fingerprint(args.sheet)
+    rows = sorted({row_idx for patch in patches for row_idx in patch.rows()})
+    current = sheet_stream.read_rows(args.sheet, rows)
+    result = sheet_patch.plan(current, patches, revert=args.revert)
+
+    action = "Reverted" if args.revert else "Applied"
+    print(f"\n{action}: {result.applied:,} cells in {len(result.rows):,} rows")
+    print(f"Already done: {result.already:,} cells")
+    if result.conflicts:
+        print(f"Conflicts: {len(result.conflicts):,} cells")
+        for conflict in result.conflicts[:MAX_CONFLICTS_SHOWN]:
+            print(f"  {conflict}")
+        if len(result.conflicts) > MAX_CONFLICTS_SHOWN:
+            print(f"  ... and {len(result.conflicts) - MAX_CONFLICTS_SHOWN:,} more")
+
+    if args.dry_run:
+        print("\nDRY RUN - nothing written")
+        sys.exit(1 if result.conflicts else 0)
+    if result.conflicts and not args.skip_conflicts:
+        print(f"\nERROR: not writing {args.sheet}; resolve the conflicts or pass --skip-conflicts")
+        sys.exit(1)
+    if not result.rows:
+        print("\nNothing to write")
+        return
+
+    try:
+        sheet_stream.splice(args.sheet, result.rows, fingerprint)
+    except sheet_stream.SheetChangedError:
+        print(f"ERROR: {args.sheet} changed while the patches were checked; run again")
+        sys.exit(1)
+    print(f"\nWrote {args.sheet} in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+"""
+Content-addressed, compressed backups of sheet_db.json.
+
+A backup is a snapshot: the list of chunks the file was cut into, with its
+size, SHA-256 and fingerprint (size, mtime). Chunks are compressed (gzip or
+lzma) and stored under the SHA-256 of their content, so a chunk shared by
+several snapshots is stored once:
+
+    .state/backups/
+        chunks/3f/3fa4...e1.gz
+        snapshots/20260501_120000_3fa4b2c19d07.json
+
+Chunk boundaries follow the content, not byte offsets: the file is cut at row
+starts ("\\n    [\\n" in the json.dump(indent=2) layout) whose first bytes hash
+to a chosen remainder, with at least MIN_CHUNK and at most MAX_CHUNK bytes per
+chunk. Editing a cell therefore changes one chunk, and the chunks after it
+still deduplicate even though their offsets moved. A sheet in another layout
+is cut every MAX_CHUNK bytes, which is still correct, just deduplicates less.
+
+What a backup costs:
+
+    - nothing when the file's fingerprint matches the newest snapshot of it
+    - otherwise one read and hash pass, plus compressing and writing the
+      chunks that are not stored yet
+    - no new snapshot when the content matches the newest snapshot
+
+Retention (`prune`) keeps the newest `keep_last` snapshots of each file and
+the newest snapshot of each of its last `keep_daily` days, then deletes the
+chunks no snapshot uses any more. The store lives in .state/, outside the
+resources tree, so backups are never packaged with the backend.
+"""
+
+import gzip
+import hashlib
+import json
+import lzma
+import mmap
+import os
+import tempfile
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import sheet_stream
+from checkpoint import DEFAULT_STATE_DIR, atomic_write_json
+
+DEFAULT_STORE_DIR = DEFAULT_STATE_DIR / "backups"
+
+KEEP_LAST = 10
+KEEP_DAILY = 7
+
+ROW_START = b"\n    [\n"
+MIN_CHUNK = 64 * 1024
+MAX_CHUNK = 4 * 1024 * 1024
+# A row start ends a chunk when the hash of its first HASH_WINDOW bytes is 0 mod CUT_EVERY_ROWS
+CUT_EVERY_ROWS = 512
+HASH_WINDOW = 64
+# Unreferenced chunks younger than this may belong to a backup still being written
+GC_GRACE_SECONDS = 3600
+
+COMPRESSION = {
+    "gzip": (".gz", lambda data: gzip.compress(data, compresslevel=6), gzip.decompress),
+    "lzma": (".xz", lambda data: lzma.compress(data, preset=6), lzma.decompress),
+}
+
+
+class Snapshot:
+    """One backup of one file, as stored in snapshots/<id>.json."""
+
+    def __init__(self, data: Dict):
+        self.id: str = data["id"]
+        self.source: str = data["source"]
+        self.created: float = data["created"]
+        self.size: int = data["size"]
+        self.sha256: str = data["sha256"]
+        self.fingerprint: Tuple[int, int] = tuple(data["fingerprint"])
+        self.label: str = data.get("label", "")
+        # [(chunk digest, length)]
+        self.chunks: List[Tuple[str, int]] = [tuple(chunk) for chunk in data["chunks"]]
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "source": self.source,
+            "created": self.created,
+            "size": self.size,
+            "sha256": self.sha256,
+            "fingerprint": list(self.fingerprint),
+            "label": self.label,
+            "chunks": [list(chunk) for chunk in self.chunks],
+        }
+
+    @property
+    def created_at(self) -> datetime:
+        return datetime.fromtimestamp(self.created)
+
+
+class BackupResult:
+    def __init__(self, snapshot: Snapshot, created: bool, new_chunks: int = 0, written_bytes: int = 0, seconds: float = 0.0):
+        self.snapshot = snapshot
+        self.created = created
+        self.new_chunks = new_chunks
+        self.written_bytes = written_bytes
+        self.seconds = seconds
+
+    def describe(self) -> str:
+        if not self.created:
+            return f"unchanged since backup {self.snapshot.id}"
+        return (f"{self.snapshot.id} ({self.new_chunks} of {len(self.snapshot.chunks)} chunks new, "
+                f"{self.written_bytes / 1024:,.0f} KB written in {self.seconds:.1f}s)")
+
+
+def chunk_spans(data) -> Iterator[Tuple[int, int]]:
+    """(start, end) of every chunk of `data` (bytes or mmap), cut as described in the module docstring."""
+    size = len(data)
+    start = 0
+    while start < size:
+        end = min(start + MAX_CHUNK, size)
+        pos = data.find(ROW_START, start + MIN_CHUNK, end)
+        while pos != -1:
+            window = data[pos + len(ROW_START):pos + len(ROW_START) + HASH_WINDOW]
+            if zlib.crc32(window) % CUT_EVERY_ROWS == 0:
+                end = pos + 1
+                break
+            pos = data.find(ROW_START, pos + 1, end)
+        yield start, end
+        start = end
+
+
+def _write_bytes(path: Path, data: bytes) -> None:
+    """Write to a temp file next to `path`, then rename it over `path`."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+class BackupStore:
+    def __init__(self, root: Path = DEFAULT_STORE_DIR, compression: str = "gzip"):
+        if compression not in COMPRESSION:
+            raise ValueError(f"unknown compression {compression!r} (use one of {', '.join(COMPRESSION)})")
+        self.root = Path(root)
+        self.compression = compression
+        self.chunk_dir = self.root / "chunks"
+        self.snapshot_dir = self.root / "snapshots"
+
+    # --- chunks ---
+
+    def _chunk_path(self, digest: str, suffix: str) -> Path:
+        return self.chunk_dir / digest[:2] / f"{digest}{suffix}"
+
+    def _find_chunk(self, digest: str) -> Optional[Path]:
+        for suffix, _, _ in COMPRESSION.values():
+            path = self._chunk_path(digest, suffix)
+            if path.exists():
+                return path
+        return None
+
+    def _put_chunk(self, digest: str, data) -> int:
+        """Store a chunk unless it is already there; returns the bytes written."""
+        if self._find_chunk(digest) is not None:
+            return 0
+        suffix, compress, _ = COMPRESSION[self.compression]
+        packed = compress(bytes(data))
+        _write_bytes(self._chunk_path(digest, suffix), packed)
+        return len(packed)
+
+    def read_chunk(self, digest: str) -> bytes:
+        """
+        Raises:
+            ValueError: the chunk is missing or does not match its digest
+        """
+        path = self._find_chunk(digest)
+        if path is None:
+            raise ValueError(f"backup chunk {digest} is missing from {self.chunk_dir}")
+        decompress = next(d for suffix, _, d in COMPRESSION.values() if path.name.endswith(suffix))
+        data = decompress(path.read_bytes())
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"backup chunk {path} is corrupt")
+        return data
+
+    # --- snapshots ---
+
+    def snapshots(self, source: Optional[Path] = None) -> List[Snapshot]:
+        """Snapshots, oldest first; only those of `source` if given."""
+        if not self.snapshot_dir.exists():
+            return []
+        wanted = str(Path(source).resolve()) if source is not None else None
+        found = []
+        for path in self.snapshot_dir.glob("*.json"):
+            snapshot = Snapshot(json.loads(path.read_text(encoding="utf-8")))
+            if wanted is None or snapshot.source == wanted:
+                found.append(snapshot)
+        return sorted(found, key=lambda s: (s.created, s.id))
+
+    def find(self, ref: str = "latest", source: Optional[Path] = None) -> Snapshot:
+        """
+        The snapshot whose id starts with `ref`, or the newest one for "latest".
+
+        Raises:
+            ValueError: no snapshot, or more than one, matches
+        """
+        snapshots = self.snapshots(source)
+        if ref == "latest":
+            if not snapshots:
+                raise ValueError(f"no backups in {self.root}" + (f" for {source}" if source else ""))
+            return snapshots[-1]
+        matches = [s for s in snapshots if s.id.startswith(ref)]
+        if len(matches) != 1:
+            raise ValueError(f"{'no' if not matches else 'more than one'} backup matches {ref!r}")
+        return matches[0]
+
+    def backup(
+        self, path: Path, label: str = "", source: Optional[Path] = None, created: Optional[float] = None
+    ) -> BackupResult:
+        """
+        Back up `path`, storing only the chunks the store does not have yet.
+
+        Args:
+            source: File the snapshot is filed under (default: `path`), e.g. the
+                sheet an old copy of it was taken from
+            created: Snapshot time (default: now)
+        """
+        started = time.perf_counter()
+        path = Path(path)
+        source_path = Path(source) if source is not None else path
+        fingerprint = sheet_stream.fingerprint(path)
+        # Compared with the snapshot the new one would follow
+        previous = [s for s in self.snapshots(source_path) if created is None or s.created <= created]
+        latest = previous[-1] if previous else None
+        if latest is not None and latest.fingerprint == fingerprint:
+            return BackupResult(latest, created=False)
+
+        file_hash = hashlib.sha256()
+        chunks: List[Tuple[str, int]] = []
+        new_chunks = written = 0
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if fingerprint[0] else b""
+            try:
+                view = memoryview(data)
+                for start, end in chunk_spans(data):
+                    piece = view[start:end]
+                    file_hash.update(piece)
+                    digest = hashlib.sha256(piece).hexdigest()
+                    chunks.append((digest, end - start))
+                    stored = self._put_chunk(digest, piece)
+                    new_chunks += stored > 0
+                    written += stored
+                    piece.release()
+                view.release()
+            finally:
+                if isinstance(data, mmap.mmap):
+                    data.close()
+
+        sha256 = file_hash.hexdigest()
+        if latest is not None and latest.sha256 == sha256:
+            return BackupResult(latest, created=False)
+        created = time.time() if created is None else created
+        snapshot = Snapshot({
+            "id": f"{datetime.fromtimestamp(created).strftime('%Y%m%d_%H%M%S')}_{sha256[:12]}",
+            "source": str(source_path.resolve()),
+            "created": created,
+            "size": fingerprint[0],
+            "sha256": sha256,
+            "fingerprint": fingerprint,
+            "label": label,
+            "chunks": chunks,
+        })
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        atomic_write_json(self.snapshot_dir / f"{snapshot.id}.json", snapshot.to_dict())
+        return BackupResult(snapshot, True, new_chunks, written, time.perf_counter() - started)
+
+    def restore(self, snapshot: Snapshot, target: Path) -> None:
+        """
+        Rebuild `snapshot` into `target`, through a temp file that replaces it
+        only once every chunk and the whole file checked out.
+
+        Raises:
+            ValueError: a chunk is missing or corrupt
+        """
+        target = Path(target)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix=f".{target.name}.", suffix=".tmp", dir=str(target.parent))
+        try:
+            file_hash = hashlib.sha256()
+            with os.fdopen(fd, "wb") as out:
+                for digest, _ in snapshot.chunks:
+                    data = self.read_chunk(digest)
+                    file_hash.update(data)
+                    out.write(data)
+                out.flush()
+                os.fsync(out.fileno())
+            if file_hash.hexdigest() != snapshot.sha256:
+                raise ValueError(f"backup {snapshot.id} does not rebuild to its recorded SHA-256")
+            if target.exists():
+                os.chmod(tmp_name, target.stat().st_mode & 0o777)
+            os.replace(tmp_name, target)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+
+    # --- retention ---
+
+    def prune(self, keep_last: int = KEEP_LAST, keep_daily: int = KEEP_DAILY, dry_run: bool = False) -> Tuple[List[Snapshot], int]:
+        """
+        Apply the retention policy to every file's snapshots.
+
+        Returns:
+            (removed snapshots, chunk files deleted)
+        """
+        by_source: Dict[str, List[Snapshot]] = {}
+        for snapshot in self.snapshots():
+            by_source.setdefault(snapshot.source, []).append(snapshot)
+
+        removed = []
+        for snapshots in by_source.values():
+            newest_first = snapshots[::-1]
+            keep = {s.id for s in newest_first[:keep_last]}
+            days: Set[str] = set()
+            for snapshot in newest_first:
+                day = snapshot.created_at.strftime("%Y-%m-%d")
+                if day not in days and len(days) < keep_daily:
+                    days.add(day)
+                    keep.add(snapshot.id)
+            removed.extend(s for s in snapshots if s.id not in keep)
+        if dry_run or not removed:
+            return removed, 0
+
+        for snapshot in removed:
+            (self.snapshot_dir / f"{snapshot.id}.json").unlink(missing_ok=True)
+        return removed, self.collect_garbage()
+
+    def collect_garbage(self) -> int:
+        """Delete chunk files no snapshot refers to; returns how many were deleted."""
+        used = {digest for snapshot in self.snapshots() for digest, _ in snapshot.chunks}
+        cutoff = time.time() - GC_GRACE_SECONDS
+        deleted = 0
+        for path in self.chunk_dir.glob("*/*"):
+            digest = path.name.split(".", 1)[0]
+            if digest not in used and path.stat().st_mtime < cutoff:
+                path.unlink()
+                deleted += 1
+        return deleted
+
+    def stored_bytes(self) -> int:
+        return sum(path.stat().st_size for path in self.chunk_dir.glob("*/*")) if self.chunk_dir.exists() else 0
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Manage the sheet_db.json backups the translation scripts take (see backup_store.py).
+
+Commands:
+
+    list            snapshots, newest last, and the space the store uses
+    create          back up a file now
+    restore [ID]    rebuild a snapshot (default: the newest one of --sheet) over
+                    --sheet, or into --to; the current file is backed up first,
+                    so a restore can itself be undone
+    prune           apply the retention policy and delete unused chunks
+    import-legacy   move the old sheet_db.json.backup.<timestamp> copies from
+                    the data directory into the store
+
+USAGE:
+    python backups.py list
+    python backups.py restore
+    python backups.py restore 20260501_1200 --to /tmp/sheet_db.json
+    python backups.py prune --keep-last 5 --keep-daily 14
+    python backups.py import-legacy --delete
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+import backup_store
+
+DATA_DIR = Path(__file__).parent.parent / "src" / "main" / "resources" / "data"
+
+
+def list_snapshots(store: backup_store.BackupStore) -> None:
+    snapshots = store.snapshots()
+    if not snapshots:
+        print(f"No backups in {store.root}")
+        return
+    print(f"{'id':<29} {'created':<19} {'size':>10} {'chunks':>7}  label / source")
+    for snapshot in snapshots:
+        print(f"{snapshot.id:<29} {snapshot.created_at:%Y-%m-%d %H:%M:%S} {snapshot.size / 1024 / 1024:>8.1f}MB "
+              f"{len(snapshot.chunks):>7}  {snapshot.label or '-'}  {snapshot.source}")
+    logical = sum(snapshot.size for snapshot in snapshots)
+    print(f"\n{len(snapshots)} snapshots of {logical / 1024 / 1024:,.1f} MB "
+          f"stored in {store.stored_bytes() / 1024 / 1024:,.1f} MB ({store.root})")
+
+
+def restore(store: backup_store.BackupStore, args: argparse.Namespace) -> None:
+    target = args.to or args.sheet
+    snapshot = store.find(args.id, None if args.id != "latest" else args.sheet)
+    print(f"Backup {snapshot.id}: {snapshot.size:,} bytes from {snapshot.created_at:%Y-%m-%d %H:%M:%S} "
+          f"({snapshot.source})")
+    if args.dry_run:
+        for digest, _ in snapshot.chunks:
+            store.read_chunk(digest)
+        print(f"DRY RUN - every chunk checked out; {target} left alone")
+        return
+    if target.exists():
+        current = store.backup(target, label="before restore")
+        print(f"Current {target.name} backed up: {current.describe()}")
+    store.restore(snapshot, target)
+    print(f"Restored {target}")
+
+
+def prune(store: backup_store.BackupStore, args: argparse.Namespace) -> None:
+    removed, deleted = store.prune(args.keep_last, args.keep_daily, dry_run=args.dry_run)
+    for snapshot in removed:
+        print(f"{'Would remove' if args.dry_run else 'Removed'} {snapshot.id}")
+    if not args.dry_run:
+        print(f"{len(removed)} snapshots removed, {deleted} unused chunks deleted")
+
+
+def import_legacy(store: backup_store.BackupStore, args: argparse.Namespace) -> None:
+    copies = sorted(args.sheet.parent.glob(f"{args.sheet.name}.backup.*"), key=lambda p: p.stat().st_mtime)
+    if not copies:
+        print(f"No {args.sheet.name}.backup.* copies in {args.sheet.parent}")
+        return
+    for path in copies:
+        # Filed under the sheet with the copy's own time, so retention treats it by age
+        result = store.backup(path, label=f"imported {path.name}", source=args.sheet, created=path.stat().st_mtime)
+        print(f"{path.name}: {result.describe()}")
+        if args.delete:
+            os.unlink(path)
+    if args.delete:
+        print(f"\nDeleted {len(copies)} legacy copies from {args.sheet.parent}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List, restore and prune sheet_db.json backups")
+    parser.add_argument("--store", type=Path, default=backup_store.DEFAULT_STORE_DIR,
+                        help="Backup store directory (default: .state/backups)")
+    parser.add_argument("--sheet", type=Path, default=DATA_DIR / "sheet_db.json", help="The backed-up sheet")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="List snapshots")
+    create = commands.add_parser("create", help="Back up --sheet now")
+    create.add_argument("--compression", choices=sorted(backup_store.COMPRESSION), default="gzip",
+                        help="Compression for new chunks (default: gzip)")
+    restore_cmd = commands.add_parser("restore", help="Restore a snapshot")
+    restore_cmd.add_argument("id", nargs="?", default="latest", help="Snapshot id or unique prefix (default: latest)")
+    restore_cmd.add_argument("--to", type=Path, help="Write here instead of over --sheet")
+    restore_cmd.add_argument("--dry-run", action="store_true", help="Check the snapshot's chunks without writing")
+    prune_cmd = commands.add_parser("prune", help="Apply the retention policy")
+    prune_cmd.add_argument("--keep-last", type=int, default=backup_store.KEEP_LAST,
+                           help=f"Snapshots to keep per file (default: {backup_store.KEEP_LAST})")
+    prune_cmd.add_argument("--keep-daily", type=int, default=backup_store.KEEP_DAILY,
+                           help=f"Days to keep the newest snapshot of (default: {backup_store.KEEP_DAILY})")
+    prune_cmd.add_argument("--dry-run", action="store_true", help="Show what would be removed")
+    legacy = commands.add_parser("import-legacy", help="Import sheet_db.json.backup.* copies")
+    legacy.add_argument("--delete", action="store_true", help="Delete each copy once it is in the store")
+    args = parser.parse_args()
+
+    store = backup_store.BackupStore(args.store, getattr(args, "compression", "gzip"))
+    try:
+        if args.command == "list":
+            list_snapshots(store)
+        elif args.command == "create":
+            if not args.sheet.exists():
+                print(f"ERROR: Data file not found: {args.sheet}")
+                sys.exit(1)
+            print(f"Backup: {store.backup(args.sheet, label='manual').describe()}")
+        elif args.command == "restore":
+            restore(store, args)
+        elif args.command == "prune":
+            prune(store, args)
+        else:
+            import_legacy(store, args)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
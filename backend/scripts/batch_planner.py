@@ -0,0 +1,131 @@
+"""
+Length-aware, adaptive batching for DeepL and Claude requests.
+
+Fixed batch counts ignore text length: 30 short labels waste round trips, and
+20 long product descriptions can run past Claude's max_tokens and cut off the
+numbered output. A BatchPlanner instead packs texts from a queue until the
+first of three budgets is reached:
+
+    - texts per request (adaptive, never above the engine maximum)
+    - source characters per request (request size limit)
+    - estimated output tokens (Claude's max_tokens, with headroom)
+
+The text budget grows after each clean response and is halved after a
+truncated response or an error, so a run settles on the largest batches the
+engine accepts. The output-token estimate is calibrated from the `usage`
+Claude reports.
+"""
+
+import threading
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple, Union
+
+# (rows, text) queue items: row indices as built by source_dedup.group_by_source,
+# or {col_idx: row indices} for a multi-language Claude item
+Group = Tuple[Union[List[int], Dict[int, List[int]]], str]
+
+
+class EngineLimits:
+    def __init__(
+        self,
+        max_texts: int,
+        max_chars: int,
+        max_output_tokens: Optional[int] = None,
+        tokens_per_char: float = 1.5,
+        tokens_per_line: int = 4,
+        headroom: float = 0.8,
+    ):
+        self.max_texts = max_texts
+        self.max_chars = max_chars
+        self.max_output_tokens = max_output_tokens
+        self.tokens_per_char = tokens_per_char
+        self.tokens_per_line = tokens_per_line
+        self.headroom = headroom
+
+
+# DeepL: at most 50 texts and 128 KiB per request; the JSON body escapes Hangul as \uXXXX (6 bytes)
+DEEPL_LIMITS = EngineLimits(max_texts=50, max_chars=15_000)
+
+# Claude: a JSON object of {id: {text, targets}} in, {id: {language: translation}} out;
+# the response is capped by the request's max_tokens
+CLAUDE_MAX_TOKENS = 4096
+CLAUDE_LIMITS = EngineLimits(max_texts=60, max_chars=20_000, max_output_tokens=CLAUDE_MAX_TOKENS)
+
+
+class BatchPlanner:
+    """Cuts batches off a queue of groups; adapts the text budget to how responses went. Thread-safe."""
+
+    GROWTH = 1.25
+
+    def __init__(
+        self,
+        limits: EngineLimits,
+        initial_texts: Optional[int] = None,
+        outputs_per_item: Optional[Callable[[Group], int]] = None,
+    ):
+        """`outputs_per_item` gives how many translations one queue item asks for (default 1)."""
+        self.limits = limits
+        self.outputs_per_item = outputs_per_item or (lambda item: 1)
+        self.max_texts = max(1, min(limits.max_texts, initial_texts or limits.max_texts))
+        self._target = float(self.max_texts)
+        self._tokens_per_char = limits.tokens_per_char
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.shrinks = 0
+
+    @property
+    def target_texts(self) -> int:
+        return max(1, int(self._target))
+
+    def estimate_tokens(self, text: str, outputs: int = 1) -> float:
+        return (len(text) * self._tokens_per_char + self.limits.tokens_per_line) * outputs
+
+    def next_batch(self, queue: Deque[Group]) -> List[Group]:
+        """Pop groups off the front of `queue` until a budget is full. A single oversized text goes alone."""
+        limits = self.limits
+        with self._lock:
+            max_texts = self.target_texts
+            token_budget = limits.max_output_tokens * limits.headroom if limits.max_output_tokens else None
+            batch: List[Group] = []
+            chars = 0
+            tokens = 0.0
+            while queue and len(batch) < max_texts:
+                text = queue[0][1]
+                text_tokens = self.estimate_tokens(text, self.outputs_per_item(queue[0]))
+                if batch and (
+                    chars + len(text) > limits.max_chars
+                    or (token_budget is not None and tokens + text_tokens > token_budget)
+                ):
+                    break
+                batch.append(queue.popleft())
+                chars += len(text)
+                tokens += text_tokens
+            if batch:
+                self.batches += 1
+            return batch
+
+    def succeeded(self, batch: Sequence[Group], output_tokens: Optional[int] = None) -> None:
+        """A batch came back complete: grow the text budget and refine the token estimate."""
+        with self._lock:
+            self._target = min(float(self.max_texts), self._target * self.GROWTH + 1)
+            outputs = [self.outputs_per_item(item) for item in batch]
+            chars = sum(len(item[1]) * n for item, n in zip(batch, outputs))
+            if output_tokens and chars:
+                observed = max(0.0, output_tokens - self.limits.tokens_per_line * sum(outputs)) / chars
+                # Move towards what the engine reports (plus a 20% margin), never below a third of the default
+                self._tokens_per_char = max(
+                    self.limits.tokens_per_char / 3,
+                    0.7 * self._tokens_per_char + 0.3 * observed * 1.2,
+                )
+
+    def shrink(self, batch: Sequence[Group] = (), truncated: bool = False) -> None:
+        """A batch was truncated or failed: halve the text budget (below the failed batch's size)."""
+        with self._lock:
+            ceiling = len(batch) if batch else self._target
+            self._target = max(1.0, min(self._target, ceiling) / 2)
+            if truncated:
+                # The output-token estimate was too low
+                self._tokens_per_char *= 1.25
+            self.shrinks += 1
+
+    def summary(self, name: str) -> str:
+        return f"{name} batching: {self.batches} requests, {self.shrinks} shrinks, settled at {self.target_texts} texts"
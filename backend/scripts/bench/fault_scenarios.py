@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Fault-injection checks for the circuit breakers and hedging of translate_remaining.py.
+
+Each scenario starts fresh stand-in DeepL / Anthropic servers (mock_servers.py)
+with a fault pattern, runs translate_remaining.py against them on the same
+generated sheet (as run_benchmark.py does) and checks the run's metrics and
+the servers' counters:
+
+    healthy       no faults: no breaker opens and hedges stay within their cap
+    deepl-down    every DeepL request fails: DeepL's breaker opens, the rest
+                  goes to Claude without asking DeepL, and nothing is lost
+    deepl-flap    DeepL fails for the first 20 s, then recovers: the breaker
+                  opens, a probe closes it again and DeepL translates the rest
+    deepl-tail    2% of DeepL requests take 4 s longer: slow batches are
+                  hedged to Claude, and the translate phase is faster than the
+                  same run with --no-hedging (run as well)
+    claude-down   every Claude request fails: Claude's breaker opens and the
+                  DeepL rejects go to English fallback
+    resume        the run is killed once English cells are journaled and rerun
+                  with --resume: the sheet is byte-identical to an
+                  uninterrupted run's (run as well), so cells filled from an
+                  English value still in Korean are translated, not left with
+                  the English translation
+
+USAGE:
+    python bench/fault_scenarios.py
+    python bench/fault_scenarios.py --scenarios deepl-down,deepl-tail --rows 20000
+    python bench/fault_scenarios.py --keep --json faults.json
+
+The exit status is 1 if any check failed.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shlex
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+from mock_servers import Fault, MockClaudeServer, MockConfig, MockDeepLServer
+from run_benchmark import SHEET_RELATIVE, prepare_workspace, run_in_workspace, run_script
+from sheet_generator import write_sheet
+
+SCRIPT = "translate_remaining.py"
+# Short cooldowns and a fast Claude keep each scenario under a minute or two; without
+# templates every unique text is its own DeepL request, enough for a latency p95
+SCRIPT_ARGS = "--no-cache --no-templates --breaker-cooldown 5 --claude-rps 20 --claude-concurrency 4"
+
+COL_ENGLISH = 3
+DEEPL_LATENCY_MS = 80.0
+CLAUDE_LATENCY_MS = 300.0
+FOREVER = 1e9
+
+
+def counter(run: Dict, name: str) -> float:
+    return ((run.get("metrics") or {}).get("counters") or {}).get(name, 0)
+
+
+def phase(run: Dict, name: str) -> float:
+    return ((run.get("metrics") or {}).get("phases") or {}).get(name, 0.0)
+
+
+def finished(run: Dict) -> bool:
+    return run["returncode"] == 0
+
+
+def english_journaled(scripts_dir: Path) -> bool:
+    """True once the journal holds an English cell translated by DeepL or Claude."""
+    journal = scripts_dir / ".state" / f"{Path(SCRIPT).stem}.journal.jsonl"
+    if not journal.exists():
+        return False
+    with open(journal, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break
+            if entry.get("col") == COL_ENGLISH and entry.get("engine") in ("deepl", "claude"):
+                return True
+    return False
+
+
+SCENARIOS: Dict[str, Dict] = {
+    "healthy": {
+        "deepl": {},
+        "claude": {},
+        "checks": [
+            ("run finished", finished),
+            ("no breaker opened", lambda r: not counter(r, "deepl_breaker_opened") and not counter(r, "claude_breaker_opened")),
+            ("hedges within 10% of DeepL requests", lambda r: counter(r, "hedges_sent") <= max(1, 0.1 * r["deepl"]["calls"]) + 1),
+        ],
+    },
+    "deepl-down": {
+        "deepl": {"faults": [Fault(0, FOREVER)]},
+        "claude": {},
+        "checks": [
+            ("run finished", finished),
+            ("DeepL breaker opened", lambda r: counter(r, "deepl_breaker_opened") >= 1),
+            ("texts sent on without asking DeepL", lambda r: counter(r, "deepl_breaker_skipped_texts") > 0),
+            ("every cell translated by Claude", lambda r: counter(r, "cells_claude") > 0 and not counter(r, "cells_failed")),
+        ],
+    },
+    "deepl-flap": {
+        "deepl": {"faults": [Fault(0, 20)]},
+        # A slower Claude keeps the run going past the outage
+        "claude": {"latency_ms": 1500.0},
+        "checks": [
+            ("run finished", finished),
+            ("DeepL breaker opened", lambda r: counter(r, "deepl_breaker_opened") >= 1),
+            ("DeepL breaker closed after a probe", lambda r: counter(r, "deepl_breaker_closed") >= 1),
+            ("DeepL translated cells after recovering", lambda r: counter(r, "cells_deepl") > 0),
+        ],
+    },
+    "deepl-tail": {
+        "deepl": {"tail_rate": 0.02, "tail_ms": 4000.0},
+        "claude": {},
+        "baseline": "--no-hedging",
+        "checks": [
+            ("run finished", finished),
+            ("slow batches hedged", lambda r: counter(r, "hedges_sent") > 0),
+            ("some hedges answered first", lambda r: counter(r, "hedges_won") > 0),
+            ("translate phase faster than with --no-hedging",
+             lambda r: phase(r, "translate") < phase(r["baseline"], "translate")),
+        ],
+    },
+    "claude-down": {
+        "deepl": {},
+        "claude": {"faults": [Fault(0, FOREVER)]},
+        "checks": [
+            ("run finished", finished),
+            ("Claude breaker opened", lambda r: counter(r, "claude_breaker_opened") >= 1),
+            ("texts sent on without asking Claude", lambda r: counter(r, "claude_breaker_skipped_texts") > 0),
+            ("DeepL rejects went to English fallback", lambda r: counter(r, "cells_english_fallback") > 0),
+        ],
+    },
+    "resume": {
+        "deepl": {},
+        "claude": {},
+        # Hedges race DeepL against Claude, which would make the two runs differ
+        "args": "--no-hedging",
+        "interrupt": english_journaled,
+        "checks": [
+            ("first run killed", lambda r: r["interrupted"]["returncode"] != 0),
+            ("resumed run finished", finished),
+            ("journaled cells restored", lambda r: "Resumed: restored" in Path(r["log"]).read_text(encoding="utf-8")),
+            ("sheet identical to an uninterrupted run", lambda r: r["sheet"] == r["baseline"]["sheet"]),
+        ],
+    },
+}
+
+
+def run_scenario(
+    name: str, sheet: Path, workdir: Path, args: argparse.Namespace, extra_args: List[str], interrupt: bool = True,
+) -> Dict:
+    """Run the script against fresh servers with the scenario's faults (killed and resumed for `interrupt` scenarios)."""
+    scenario = SCENARIOS[name]
+    deepl_server = MockDeepLServer(
+        MockConfig(**{"latency_ms": DEEPL_LATENCY_MS, **scenario["deepl"]}),
+        passthrough_rate=args.deepl_passthrough, seed=args.seed,
+    ).start()
+    claude_server = MockClaudeServer(
+        MockConfig(**{"latency_ms": CLAUDE_LATENCY_MS, **scenario["claude"]}), seed=args.seed,
+    ).start()
+    env = dict(
+        os.environ,
+        DEEPL_API_KEY="faults",
+        DEEPL_SERVER_URL=deepl_server.url,
+        CLAUDE_API_KEY="faults",
+        CLAUDE_API_BASE_URL=claude_server.url,
+    )
+    script_args = shlex.split(SCRIPT_ARGS) + shlex.split(scenario.get("args", "")) + extra_args
+    try:
+        if interrupt and scenario.get("interrupt"):
+            prepare_workspace(sheet, workdir)
+            interrupted = run_in_workspace(SCRIPT, sheet, workdir, env, script_args, stop_when=scenario["interrupt"],
+                                           log_name="interrupted.log")
+            deepl_server.reset_clock()
+            claude_server.reset_clock()
+            run = run_in_workspace(SCRIPT, sheet, workdir, env, script_args + ["--resume"])
+            run["interrupted"] = interrupted
+        else:
+            run = run_script(SCRIPT, sheet, workdir, env, script_args)
+        run["sheet"] = hashlib.sha256((workdir / SHEET_RELATIVE).read_bytes()).hexdigest()
+    finally:
+        deepl_server.stop()
+        claude_server.stop()
+    run.update(deepl=deepl_server.stats.snapshot(), claude=claude_server.stats.snapshot())
+    return run
+
+
+def describe(run: Dict) -> str:
+    d, c = run["deepl"], run["claude"]
+    return (
+        f"{run['seconds']:.1f}s (translate {phase(run, 'translate'):.1f}s), "
+        f"DeepL {d['calls']} ok / {d['errors']} failed, Claude {c['calls']} ok / {c['errors']} failed, "
+        f"cells deepl {counter(run, 'cells_deepl'):.0f} claude {counter(run, 'cells_claude'):.0f} "
+        f"fallback {counter(run, 'cells_english_fallback'):.0f}, "
+        f"hedges {counter(run, 'hedges_won'):.0f}/{counter(run, 'hedges_sent'):.0f} won"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check translate_remaining.py's breakers and hedging against faulty stand-in servers")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated scenarios to run")
+    parser.add_argument("--rows", type=int, default=30_000,
+                        help="Rows in the generated sheet (enough DeepL requests for a p95 below a 2%% tail)")
+    parser.add_argument("--korean-share", type=float, default=0.3, help="Share of target cells still holding Korean")
+    parser.add_argument("--deepl-passthrough", type=float, default=0.05,
+                        help="Share of texts DeepL returns untranslated (sent on to Claude)")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the sheet generator and stand-in servers")
+    parser.add_argument("--json", type=Path, help="Also write the results to this JSON file")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch workspaces (logs, output sheets)")
+    args = parser.parse_args()
+
+    names = [n.strip() for n in args.scenarios.split(",") if n.strip()]
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s) {', '.join(unknown)} (choose from {', '.join(SCENARIOS)})")
+
+    root = Path(tempfile.mkdtemp(prefix="translation-faults-"))
+    sheet = root / "sheet.json"
+    write_sheet(sheet, args.rows, args.korean_share, seed=args.seed)
+    results, failed = [], 0
+    try:
+        for name in names:
+            scenario = SCENARIOS[name]
+            print(f"\n{name}")
+            run = run_scenario(name, sheet, root / name, args, [])
+            if "baseline" in scenario:
+                run["baseline"] = run_scenario(name, sheet, root / f"{name}-baseline", args, shlex.split(scenario["baseline"]))
+                print(f"  {scenario['baseline']}: {describe(run['baseline'])}")
+            elif scenario.get("interrupt"):
+                run["baseline"] = run_scenario(name, sheet, root / f"{name}-baseline", args, [], interrupt=False)
+                print(f"  uninterrupted: {describe(run['baseline'])}")
+            print(f"  {describe(run)}")
+            run["checks"] = {}
+            for label, check in scenario["checks"]:
+                ok = check(run)
+                run["checks"][label] = ok
+                failed += not ok
+                print(f"  {'PASS' if ok else 'FAIL'}  {label}")
+            if not finished(run):
+                print(f"  see {run['log']}")
+            results.append({"scenario": name, **run})
+    finally:
+        if not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+    print(f"\n{len(names)} scenarios, {failed} failed checks")
+    if args.keep:
+        print(f"Workspaces kept in {root}")
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Results written to {args.json}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+Load replay for the backend translation API (TranslationController).
+
+Sends POST /api/translate and /api/translate/batch requests to a running
+backend with a fixed number of concurrent connections, either back to back
+(closed loop) or at a target arrival rate (open loop, Poisson arrivals), and
+reports:
+
+    - throughput and p50/p95/p99/max latency per endpoint
+    - in open-loop mode, how late requests were sent (client-side queueing)
+    - results served from cache (isFromCache, by translationStrategy)
+    - errors by kind (HTTP status, timeout, connection)
+    - with --stub-claude, the Claude calls the requests caused
+
+Requests come from a JSON Lines log, one object per line:
+{"text": "...", "targetLang": "en", "pageUrl": "/shop", "sourceLang": "ko"}
+or {"text": "...", "targetLangs": ["en", "ja"]} for the batch endpoint
+(pageUrl and sourceLang are optional; lines without "text" are skipped).
+Without --log, requests are synthesised from the Korean cells of sheet_db.json.
+
+The backend reads the Claude endpoint from CLAUDE_API_BASE_URL, so it can run
+against the stand-in Claude from mock_servers.py instead of the real API:
+
+    CLAUDE_API_BASE_URL=http://127.0.0.1:8090 ./gradlew bootRun
+    python bench/load_replay.py --stub-claude 8090 --synthetic 2000
+
+USAGE:
+    python bench/load_replay.py --log requests.jsonl --concurrency 16 --rate 50
+    python bench/load_replay.py --synthetic 5000 --langs en:5,ja:3,zh-hans:2 --repeat-share 0.3
+    python bench/load_replay.py --synthetic 2000 --batch-share 0.2 --json report.json \\
+        --max-p95-ms 1500 --max-error-rate 0.01
+"""
+
+import argparse
+import http.client
+import json
+import queue
+import random
+import socket
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from mock_servers import MockClaudeServer, MockConfig
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+import sheet_stream  # noqa: E402
+from run_metrics import percentile  # noqa: E402
+from sheet_scanner import has_korean  # noqa: E402
+
+DATA_DIR = SCRIPTS_DIR.parent / "src" / "main" / "resources" / "data"
+COL_PAGE_URL = 0
+COL_KOREAN = 2
+FIRST_DATA_ROW = 2
+
+DEFAULT_LANGS = "en:4,ja:2,zh-hans:2,zh-hant:1,es:1"
+PERCENTILES = (50, 95, 99)
+# Korean cells sampled from the sheet for synthetic requests
+SAMPLE_SIZE = 20_000
+
+# (endpoint, body)
+Request = Tuple[str, dict]
+
+
+class Outcome:
+    __slots__ = ("endpoint", "latency", "delay", "error", "results")
+
+    def __init__(self, endpoint: str, latency: float, delay: float, error: Optional[str], results: List[dict]):
+        self.endpoint = endpoint
+        self.latency = latency
+        self.delay = delay
+        self.error = error
+        self.results = results
+
+
+def parse_mix(spec: str) -> List[Tuple[str, float]]:
+    """"en:4,ja:2" -> [("en", 4.0), ("ja", 2.0)]; a language without a weight counts 1."""
+    mix = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        lang, _, weight = part.partition(":")
+        mix.append((lang.strip(), float(weight) if weight else 1.0))
+    if not mix or any(weight < 0 for _, weight in mix) or not sum(weight for _, weight in mix):
+        raise ValueError(f"bad language mix: {spec!r}")
+    return mix
+
+
+def read_log(path: Path) -> Tuple[List[Request], int]:
+    """Requests in the log and the number of lines skipped."""
+    requests, skipped = [], 0
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                obj = json.loads(line)
+            except ValueError:
+                skipped += 1
+                continue
+            if not isinstance(obj, dict) or not isinstance(obj.get("text"), str):
+                skipped += 1
+                continue
+            body = {"text": obj["text"]}
+            for key in ("pageUrl", "sourceLang"):
+                if obj.get(key) is not None:
+                    body[key] = obj[key]
+            if isinstance(obj.get("targetLangs"), list):
+                body["targetLangs"] = obj["targetLangs"]
+                requests.append(("/api/translate/batch", body))
+            else:
+                body["targetLang"] = obj.get("targetLang")
+                requests.append(("/api/translate", body))
+    return requests, skipped
+
+
+def sample_sheet(path: Path, rng: random.Random) -> List[Tuple[str, str]]:
+    """Up to SAMPLE_SIZE (text, pageUrl) pairs from the sheet's Korean cells (reservoir sample)."""
+    sample: List[Tuple[str, str]] = []
+    seen = 0
+    for row_idx, row in sheet_stream.SheetReader(path).rows():
+        if row_idx < FIRST_DATA_ROW or len(row) <= COL_KOREAN:
+            continue
+        text = row[COL_KOREAN]
+        if not isinstance(text, str) or not has_korean(text):
+            continue
+        page_url = row[COL_PAGE_URL] if isinstance(row[COL_PAGE_URL], str) else ""
+        seen += 1
+        if len(sample) < SAMPLE_SIZE:
+            sample.append((text, page_url))
+        else:
+            slot = rng.randrange(seen)
+            if slot < SAMPLE_SIZE:
+                sample[slot] = (text, page_url)
+    return sample
+
+
+def synthesise(
+    texts: List[Tuple[str, str]], count: int, mix: List[Tuple[str, float]],
+    repeat_share: float, batch_share: float, rng: random.Random,
+) -> List[Request]:
+    """`count` requests: a `repeat_share` of them repeat an earlier request, the rest pick a new text."""
+    langs = [lang for lang, _ in mix]
+    weights = [weight for _, weight in mix]
+    requests: List[Request] = []
+    for _ in range(count):
+        if requests and rng.random() < repeat_share:
+            requests.append(rng.choice(requests))
+            continue
+        text, page_url = rng.choice(texts)
+        body = {"text": text, "pageUrl": page_url or None}
+        if rng.random() < batch_share:
+            body["targetLangs"] = langs
+            requests.append(("/api/translate/batch", body))
+        else:
+            body["targetLang"] = rng.choices(langs, weights)[0]
+            requests.append(("/api/translate", body))
+    return requests
+
+
+class Replayer:
+    """Worker threads, one keep-alive connection each, fed from a queue of (due time, request)."""
+
+    def __init__(self, base_url: str, concurrency: int, timeout: float):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.https = parts.scheme == "https"
+        self.prefix = parts.path.rstrip("/")
+        self.concurrency = concurrency
+        self.timeout = timeout
+
+    def _connect(self) -> http.client.HTTPConnection:
+        cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        return cls(self.host, self.port, timeout=self.timeout)
+
+    def _send(self, conn: http.client.HTTPConnection, request: Request) -> Tuple[Optional[str], List[dict]]:
+        endpoint, body = request
+        conn.request("POST", self.prefix + endpoint, json.dumps(body, ensure_ascii=False).encode("utf-8"),
+                     {"Content-Type": "application/json"})
+        response = conn.getresponse()
+        raw = response.read()
+        if response.status != 200:
+            return f"HTTP {response.status}", []
+        payload = json.loads(raw)
+        results = list(payload.values()) if endpoint.endswith("/batch") else [payload]
+        return None, [result for result in results if isinstance(result, dict)]
+
+    def _worker(self, work: "queue.Queue", outcomes: List[Outcome], lock: threading.Lock) -> None:
+        conn = self._connect()
+        while True:
+            item = work.get()
+            if item is None:
+                break
+            due, request = item
+            wait = due - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+            started = time.perf_counter()
+            try:
+                error, results = self._send(conn, request)
+            except socket.timeout:
+                error, results = "timeout", []
+            except (OSError, http.client.HTTPException) as e:
+                error, results = f"connection ({type(e).__name__})", []
+            except ValueError:
+                error, results = "bad JSON", []
+            ended = time.perf_counter()
+            if error is not None:
+                conn.close()
+                conn = self._connect()
+            with lock:
+                outcomes.append(Outcome(request[0], ended - started, max(0.0, started - due), error, results))
+        conn.close()
+
+    def run(self, requests: List[Request], rate: float, rng: random.Random) -> Tuple[List[Outcome], float]:
+        """Replay `requests`; with `rate` > 0 they are due at Poisson arrival times, otherwise at once."""
+        work: "queue.Queue" = queue.Queue()
+        outcomes: List[Outcome] = []
+        lock = threading.Lock()
+        started = time.perf_counter()
+        due = started
+        for request in requests:
+            if rate > 0:
+                due += rng.expovariate(rate)
+            work.put((due, request))
+        for _ in range(self.concurrency):
+            work.put(None)
+        threads = [
+            threading.Thread(target=self._worker, args=(work, outcomes, lock), name=f"replay-{i}", daemon=True)
+            for i in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return outcomes, time.perf_counter() - started
+
+
+def latency_stats(latencies: List[float]) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    stats = {f"p{p}_ms": round(percentile(ordered, p) * 1000, 1) for p in PERCENTILES}
+    stats["max_ms"] = round(ordered[-1] * 1000, 1) if ordered else 0.0
+    return stats
+
+
+def summarise(outcomes: List[Outcome], elapsed: float, claude_calls: Optional[int]) -> Dict:
+    endpoints: Dict[str, Dict] = {}
+    for name in sorted({o.endpoint for o in outcomes}) + ["all"]:
+        selected = [o for o in outcomes if name in ("all", o.endpoint)]
+        endpoints[name] = {
+            "requests": len(selected),
+            "errors": sum(o.error is not None for o in selected),
+            **latency_stats([o.latency for o in selected]),
+        }
+    results = [result for o in outcomes for result in o.results]
+    cached = [result for result in results if result.get("isFromCache")]
+    errors = Counter(o.error for o in outcomes if o.error is not None)
+    return {
+        "requests": len(outcomes),
+        "elapsed_seconds": round(elapsed, 3),
+        "requests_per_second": round(len(outcomes) / max(elapsed, 1e-9), 2),
+        "error_rate": round(sum(errors.values()) / max(len(outcomes), 1), 4),
+        "endpoints": endpoints,
+        "send_delay": latency_stats([o.delay for o in outcomes]),
+        "results": len(results),
+        "from_cache": len(cached),
+        "cache_hit_rate": round(len(cached) / max(len(results), 1), 4),
+        "cached_by_strategy": dict(Counter(result.get("translationStrategy") for result in cached).most_common()),
+        "strategies": dict(Counter(result.get("translationStrategy") for result in results).most_common()),
+        "errors": dict(errors.most_common()),
+        "claude_calls": claude_calls,
+    }
+
+
+def report(summary: Dict, rate: float, concurrency: int) -> str:
+    mode = f"{rate:g}/s arrivals" if rate > 0 else "closed loop"
+    lines = [
+        f"{summary['requests']:,} requests in {summary['elapsed_seconds']:.1f}s: "
+        f"{summary['requests_per_second']:,.1f} req/s ({concurrency} connections, {mode})",
+        "",
+        f"  {'endpoint':<22} {'requests':>9} {'errors':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}  (ms)",
+    ]
+    for name, stats in summary["endpoints"].items():
+        lines.append(
+            f"  {name:<22} {stats['requests']:>9,} {stats['errors']:>7,} {stats['p50_ms']:>8,.0f} "
+            f"{stats['p95_ms']:>8,.0f} {stats['p99_ms']:>8,.0f} {stats['max_ms']:>8,.0f}"
+        )
+    if rate > 0:
+        delay = summary["send_delay"]
+        lines.append(f"\n  Sent late (all connections busy): p95 {delay['p95_ms']:,.0f} ms, "
+                     f"p99 {delay['p99_ms']:,.0f} ms, max {delay['max_ms']:,.0f} ms")
+    lines.append(f"\n  Results: {summary['results']:,}, from cache {summary['from_cache']:,} "
+                 f"({summary['cache_hit_rate']:.1%})")
+    for name, label in (("cached_by_strategy", "Cached"), ("strategies", "Strategies")):
+        if summary[name]:
+            lines.append(f"  {label}: " + ", ".join(f"{k} {v:,}" for k, v in summary[name].items()))
+    if summary["errors"]:
+        lines.append("  Errors: " + ", ".join(f"{k} x{v:,}" for k, v in summary["errors"].items()))
+    if summary["claude_calls"] is not None:
+        lines.append(f"  Claude stub calls: {summary['claude_calls']:,} "
+                     f"({summary['claude_calls'] / max(summary['requests'], 1):.2f} per request)")
+    return "\n".join(lines)
+
+
+def check_limits(summary: Dict, args: argparse.Namespace) -> List[str]:
+    """Failed --max-* limits, as messages."""
+    overall = summary["endpoints"]["all"]
+    failures = []
+    for limit, key in ((args.max_p95_ms, "p95_ms"), (args.max_p99_ms, "p99_ms")):
+        if limit is not None and overall[key] > limit:
+            failures.append(f"{key[:3]} {overall[key]:,.0f} ms > {limit:,.0f} ms")
+    if args.max_error_rate is not None and summary["error_rate"] > args.max_error_rate:
+        failures.append(f"error rate {summary['error_rate']:.2%} > {args.max_error_rate:.2%}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay translation requests against a running backend")
+    parser.add_argument("--url", default="http://localhost:8080", help="Backend base URL (default: %(default)s)")
+    parser.add_argument("--log", type=Path, help="JSON Lines request log to replay")
+    parser.add_argument("--synthetic", type=int, default=1000, help="Requests to synthesise without --log (default: 1000)")
+    parser.add_argument("--sheet", type=Path, default=DATA_DIR / "sheet_db.json", help="Sheet to take synthetic texts from")
+    parser.add_argument("--requests", type=int, help="Send this many requests, cycling through the log")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent connections (default: 8)")
+    parser.add_argument("--rate", type=float, default=0.0, help="Arrivals per second (default: 0, back to back)")
+    parser.add_argument("--langs", default=DEFAULT_LANGS,
+                        help="Target language mix as lang:weight (default: %(default)s); also fills log lines without targetLang")
+    parser.add_argument("--repeat-share", type=float, default=0.2, help="Synthetic requests repeating an earlier one (default: 0.2)")
+    parser.add_argument("--batch-share", type=float, default=0.0, help="Synthetic requests sent to /batch for every --langs language")
+    parser.add_argument("--warmup", type=int, default=0, help="Requests sent first and left out of the report")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds (default: 120)")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for synthetic requests and arrival times")
+    parser.add_argument("--stub-claude", type=int, metavar="PORT", help="Serve the stand-in Claude on this port during the run")
+    parser.add_argument("--claude-latency-ms", type=float, default=800.0, help="Stand-in Claude latency (default: 800)")
+    parser.add_argument("--claude-error-rate", type=float, default=0.0, help="Stand-in Claude HTTP 503 share")
+    parser.add_argument("--json", type=Path, help="Write the report as JSON")
+    parser.add_argument("--max-p95-ms", type=float, help="Exit with status 1 if overall p95 latency is higher")
+    parser.add_argument("--max-p99-ms", type=float, help="Exit with status 1 if overall p99 latency is higher")
+    parser.add_argument("--max-error-rate", type=float, help="Exit with status 1 if the error share is higher")
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.langs)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    rng = random.Random(args.seed)
+
+    if args.log:
+        try:
+            requests, skipped = read_log(args.log)
+        except OSError as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+        langs, weights = [lang for lang, _ in mix], [weight for _, weight in mix]
+        for _, body in requests:
+            if "targetLangs" not in body and not body.get("targetLang"):
+                body["targetLang"] = rng.choices(langs, weights)[0]
+        print(f"Loaded {len(requests):,} requests from {args.log}" + (f" ({skipped:,} lines skipped)" if skipped else ""))
+    else:
+        if not args.sheet.exists():
+            print(f"ERROR: Data file not found: {args.sheet}")
+            sys.exit(1)
+        texts = sample_sheet(args.sheet, rng)
+        if not texts:
+            print(f"ERROR: No Korean cells in {args.sheet}")
+            sys.exit(1)
+        requests = synthesise(texts, args.synthetic, mix, args.repeat_share, args.batch_share, rng)
+        print(f"Synthesised {len(requests):,} requests from {len(texts):,} Korean cells of {args.sheet}")
+    if not requests:
+        print("ERROR: Nothing to replay")
+        sys.exit(1)
+    total = args.requests or len(requests)
+    requests = [requests[i % len(requests)] for i in range(args.warmup + total)]
+
+    claude = None
+    if args.stub_claude is not None:
+        config = MockConfig(latency_ms=args.claude_latency_ms, error_rate=args.claude_error_rate)
+        claude = MockClaudeServer(config, seed=args.seed, port=args.stub_claude).start()
+        print(f"Stand-in Claude at {claude.url} (start the backend with CLAUDE_API_BASE_URL={claude.url})")
+
+    replayer = Replayer(args.url, args.concurrency, args.timeout)
+    try:
+        if args.warmup:
+            print(f"Warming up with {args.warmup:,} requests...")
+            replayer.run(requests[:args.warmup], 0.0, rng)
+            if claude is not None:
+                claude.stats.reset()
+        print(f"Replaying {total:,} requests against {args.url}...")
+        outcomes, elapsed = replayer.run(requests[args.warmup:], args.rate, rng)
+    finally:
+        if claude is not None:
+            claude.stop()
+
+    summary = summarise(outcomes, elapsed, claude.stats.snapshot()["calls"] if claude is not None else None)
+    summary["concurrency"] = args.concurrency
+    summary["rate"] = args.rate
+    print()
+    print(report(summary, args.rate, args.concurrency))
+    if args.json:
+        args.json.write_text(json.dumps(summary, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\nReport written to {args.json}")
+
+    failures = check_limits(summary, args)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
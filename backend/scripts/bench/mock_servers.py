@@ -0,0 +1,376 @@
+"""
+Local stand-ins for the DeepL and Anthropic APIs used by the benchmark.
+
+Both servers run in background threads of the benchmark process and implement
+just enough of each API for the translation scripts:
+
+    DeepL:      GET /v2/usage, POST /v2/translate (form or JSON body)
+    Anthropic:  POST /v1/messages (keyed multi-language JSON prompts as sent by translate_remaining.py,
+                and the backend's single, batch and retry prompts from TranslationService)
+
+Each one can be given a response latency, an injected error rate (HTTP 503)
+and a request rate limit (HTTP 429 with Retry-After). A share of requests can
+be slowed down by a fixed extra delay (a latency tail), and Fault windows
+degrade a server for a while after it starts: "fail everything between 5 s and
+35 s", or "add 4 s to every response for the first minute". "Translations" are
+deterministic: Hangul syllables are replaced with Latin letters and prefixed
+with the target language, so results never contain Korean. A share of DeepL
+texts can be echoed back unchanged to exercise the Claude fallback, and a
+share of Claude ids can be left out of the response to exercise follow-ups.
+"""
+
+import hashlib
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import parse_qs
+
+_HANGUL = re.compile("[가-힯]")
+# Last line of every backend prompt: "Translate from Korean to English: <text>"
+_BACKEND_REQUEST = re.compile(r"^Translate from (.+?) to (.+?)(?: correctly\. Return ONLY the translated text\.|: (.*))$", re.S | re.M)
+_BACKEND_TARGETS = re.compile(r"following languages: (.*)\.")
+_LANG_CODE = re.compile(r"\(([A-Za-z_-]+)\)")
+
+
+def fake_translation(text: str, target_lang: str) -> str:
+    return f"[{target_lang}] " + _HANGUL.sub(lambda m: chr(ord("a") + ord(m.group()) % 26), text)
+
+
+def backend_answer(system: str, prompt: str) -> Optional[str]:
+    """
+    Reply to a backend TranslationService prompt: plain text for translate and
+    retry prompts, a {language code: text} JSON object for batch prompts.
+    None if the prompt is not one of them.
+    """
+    match = _BACKEND_REQUEST.search(prompt)
+    if match is None:
+        return None
+    target, text = match.group(2), match.group(3)
+    if text is None:
+        original = re.search(r"^Original: (.*)$", prompt, re.M)
+        text = original.group(1) if original else ""
+    targets = _BACKEND_TARGETS.search(system)
+    if targets is None:
+        return fake_translation(text, target)
+    return json.dumps({code: fake_translation(text, code) for code in _LANG_CODE.findall(targets.group(1))},
+                      ensure_ascii=False)
+
+
+def _stable_fraction(text: str) -> float:
+    """Deterministic value in [0, 1) per text, so retries and reruns behave the same."""
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=4).digest(), "big") / 2 ** 32
+
+
+class Fault:
+    """From `start` to `start + seconds` after the server started: an error rate and extra latency."""
+
+    def __init__(self, start: float, seconds: float, error_rate: float = 1.0, latency_ms: float = 0.0):
+        self.start = start
+        self.seconds = seconds
+        self.error_rate = error_rate
+        self.latency_ms = latency_ms
+
+    @classmethod
+    def parse(cls, spec: str) -> "Fault":
+        """
+        "START:SECONDS[:ERROR_RATE[:LATENCY_MS]]", e.g. "0:30" (every request
+        fails for 30 s) or "10:60:0:4000" (4 s slower from 10 s to 70 s).
+
+        Raises:
+            ValueError: not in that form
+        """
+        parts = spec.split(":")
+        if not 2 <= len(parts) <= 4:
+            raise ValueError(f"bad fault {spec!r} (expected START:SECONDS[:ERROR_RATE[:LATENCY_MS]])")
+        return cls(*(float(part) for part in parts))
+
+    def active(self, elapsed: float) -> bool:
+        return self.start <= elapsed < self.start + self.seconds
+
+
+class MockConfig:
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        error_rate: float = 0.0,
+        rps_limit: float = 0.0,
+        tail_rate: float = 0.0,
+        tail_ms: float = 0.0,
+        faults: Sequence[Fault] = (),
+    ):
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.rps_limit = rps_limit
+        # Share of requests that take tail_ms longer
+        self.tail_rate = tail_rate
+        self.tail_ms = tail_ms
+        self.faults = list(faults)
+
+
+class MockStats:
+    """Counters for one server; `snapshot()` is what the benchmark reports."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls = 0
+            self.texts = 0
+            self.characters = 0
+            self.errors = 0
+            self.rate_limited = 0
+            self.truncated = 0
+            self.slowed = 0
+
+    def add(self, **counts: int) -> None:
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "texts": self.texts,
+                "characters": self.characters,
+                "errors": self.errors,
+                "rate_limited": self.rate_limited,
+                "truncated": self.truncated,
+                "slowed": self.slowed,
+            }
+
+
+class _RateWindow:
+    """Sliding one-second window; `allow()` is False once `limit` requests arrived within it."""
+
+    def __init__(self, limit: float):
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._stamps: List[float] = []
+
+    def allow(self) -> bool:
+        if self.limit <= 0:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            self._stamps = [t for t in self._stamps if now - t < 1.0]
+            if len(self._stamps) >= self.limit:
+                return False
+            self._stamps.append(now)
+            return True
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "MockServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: dict, headers: Optional[Dict[str, str]] = None) -> None:
+        raw = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def _read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def _admit(self) -> bool:
+        """Apply rate limit, latency, tail, fault windows and error injection; False if an error response was sent."""
+        server = self.server
+        config = server.config
+        if not server.window.allow():
+            server.stats.add(rate_limited=1)
+            self._send(429, {"message": "Too many requests"}, {"Retry-After": "1"})
+            return False
+        delay = config.latency_ms * server.rng_uniform(0.8, 1.2) if config.latency_ms else 0.0
+        error_rate = config.error_rate
+        if config.tail_rate and server.rng_uniform(0, 1) < config.tail_rate:
+            delay += config.tail_ms
+            server.stats.add(slowed=1)
+        elapsed = time.monotonic() - server.started
+        for fault in config.faults:
+            if fault.active(elapsed):
+                delay += fault.latency_ms
+                error_rate = max(error_rate, fault.error_rate)
+        if delay:
+            time.sleep(delay / 1000)
+        if error_rate and server.rng_uniform(0, 1) < error_rate:
+            server.stats.add(errors=1)
+            self._send(503, {"message": "Injected failure"})
+            return False
+        return True
+
+
+class _DeepLHandler(_Handler):
+    server: "MockDeepLServer"
+
+    def do_GET(self):
+        if self.path.startswith("/v2/usage"):
+            self._send(200, {"character_count": self.server.stats.characters, "character_limit": 1_000_000_000})
+        else:
+            self._send(404, {"message": "Not found"})
+
+    def do_POST(self):
+        raw = self._read_body()
+        if not self.path.startswith("/v2/translate"):
+            self._send(404, {"message": "Not found"})
+            return
+        if not self._admit():
+            return
+        if "json" in (self.headers.get("Content-Type") or ""):
+            body = json.loads(raw)
+            texts, target_lang = body["text"], body["target_lang"]
+        else:
+            form = parse_qs(raw.decode("utf-8"))
+            texts, target_lang = form["text"], form["target_lang"][0]
+
+        passthrough = self.server.passthrough_rate
+        translations = [
+            text if _stable_fraction(text) < passthrough else fake_translation(text, target_lang)
+            for text in texts
+        ]
+        characters = sum(len(t) for t in texts)
+        self.server.stats.add(calls=1, texts=len(texts), characters=characters)
+        self._send(200, {"translations": [
+            {"detected_source_language": "KO", "billed_characters": len(t), "text": out}
+            for t, out in zip(texts, translations)
+        ]})
+
+
+class _ClaudeHandler(_Handler):
+    server: "MockClaudeServer"
+
+    def do_POST(self):
+        raw = self._read_body()
+        if not self.path.startswith("/v1/messages"):
+            self._send(404, {"type": "error", "error": {"type": "not_found_error", "message": "Not found"}})
+            return
+        if not self._admit():
+            return
+        body = json.loads(raw)
+        prompt = body["messages"][0]["content"]
+        answer = None if "\n\n{" in prompt else backend_answer(body.get("system") or "", prompt)
+        if answer is not None:
+            self.server.stats.add(calls=1, texts=1, characters=len(prompt))
+            self._send(200, {
+                "id": "msg_mock",
+                "type": "message",
+                "role": "assistant",
+                "content": [{"type": "text", "text": answer}],
+                "stop_reason": "end_turn",
+                "usage": {"input_tokens": len(prompt) // 3 + 1, "output_tokens": len(answer) // 3 + 1},
+            })
+            return
+        # The input object is the last thing in the prompt
+        items = json.loads(prompt[prompt.rindex("\n\n{") + 2:]) if "\n\n{" in prompt else {}
+
+        # Honour max_tokens so long batches truncate like the real API: the JSON is cut mid-string
+        budget = body.get("max_tokens", 4096)
+        text, used = "{", 0
+        stop_reason = "end_turn"
+        for key, item in items.items():
+            if self.server.rng_uniform(0, 1) < self.server.skip_rate:
+                continue
+            answer = {language: fake_translation(item["text"], language) for language in item["targets"]}
+            pair = f"{json.dumps(key)}: {json.dumps(answer, ensure_ascii=False)}"
+            pair = ("\n" if text == "{" else ",\n") + pair
+            cost = len(pair) * self.server.tokens_per_char
+            if used + cost > budget:
+                text += pair[:max(0, int((budget - used) / self.server.tokens_per_char))]
+                used = budget
+                stop_reason = "max_tokens"
+                break
+            text += pair
+            used += cost
+        if stop_reason == "end_turn":
+            text += "\n}"
+
+        self.server.stats.add(
+            calls=1, texts=len(items), characters=len(prompt), truncated=int(stop_reason == "max_tokens"),
+        )
+        self._send(200, {
+            "id": "msg_mock",
+            "type": "message",
+            "role": "assistant",
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": stop_reason,
+            "usage": {"input_tokens": len(prompt) // 3 + 1, "output_tokens": int(used)},
+        })
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+    handler = _Handler
+
+    def __init__(self, config: MockConfig, seed: int = 1, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), self.handler)
+        self.config = config
+        self.stats = MockStats()
+        self.window = _RateWindow(config.rps_limit)
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        # Fault windows are timed from here (reset_clock)
+        self.started = time.monotonic()
+
+    def handle_error(self, request, client_address) -> None:
+        # A client killed mid-request (fault_scenarios.py's resume scenario) is not a server error
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def rng_uniform(self, low: float, high: float) -> float:
+        with self._rng_lock:
+            return self._rng.uniform(low, high)
+
+    def reset_clock(self) -> None:
+        """Time the fault windows from now, e.g. at the start of each benchmark run."""
+        self.started = time.monotonic()
+
+    def start(self) -> "MockServer":
+        self.started = time.monotonic()
+        self._thread = threading.Thread(target=self.serve_forever, name=type(self).__name__, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class MockDeepLServer(MockServer):
+    handler = _DeepLHandler
+
+    def __init__(self, config: MockConfig, passthrough_rate: float = 0.0, seed: int = 1):
+        super().__init__(config, seed)
+        self.passthrough_rate = passthrough_rate
+
+
+class MockClaudeServer(MockServer):
+    handler = _ClaudeHandler
+
+    def __init__(
+        self, config: MockConfig, tokens_per_char: float = 0.35, skip_rate: float = 0.0, seed: int = 1,
+        host: str = "127.0.0.1", port: int = 0,
+    ):
+        super().__init__(config, seed, host, port)
+        self.tokens_per_char = tokens_per_char
+        self.skip_rate = skip_rate
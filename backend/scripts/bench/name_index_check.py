@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Checks that label_templates.NameIndex takes names, and not ordinary words, as
+name slots.
+
+Rows are built the way the sheet holds them after translate_remaining.py:
+
+    name              "방탄소년단" kept as "BTS" in en, es and zhHant,
+                      "防弾少年団" in ja
+    english fallback  "품절" translated everywhere except ja, where English
+                      fallback wrote "Sold Out"
+    empty-cell fill   "응모하기" with only en translated; every other column
+                      was filled with the English value
+    no other column   "장바구니" with only en filled
+
+Only the first is a name, and only its own forms are used to fill template
+slots: a template built with the others must keep them as text.
+
+USAGE:
+    python bench/name_index_check.py
+
+The exit status is 1 if any check failed.
+"""
+
+import sys
+from pathlib import Path
+from typing import List
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+import label_templates  # noqa: E402
+
+# en, zhHans, ja, es, zhHant
+TARGET_COLS = range(3, 8)
+COL_JAPANESE = 5
+
+
+def row(ko: str, en: str, zh_hans: str, ja: str, es: str, zh_hant: str) -> List[str]:
+    return ["/event/1", f"key.{ko}", ko, en, zh_hans, ja, es, zh_hant]
+
+
+ROWS = [
+    row("방탄소년단", "BTS", "防弹少年团", "防弾少年団", "BTS", "BTS"),
+    row("품절", "Sold Out", "售罄", "Sold Out", "Agotado", "售罄"),
+    row("응모하기", "Apply", "Apply", "Apply", "Apply", "Apply"),
+    row("장바구니", "Cart", "", "", "", ""),
+]
+
+
+def main() -> int:
+    names = label_templates.NameIndex(TARGET_COLS)
+    for r in ROWS:
+        names.add(r)
+
+    failures = []
+    if sorted(names.names) != ["방탄소년단"]:
+        failures.append(f"names: expected ['방탄소년단'], got {sorted(names.names)}")
+    elif names.form("방탄소년단", COL_JAPANESE) != "防弾少年団":
+        failures.append(f"ja form of 방탄소년단: {names.form('방탄소년단', COL_JAPANESE)!r}")
+
+    groups = [([i], f"{ko} 앨범") for i, ko in enumerate(["방탄소년단", "품절", "응모하기", "장바구니"])]
+    _, templates = label_templates.collapse(groups, names)
+    slotted = {text for t in templates for _, text, slots in t.variants if any(kind == "name" for kind, _ in slots)}
+    if slotted - {"방탄소년단 앨범"}:
+        failures.append(f"ordinary words used as name slots: {sorted(slotted - {'방탄소년단 앨범'})}")
+
+    for failure in failures:
+        print(f"FAILED: {failure}")
+    print("OK" if not failures else f"{len(failures)} check(s) failed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
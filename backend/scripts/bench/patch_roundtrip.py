@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Apply / revert round-trip checks for sheet patches (sheet_patch.py, apply_patch.py).
+
+Generates a sheet (sheet_generator.py) and edits a sample of its rows the way a
+translation run does, short rows included, so cells past a row's end are
+padded with "". Each edit is written as a patch with its changes shuffled, as
+a hand-edited or concatenated patch may list them. apply_patch.py then runs on
+copies of the sheet:
+
+    apply            the patched sheet holds the edited values
+    apply twice      the second run leaves the file untouched
+    revert           reverting gives back the original values, short rows included
+    conflict         a cell edited after the patch was made blocks the whole
+                     patch; with --skip-conflicts only that cell is left alone
+    revert conflict  reverting over a later edit is refused
+    two patches      a second patch extends the rows the first one padded;
+                     reverting both gives back the original values
+
+USAGE:
+    python bench/patch_roundtrip.py
+    python bench/patch_roundtrip.py --rows 20000 --keep
+
+The exit status is 1 if any check failed.
+"""
+
+import argparse
+import json
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+from sheet_generator import HEADER, write_sheet
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+import sheet_patch  # noqa: E402
+
+FIRST_DATA_ROW = 2
+# en, zhHant and two business-team / extra columns; the last ones lie past the end of short rows
+FIRST_COLS = [3, 7, 12, 16]
+SECOND_COLS = [3, 17]
+
+
+def load_values(path: Path) -> List[List]:
+    return json.loads(path.read_text(encoding="utf-8"))["values"]
+
+
+def save_values(path: Path, values: List[List]) -> None:
+    path.write_text(json.dumps({"range": "Sheet1", "values": values}, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def edit_rows(values: Sequence[List], cols: Sequence[int], share: float, tag: str, rng: random.Random) -> Dict[int, List]:
+    """Edited copies of a `share` of the data rows plus every short row, with `cols` set."""
+    data_rows = range(FIRST_DATA_ROW, len(values))
+    picked = set(rng.sample(data_rows, int(share * len(data_rows))))
+    picked.update(row_idx for row_idx in data_rows if len(values[row_idx]) < len(HEADER))
+    edited = {}
+    for row_idx in sorted(picked):
+        row = list(values[row_idx])
+        for col_idx in cols:
+            while len(row) <= col_idx:
+                row.append("")
+            row[col_idx] = f"{tag} {row_idx}:{col_idx}"
+        edited[row_idx] = row
+    return edited
+
+
+def patched(values: Sequence[List], edited: Dict[int, List]) -> List[List]:
+    return [edited.get(row_idx, row) for row_idx, row in enumerate(values)]
+
+
+def write_shuffled_patch(path: Path, sheet: Path, values: Sequence[List], edited: Dict[int, List],
+                         rng: random.Random) -> List[sheet_patch.Change]:
+    changes = sheet_patch.diff_rows({row_idx: values[row_idx] for row_idx in edited}, edited, {}, "check")
+    shuffled = list(changes)
+    rng.shuffle(shuffled)
+    sheet_patch.write_patch(path, shuffled, sheet, "patch_roundtrip.py")
+    return changes
+
+
+def apply_patch(sheet: Path, *args) -> Tuple[int, str]:
+    process = subprocess.run(
+        [sys.executable, str(SCRIPTS_DIR / "apply_patch.py"), "--sheet", str(sheet), *map(str, args)],
+        capture_output=True, text=True,
+    )
+    return process.returncode, process.stdout + process.stderr
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that sheet patches apply and revert cleanly")
+    parser.add_argument("--rows", type=int, default=5_000, help="Rows in the generated sheet")
+    parser.add_argument("--share", type=float, default=0.1, help="Share of rows each patch edits (plus every short row)")
+    parser.add_argument("--short-share", type=float, default=0.05, help="Share of generated rows cut short")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the sheet generator and the edits")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch directory (sheets, patches)")
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix="sheet-patches-"))
+    results: List[Tuple[str, bool]] = []
+
+    def check(label: str, ok: bool, output: str = "") -> None:
+        results.append((label, ok))
+        print(f"  {'PASS' if ok else 'FAIL'}  {label}")
+        if not ok and output:
+            print("        " + output.strip().replace("\n", "\n        "))
+
+    def copy(name: str) -> Path:
+        path = root / f"{name}.json"
+        shutil.copy2(sheet, path)
+        return path
+
+    try:
+        rng = random.Random(args.seed)
+        sheet = root / "sheet.json"
+        write_sheet(sheet, args.rows, short_share=args.short_share, seed=args.seed)
+        original = load_values(sheet)
+
+        first_edit = edit_rows(original, FIRST_COLS, args.share, "first", rng)
+        first_values = patched(original, first_edit)
+        first = root / "first.patch.jsonl.gz"
+        changes = write_shuffled_patch(first, sheet, original, first_edit, rng)
+        padded = sum(1 for change in changes if change[2] is None)
+        second_edit = edit_rows(first_values, SECOND_COLS, args.share, "second", rng)
+        second_values = patched(first_values, second_edit)
+        second = root / "second.patch.jsonl.gz"
+        write_shuffled_patch(second, sheet, first_values, second_edit, rng)
+        print(f"{args.rows:,} rows; first patch: {len(changes):,} changes in {len(first_edit):,} rows, "
+              f"{padded:,} of them past the end of short rows")
+        # A cell that exists before the patch, to edit by hand
+        row_idx, col_idx, _, _, _ = next(change for change in changes if change[2] is not None)
+
+        print("\napply")
+        path = copy("apply")
+        code, output = apply_patch(path, first)
+        check("patched sheet holds the edited values", code == 0 and load_values(path) == first_values, output)
+        before = path.read_bytes()
+        code, output = apply_patch(path, first)
+        check("applying again leaves the file untouched", code == 0 and path.read_bytes() == before, output)
+
+        print("\nrevert")
+        code, output = apply_patch(path, "--revert", first)
+        check("reverting gives back the original values", code == 0 and load_values(path) == original, output)
+
+        print("\nconflict")
+        path = copy("conflict")
+        values = load_values(path)
+        values[row_idx][col_idx] = "hand edit"
+        save_values(path, values)
+        before = path.read_bytes()
+        code, output = apply_patch(path, first)
+        check("a hand-edited cell blocks the patch", code == 1 and path.read_bytes() == before, output)
+        code, output = apply_patch(path, "--skip-conflicts", first)
+        expected = [list(row) for row in first_values]
+        expected[row_idx][col_idx] = "hand edit"
+        check("--skip-conflicts applies all other cells", code == 0 and load_values(path) == expected, output)
+
+        print("\nrevert conflict")
+        path = copy("revert-conflict")
+        apply_patch(path, first)
+        values = load_values(path)
+        values[row_idx][col_idx] = "hand edit"
+        save_values(path, values)
+        before = path.read_bytes()
+        code, output = apply_patch(path, "--revert", first)
+        check("reverting over a later edit is refused", code == 1 and path.read_bytes() == before, output)
+
+        print("\ntwo patches")
+        path = copy("two-patches")
+        code, output = apply_patch(path, first, second)
+        check("both patches applied in order", code == 0 and load_values(path) == second_values, output)
+        code, output = apply_patch(path, "--revert", first, second)
+        check("reverting both gives back the original values", code == 0 and load_values(path) == original, output)
+    finally:
+        if not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+    failed = sum(1 for _, ok in results if not ok)
+    print(f"\n{len(results)} checks, {failed} failed")
+    if args.keep:
+        print(f"Scratch files kept in {root}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
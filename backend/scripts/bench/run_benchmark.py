@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark for the translation scripts.
+
+For every sheet size it generates a synthetic sheet_db.json (sheet_generator.py),
+copies the scripts into a scratch workspace with the same layout as the repo,
+points them at local mock DeepL / Anthropic servers (mock_servers.py) and runs
+them as they would run for real. Reported per run:
+
+    - wall time and translated cells/sec (target cells whose value changed)
+    - DeepL and Claude API calls, texts and characters sent
+    - injected errors / 429s served, Claude responses truncated at max_tokens,
+      and peak RSS of the script process
+
+The script's own metrics file (phase timings, request latency percentiles, see
+run_metrics.py) is included in the --json output of each run.
+
+USAGE:
+    python bench/run_benchmark.py
+    python bench/run_benchmark.py --sizes 10000,100000,1000000 --korean-share 0.3
+    python bench/run_benchmark.py --scripts translate_remaining.py --deepl-latency-ms 150 \\
+        --claude-latency-ms 1500 --error-rate 0.02 --claude-rps-limit 2 --json results.json
+    python bench/run_benchmark.py --script-args "--deepl-concurrency 8"
+    python bench/run_benchmark.py --sizes 20k --scripts translate_remaining.py --deepl-fault 0:30 \
+        --deepl-tail-rate 0.05 --deepl-tail-ms 5000
+
+Fault windows (--deepl-fault / --claude-fault START:SECONDS[:ERROR_RATE[:LATENCY_MS]])
+are timed from the start of each run; bench/fault_scenarios.py runs a set of
+them and checks how the breakers and hedging of translate_remaining.py react.
+
+Each run starts from an empty workspace, so the translation memory, journal
+and row manifest never carry over between runs.
+"""
+
+import argparse
+import json
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from mock_servers import Fault, MockClaudeServer, MockConfig, MockDeepLServer
+from sheet_generator import write_sheet
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+import sheet_stream  # noqa: E402
+
+SCRIPTS = ["translate_missing_glossary.py", "translate_remaining.py"]
+SHEET_RELATIVE = Path("backend") / "src" / "main" / "resources" / "data" / "sheet_db.json"
+FIRST_DATA_ROW = 2
+
+
+def parse_sizes(text: str) -> List[int]:
+    sizes = []
+    for part in text.split(","):
+        part = part.strip().lower()
+        scale = 1
+        if part.endswith("k"):
+            part, scale = part[:-1], 1_000
+        elif part.endswith("m"):
+            part, scale = part[:-1], 1_000_000
+        sizes.append(int(float(part) * scale))
+    return sizes
+
+
+def changed_cells(before_path: Path, after_path: Path) -> int:
+    """
+    Number of cells in columns 3+ that differ between two sheets.
+
+    Both sheets are streamed: a child forked from this process starts with this
+    process's peak RSS, so loading them here would inflate the next run's number.
+    """
+    before = sheet_stream.SheetReader(before_path).rows()
+    after = sheet_stream.SheetReader(after_path).rows()
+    changed = 0
+    for (row_idx, old), (_, new) in zip(before, after):
+        if row_idx < FIRST_DATA_ROW or old == new:
+            continue
+        for col in range(3, max(len(old), len(new))):
+            if (old[col] if col < len(old) else "") != (new[col] if col < len(new) else ""):
+                changed += 1
+    return changed
+
+
+def peak_rss_mb(rusage) -> float:
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return rusage.ru_maxrss * scale / (1024 * 1024)
+
+
+def prepare_workspace(sheet: Path, workdir: Path) -> Path:
+    """Copy the scripts and `sheet` into `workdir` with the repo's layout; returns the scripts directory."""
+    scripts_dir = workdir / "backend" / "scripts"
+    scripts_dir.mkdir(parents=True)
+    for source in SCRIPTS_DIR.glob("*.py"):
+        shutil.copy2(source, scripts_dir / source.name)
+    data_path = workdir / SHEET_RELATIVE
+    data_path.parent.mkdir(parents=True)
+    shutil.copy2(sheet, data_path)
+    return scripts_dir
+
+
+def run_in_workspace(
+    script: str,
+    sheet: Path,
+    workdir: Path,
+    env: Dict[str, str],
+    script_args: List[str],
+    stop_when: Optional[Callable[[Path], bool]] = None,
+    log_name: Optional[str] = None,
+) -> Dict:
+    """
+    Run `script` in a workspace made by prepare_workspace. With `stop_when`, the
+    script is killed (SIGKILL, like a crash) as soon as `stop_when(scripts_dir)`
+    is true; it is polled every 50 ms.
+    """
+    scripts_dir = workdir / "backend" / "scripts"
+    data_path = workdir / SHEET_RELATIVE
+    log_path = workdir / (log_name or f"{Path(script).stem}.log")
+    started = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log:
+        process = subprocess.Popen(
+            [sys.executable, script, *script_args],
+            cwd=scripts_dir, env=env, stdout=log, stderr=subprocess.STDOUT,
+        )
+        # wait4 gives this child's own rusage (peak RSS), not the max over all children
+        while True:
+            pid, status, rusage = os.wait4(process.pid, os.WNOHANG if stop_when else 0)
+            if pid:
+                break
+            if stop_when(scripts_dir):
+                process.kill()
+                stop_when = None
+            else:
+                time.sleep(0.05)
+        process.returncode = os.waitstatus_to_exitcode(status)
+    elapsed = time.perf_counter() - started
+
+    metrics_path = scripts_dir / ".state" / f"{Path(script).stem}.metrics.json"
+    return {
+        "returncode": process.returncode,
+        "seconds": elapsed,
+        "peak_rss_mb": peak_rss_mb(rusage),
+        "cells": changed_cells(sheet, data_path),
+        "log": str(log_path),
+        "metrics": json.loads(metrics_path.read_text(encoding="utf-8")) if metrics_path.exists() else None,
+    }
+
+
+def run_script(script: str, sheet: Path, workdir: Path, env: Dict[str, str], script_args: List[str]) -> Dict:
+    prepare_workspace(sheet, workdir)
+    return run_in_workspace(script, sheet, workdir, env, script_args)
+
+
+def print_table(results: List[Dict]) -> None:
+    header = (
+        f"{'script':<30} {'rows':>9} {'cells':>9} {'sec':>8} {'cells/s':>9} "
+        f"{'DeepL calls':>11} {'DeepL chars':>12} {'Claude calls':>12} {'Claude chars':>12} "
+        f"{'err/429':>9} {'cut':>5} {'peak MB':>8}"
+    )
+    print("\n" + header)
+    print("-" * len(header))
+    for r in results:
+        d, c = r["deepl"], r["claude"]
+        faults = f"{d['errors'] + c['errors']}/{d['rate_limited'] + c['rate_limited']}"
+        status = "" if r["returncode"] == 0 else f"  (exit {r['returncode']})"
+        print(
+            f"{r['script']:<30} {r['rows']:>9,} {r['cells']:>9,} {r['seconds']:>8.1f} {r['cells_per_sec']:>9,.0f} "
+            f"{d['calls']:>11,} {d['characters']:>12,} {c['calls']:>12,} {c['characters']:>12,} "
+            f"{faults:>9} {c['truncated']:>5} {r['peak_rss_mb']:>8.0f}{status}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the translation scripts against mock DeepL/Claude servers")
+    parser.add_argument("--sizes", default="10k,100k,1m", help="Comma-separated row counts (k/m suffixes allowed)")
+    parser.add_argument("--scripts", default=",".join(SCRIPTS), help="Comma-separated scripts to run")
+    parser.add_argument("--korean-share", type=float, default=0.2, help="Share of target cells still holding Korean")
+    parser.add_argument("--empty-share", type=float, default=0.05, help="Share of target cells left empty")
+    parser.add_argument("--short-share", type=float, default=0.02, help="Share of rows cut short")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the sheet generator and mock servers")
+    parser.add_argument("--deepl-latency-ms", type=float, default=80.0, help="Mean DeepL response latency")
+    parser.add_argument("--claude-latency-ms", type=float, default=800.0, help="Mean Claude response latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with HTTP 503")
+    parser.add_argument("--deepl-rps-limit", type=float, default=0.0, help="DeepL requests/sec before 429 (0 = none)")
+    parser.add_argument("--claude-rps-limit", type=float, default=0.0, help="Claude requests/sec before 429 (0 = none)")
+    parser.add_argument("--deepl-tail-rate", type=float, default=0.0, help="Share of DeepL requests slowed by --deepl-tail-ms")
+    parser.add_argument("--deepl-tail-ms", type=float, default=0.0, help="Extra latency of the slowed DeepL requests")
+    parser.add_argument("--deepl-fault", type=Fault.parse, action="append", default=[], metavar="START:SECONDS[:ERR[:MS]]",
+                        help="Degrade DeepL for a while, seconds from the start of each run (repeatable)")
+    parser.add_argument("--claude-fault", type=Fault.parse, action="append", default=[], metavar="START:SECONDS[:ERR[:MS]]",
+                        help="Degrade Claude for a while, as --deepl-fault")
+    parser.add_argument("--deepl-passthrough", type=float, default=0.02,
+                        help="Share of texts DeepL returns untranslated (sent on to Claude by translate_remaining.py)")
+    parser.add_argument("--claude-tokens-per-char", type=float, default=0.35,
+                        help="Output tokens the mock Claude charges per character (raise to force max_tokens truncation)")
+    parser.add_argument("--claude-skip-rate", type=float, default=0.0,
+                        help="Share of ids the mock Claude leaves out of its response (exercises follow-up requests)")
+    parser.add_argument("--script-args", default="", help="Extra arguments passed to every script")
+    parser.add_argument("--json", type=Path, help="Also write the results to this JSON file")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch workspaces (logs, output sheets)")
+    args = parser.parse_args()
+
+    sizes = parse_sizes(args.sizes)
+    scripts = [s.strip() for s in args.scripts.split(",") if s.strip()]
+    script_args = shlex.split(args.script_args)
+
+    deepl_server = MockDeepLServer(
+        MockConfig(args.deepl_latency_ms, args.error_rate, args.deepl_rps_limit,
+                   args.deepl_tail_rate, args.deepl_tail_ms, args.deepl_fault),
+        passthrough_rate=args.deepl_passthrough, seed=args.seed,
+    ).start()
+    claude_server = MockClaudeServer(
+        MockConfig(args.claude_latency_ms, args.error_rate, args.claude_rps_limit, faults=args.claude_fault),
+        tokens_per_char=args.claude_tokens_per_char, skip_rate=args.claude_skip_rate, seed=args.seed,
+    ).start()
+    env = dict(
+        os.environ,
+        DEEPL_API_KEY="benchmark",
+        DEEPL_SERVER_URL=deepl_server.url,
+        CLAUDE_API_KEY="benchmark",
+        CLAUDE_API_BASE_URL=claude_server.url,
+    )
+    print(f"Mock DeepL: {deepl_server.url}  Mock Claude: {claude_server.url}")
+
+    root = Path(tempfile.mkdtemp(prefix="translation-bench-"))
+    results = []
+    try:
+        for rows in sizes:
+            sheet = root / f"sheet_{rows}.json"
+            started = time.perf_counter()
+            write_sheet(sheet, rows, args.korean_share, args.empty_share, args.short_share, args.seed)
+            print(f"\nGenerated {rows:,} rows ({sheet.stat().st_size / 1e6:.0f} MB) in {time.perf_counter() - started:.1f}s")
+
+            for script in scripts:
+                for server in (deepl_server, claude_server):
+                    server.stats.reset()
+                    server.reset_clock()
+                print(f"  {script} ...", end=" ", flush=True)
+                run = run_script(script, sheet, root / f"{Path(script).stem}_{rows}", env, script_args)
+                run.update(
+                    script=script,
+                    rows=rows,
+                    cells_per_sec=run["cells"] / run["seconds"] if run["seconds"] else 0.0,
+                    deepl=deepl_server.stats.snapshot(),
+                    claude=claude_server.stats.snapshot(),
+                )
+                results.append(run)
+                if run["returncode"] == 0:
+                    print(f"{run['seconds']:.1f}s")
+                else:
+                    tail = Path(run["log"]).read_text(encoding="utf-8").splitlines()[-10:]
+                    print(f"exit {run['returncode']}\n    " + "\n    ".join(tail))
+    finally:
+        deepl_server.stop()
+        claude_server.stop()
+        if not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+    print_table(results)
+    if args.keep:
+        print(f"\nWorkspaces kept in {root}")
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Synthetic sheet_db.json generator for the benchmark.
+
+Rows look like the real export: pageUrl, keyName, ko, then the eight target /
+DeepL-variant columns and the business-team and extra language columns. Korean
+source strings are drawn from a fixed vocabulary of short labels, names and
+longer product descriptions, so the same `ko` value repeats across pages the
+way it does in production.
+
+A configurable share of target cells is "contaminated" (still holds the Korean
+source), some are empty, and some rows are cut short.
+"""
+
+import json
+import random
+from pathlib import Path
+from typing import List
+
+HEADER = [
+    "pageUrl", "keyName", "ko", "en", "zhHans", "ja", "es", "zhHant",
+    "zhHantFromEn", "zhHantFromKo", "zhHansFromEn", "zhHansFromKo",
+    "zhHantTaiwan", "zhHansChina", "enNorthAmerica", "jaJapan", "de", "fr",
+]
+TARGET_COLS = range(3, 8)
+
+LABELS = [
+    "구매하기", "장바구니", "응모하기", "품절", "남음", "로그인", "회원가입", "배송지 변경",
+    "결제하기", "쿠폰 적용", "앨범", "포토카드", "응모 마감", "당첨자 발표", "이벤트 참여",
+]
+NAMES = ["방탄소년단", "세븐틴", "스트레이 키즈", "뉴진스", "아이브", "르세라핌", "에스파", "트와이스"]
+PHRASES = [
+    "공식 굿즈 한정 판매",
+    "팬사인회 응모 이벤트",
+    "주문 후 영업일 기준 3일 이내 출고됩니다",
+    "해외 배송 시 관세가 부과될 수 있습니다",
+    "랜덤 포토카드 1종이 함께 제공됩니다",
+    "본 상품은 예약 판매 상품으로 발매일 이후 순차 출고됩니다",
+]
+DESCRIPTION_TAIL = [
+    "상품 수령 후 7일 이내에 교환 및 반품이 가능합니다.",
+    "구성품은 사정에 따라 변경될 수 있습니다.",
+    "응모 결과는 개별 연락 드리지 않으니 공지사항을 확인해 주세요.",
+    "1인당 최대 2개까지 구매 가능합니다.",
+]
+
+
+def korean_text(rng: random.Random) -> str:
+    kind = rng.random()
+    if kind < 0.45:
+        return rng.choice(LABELS)
+    if kind < 0.70:
+        return f"{rng.choice(NAMES)} {rng.choice(LABELS)}"
+    if kind < 0.90:
+        return f"{rng.choice(NAMES)} {rng.choice(PHRASES)} {rng.randint(1, 500)}"
+    # Long product description
+    return " ".join([rng.choice(PHRASES)] + rng.sample(DESCRIPTION_TAIL, rng.randint(2, 4)))
+
+
+def generate_row(rng: random.Random, i: int, korean_share: float, empty_share: float, short_share: float) -> List:
+    ko = korean_text(rng)
+    row = [f"/event/{i % 997}", f"key.{i}", ko]
+    for col in TARGET_COLS:
+        r = rng.random()
+        if r < korean_share:
+            row.append(ko)
+        elif r < korean_share + empty_share:
+            row.append("")
+        else:
+            row.append(f"{HEADER[col]} {i}")
+    row.extend([""] * (len(HEADER) - len(row)))
+    if rng.random() < short_share:
+        row = row[:rng.randint(4, 7)]
+    return row
+
+
+def write_sheet(
+    path: Path,
+    rows: int,
+    korean_share: float = 0.2,
+    empty_share: float = 0.05,
+    short_share: float = 0.02,
+    seed: int = 1,
+) -> None:
+    """Write a `rows`-row sheet to `path`, one row per line so millions of rows never sit in memory at once."""
+    rng = random.Random(seed)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"range": "Sheet1", "values": [\n')
+        f.write(json.dumps(HEADER, ensure_ascii=False))
+        f.write(",\n")
+        f.write(json.dumps([""] * len(HEADER)))
+        for i in range(rows):
+            f.write(",\n")
+            f.write(json.dumps(generate_row(rng, i, korean_share, empty_share, short_share), ensure_ascii=False))
+        f.write("\n]}\n")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Build a precompiled glossary + token-index snapshot for the backend.
+
+On first start, GlossaryInitializer parses sheet_db.json and TokenIndexService
+expands every row into n-gram / bigram / trigram tokens before search gets its
+token tier. This script does the same work offline (see glossary_index.py) and
+writes a gzipped JSON snapshot next to sheet_db.json:
+
+    {
+      "format": "papago-glossary-snapshot",
+      "version": 1,
+      "tokenizerVersion": 1,
+      "sourceSha256": "<sha256 of sheet_db.json>",
+      "glossaries": [[pageUrl, keyName, ko, en, ...], ...],
+      "koTokens": {"<token>": [row ordinal, ...], ...},
+      "multiLangTokens": {"en": {"<token>": [row ordinal, ...]}, "ja": {...}, ...}
+    }
+
+Row ordinals index into "glossaries". At startup GlossarySnapshotService only
+accepts the snapshot when its format, version, tokenizer version and source
+hash match, and then bulk-loads it instead of recomputing the indexes.
+
+USAGE:
+    python build_glossary_snapshot.py
+    python build_glossary_snapshot.py --input path/to/sheet_db.json --output path/to/glossary_snapshot.json.gz
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import sys
+import time
+from pathlib import Path
+
+import glossary_index
+
+SNAPSHOT_FORMAT = "papago-glossary-snapshot"
+SNAPSHOT_VERSION = 1
+
+DATA_DIR = Path(__file__).parent.parent / "src" / "main" / "resources" / "data"
+
+
+def build_snapshot(raw: bytes) -> dict:
+    values = json.loads(raw.decode("utf-8")).get("values", [])
+    rows = glossary_index.glossary_rows(values)
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "tokenizerVersion": glossary_index.TOKENIZER_VERSION,
+        "sourceSha256": hashlib.sha256(raw).hexdigest(),
+        "glossaries": rows,
+        "koTokens": glossary_index.build_ko_index(rows),
+        "multiLangTokens": glossary_index.build_multi_lang_index(rows),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the precompiled glossary + token-index snapshot")
+    parser.add_argument("--input", type=Path, default=DATA_DIR / "sheet_db.json", help="Sheet export to index")
+    parser.add_argument("--output", type=Path, default=DATA_DIR / "glossary_snapshot.json.gz", help="Snapshot file to write")
+    args = parser.parse_args()
+
+    if not args.input.exists():
+        print(f"ERROR: Data file not found: {args.input}")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    print(f"Loading: {args.input}")
+    snapshot = build_snapshot(args.input.read_bytes())
+
+    ko_entries = sum(len(ids) for ids in snapshot["koTokens"].values())
+    multi_entries = sum(len(ids) for table in snapshot["multiLangTokens"].values() for ids in table.values())
+    print(f"  Glossary rows:       {len(snapshot['glossaries']):,}")
+    print(f"  Korean tokens:       {len(snapshot['koTokens']):,} distinct, {ko_entries:,} entries")
+    print(f"  Multi-lang tokens:   {multi_entries:,} entries")
+
+    # ensure_ascii keeps surrogate pairs from utf16() as \uXXXX escapes Jackson decodes back
+    tmp = args.output.with_name(args.output.name + ".tmp")
+    with gzip.open(tmp, "wt", encoding="ascii", compresslevel=6) as f:
+        json.dump(snapshot, f, ensure_ascii=True, separators=(",", ":"))
+    tmp.replace(args.output)
+
+    print(f"Wrote {args.output} ({args.output.stat().st_size:,} bytes) in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
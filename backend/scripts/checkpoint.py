@@ -0,0 +1,163 @@
+"""
+Crash-safe progress for the translation scripts.
+
+CheckpointJournal is an append-only JSON Lines file of
+(row, col, value, engine) records, flushed and fsynced after every batch.
+If a run dies halfway, `--resume` replays the journal into the freshly loaded
+sheet so finished cells no longer look untranslated and are skipped.
+
+atomic_write_json writes the final sheet to a temp file in the same directory
+and renames it over the original, so readers (GlossaryInitializer, the next
+run) never see a half-written sheet_db.json.
+"""
+
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+DEFAULT_STATE_DIR = Path(__file__).parent / ".state"
+
+# (row_idx, col_idx, value, engine)
+Record = Tuple[int, int, str, str]
+
+
+def journal_path_for(script_name: str, state_dir: Path = DEFAULT_STATE_DIR) -> Path:
+    return state_dir / f"{Path(script_name).stem}.journal.jsonl"
+
+
+class CheckpointJournal:
+    """Append-only journal of applied cell changes for one data file."""
+
+    def __init__(self, path: Path, data_path: Path):
+        self.path = Path(path)
+        self.data_path = str(Path(data_path).resolve())
+        self.records_written = 0
+        self._file = None
+
+    def start(self, resume: bool) -> List[Record]:
+        """
+        Open the journal for appending.
+
+        With `resume`, the existing records are returned for replay and new
+        records are appended after them. Without it, any previous journal is
+        discarded.
+
+        Raises:
+            ValueError: the existing journal belongs to a different data file
+        """
+        records: List[Record] = []
+        if resume and self.path.exists():
+            records = self.read()
+        self.open(append=bool(records))
+        return records
+
+    def open(self, append: bool) -> None:
+        """
+        Open the journal for appending without reading it, for callers that
+        already read and validated it. Without `append` (or without an existing
+        journal) a new journal is started.
+        """
+        append = append and self.path.exists()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a" if append else "w", encoding="utf-8")
+        if not append:
+            self._write_line({"data_path": self.data_path, "started": time.time()})
+
+    def read(self) -> List[Record]:
+        records: List[Record] = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f):
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A crash mid-write can leave a truncated last line
+                    break
+                if line_no == 0:
+                    if entry.get("data_path") != self.data_path:
+                        raise ValueError(f"journal {self.path} was written for {entry.get('data_path')}, not {self.data_path}")
+                    continue
+                records.append((entry["row"], entry["col"], entry["value"], entry["engine"]))
+        return records
+
+    def record(self, records: Iterable[Record]) -> None:
+        """Append records and force them to disk."""
+        wrote = False
+        for row_idx, col_idx, value, engine in records:
+            self._file.write(json.dumps(
+                {"row": row_idx, "col": col_idx, "value": value, "engine": engine}, ensure_ascii=False
+            ) + "\n")
+            self.records_written += 1
+            wrote = True
+        if wrote:
+            self._sync()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def finish(self) -> None:
+        """Close and delete the journal once the sheet has been saved."""
+        self.close()
+        if self.path.exists():
+            self.path.unlink()
+
+    def _write_line(self, entry: dict) -> None:
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._sync()
+
+    def _sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+
+def group_by_row(records: Sequence[Record]) -> Dict[int, List[Tuple[int, str]]]:
+    """{row_idx: [(col_idx, value), ...]} in journal order, for replaying rows while the sheet streams by."""
+    by_row: Dict[int, List[Tuple[int, str]]] = {}
+    for row_idx, col_idx, value, _ in records:
+        by_row.setdefault(row_idx, []).append((col_idx, value))
+    return by_row
+
+
+def replay_row(row: List[Any], cells: Sequence[Tuple[int, str]], needs_work: Callable[[Any], bool]) -> int:
+    """
+    Apply one row's journal records to `row`.
+
+    A record is only applied while its cell still `needs_work` (e.g. still
+    contains Korean or is empty), so edits made to the sheet after the crash are
+    not overwritten.
+
+    Returns:
+        Number of cells restored
+    """
+    restored = 0
+    for col_idx, value in cells:
+        current = row[col_idx] if col_idx < len(row) else ""
+        if not needs_work(current):
+            continue
+        while len(row) <= col_idx:
+            row.append("")
+        row[col_idx] = value
+        restored += 1
+    return restored
+
+
+def atomic_write_json(path: Path, data: Any) -> None:
+    """Write JSON to a temp file next to `path`, fsync it, then rename over `path`."""
+    path = Path(path)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        if path.exists():
+            os.chmod(tmp_name, path.stat().st_mode & 0o777)
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
@@ -0,0 +1,181 @@
+"""
+Per-engine circuit breakers and hedged requests for the translation pipeline.
+
+A degraded API stalls a run: every batch waits out its own retries and
+timeout before its texts move on to the next engine, and the retries add load
+to a service that is already struggling. A CircuitBreaker watches an engine's
+recent requests and stops sending to it while they go badly:
+
+    closed     requests go through and their outcome is recorded
+    open       at least `error_rate` of the last `window` requests (and at
+               least `min_calls` of them) failed or took longer than
+               `slow_seconds`; callers skip the engine for `cooldown` seconds
+    half-open  after the cooldown one probe request goes through; success
+               closes the breaker, failure or a slow answer opens it again
+
+The breaker also keeps the latencies of the engine's recent successful
+requests, so a slow request can be hedged: once it has run longer than the
+engine's observed p95 (`hedge_after`, never less than HEDGE_MIN_SECONDS), the
+caller sends a duplicate to the next engine and keeps whichever answer arrives
+first. `hedge_allowed` caps hedges at HEDGE_MAX_SHARE of requests, so a slow
+engine cannot double the traffic.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+# Latencies kept for the hedge threshold, and how many are needed before hedging starts
+LATENCY_WINDOW = 200
+HEDGE_MIN_SAMPLES = 20
+HEDGE_PERCENTILE = 95
+HEDGE_MAX_SHARE = 0.1
+# The copy goes to a slower engine: hedging a request that is only slightly late never wins
+HEDGE_MIN_SECONDS = 1.0
+
+
+class BreakerPolicy:
+    def __init__(
+        self,
+        slow_seconds: float,
+        error_rate: float = 0.5,
+        window: int = 20,
+        min_calls: int = 5,
+        cooldown: float = 30.0,
+    ):
+        self.slow_seconds = slow_seconds
+        self.error_rate = error_rate
+        self.window = window
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+
+
+# A DeepL batch normally answers in well under a second; the client retries 5xx for about 16 s before failing
+DEEPL_BREAKER = BreakerPolicy(slow_seconds=20.0)
+
+# A full Claude batch can take a minute; ClaudeClient times out at 120 s
+CLAUDE_BREAKER = BreakerPolicy(slow_seconds=90.0)
+
+
+class CircuitBreaker:
+    """
+    Breaker for one engine, as described in the module docstring. Thread-safe.
+
+    `on_change(breaker, reason)` is called after every state change. A disabled
+    breaker never opens but still records latencies for hedging.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        policy: BreakerPolicy,
+        enabled: bool = True,
+        on_change: Optional[Callable[["CircuitBreaker", str], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.policy = policy
+        self.enabled = enabled
+        self.on_change = on_change
+        self.clock = clock
+        self.state = CLOSED
+        self.opened = 0
+        self.probes = 0
+        self.skipped = 0
+        self._outcomes: Deque[bool] = deque(maxlen=policy.window)
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._open_until = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """
+        Whether to send a request now. In half-open state only the first
+        caller gets True (the probe) until its outcome is recorded.
+        """
+        changed = None
+        with self._lock:
+            if self.state == OPEN and self.clock() >= self._open_until:
+                self.state = HALF_OPEN
+                self._probing = False
+                changed = f"cooldown over, probing {self.name}"
+            if self.state == CLOSED:
+                allowed = True
+            elif self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                self.probes += 1
+                allowed = True
+            else:
+                self.skipped += 1
+                allowed = False
+        if changed:
+            self._changed(changed)
+        return allowed
+
+    def record(self, seconds: float, ok: bool) -> None:
+        """Record one finished request: how long it took and whether it succeeded."""
+        bad = not ok or seconds > self.policy.slow_seconds
+        changed = None
+        with self._lock:
+            if ok:
+                self._latencies.append(seconds)
+            if not self.enabled:
+                return
+            if self.state == HALF_OPEN:
+                # Whichever request finishes first decides, usually the probe
+                if bad:
+                    changed = self._open(f"probe {'failed' if not ok else f'took {seconds:.1f}s'}")
+                else:
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                    changed = f"probe answered in {seconds:.1f}s"
+            elif self.state == CLOSED:
+                self._outcomes.append(bad)
+                failed = sum(self._outcomes)
+                if len(self._outcomes) >= self.policy.min_calls and failed >= self.policy.error_rate * len(self._outcomes):
+                    changed = self._open(
+                        f"{failed} of the last {len(self._outcomes)} requests failed "
+                        f"or took over {self.policy.slow_seconds:g}s"
+                    )
+            # Requests sent before the breaker opened do not change an open breaker
+        if changed:
+            self._changed(changed)
+
+    def _open(self, reason: str) -> str:
+        self.state = OPEN
+        self.opened += 1
+        self._probing = False
+        self._outcomes.clear()
+        self._open_until = self.clock() + self.policy.cooldown
+        return f"{reason}; skipping {self.name} for {self.policy.cooldown:g}s"
+
+    def _changed(self, reason: str) -> None:
+        if self.on_change is not None:
+            self.on_change(self, reason)
+
+    def hedge_after(self) -> Optional[float]:
+        """
+        Seconds after which to hedge a request: the observed p95 latency of
+        successful requests, at least HEDGE_MIN_SECONDS. None until there are
+        HEDGE_MIN_SAMPLES of them.
+        """
+        with self._lock:
+            if len(self._latencies) < HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(self._latencies)
+        return max(HEDGE_MIN_SECONDS, ordered[max(1, math.ceil(HEDGE_PERCENTILE / 100 * len(ordered))) - 1])
+
+    def summary(self) -> str:
+        return (f"{self.name} breaker: {self.state}, opened {self.opened} times, "
+                f"{self.skipped} requests skipped, {self.probes} probes")
+
+
+def hedge_allowed(hedges: int, requests: int) -> bool:
+    """Whether one more hedge keeps hedges within HEDGE_MAX_SHARE of `requests` (one is always allowed)."""
+    return hedges < max(1, HEDGE_MAX_SHARE * requests)
@@ -0,0 +1,223 @@
+"""
+Reusable HTTP client for the Anthropic Messages API.
+
+    - Keeps a small pool of keep-alive connections instead of opening a new TLS
+      connection per request
+    - Throttles with a token bucket shared by all threads; a 429 / 529 response
+      with `retry-after` pauses the whole bucket, not just the failing thread
+    - Retries transient failures (429, 5xx, 529, dropped connections) with
+      jittered exponential backoff
+
+The base URL defaults to https://api.anthropic.com and can be pointed at a local
+stand-in server with CLAUDE_API_BASE_URL (e.g. http://127.0.0.1:8080).
+"""
+
+import http.client
+import json
+import os
+import queue
+import random
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+DEFAULT_BASE_URL = "https://api.anthropic.com"
+ANTHROPIC_VERSION = "2023-06-01"
+
+RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+class ClaudeAPIError(Exception):
+    """Raised when a request fails permanently or runs out of retries."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"{status} {message}")
+        self.status = status
+        self.message = message
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    `rate` tokens are added per second up to `capacity`. `pause(seconds)` blocks
+    every caller until the given time has passed, which is how server-side
+    `retry-after` hints are applied to all workers at once. `waited` is the
+    total time callers have spent blocked, summed over threads.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self.waited = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1.0:
+                        self._tokens -= 1.0
+                        return
+                    wait = (1.0 - self._tokens) / self.rate
+                self.waited += wait
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+class ClaudeClient:
+    """Pooled, rate-limited, retrying client for POST /v1/messages."""
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        pool_size: int = 4,
+        requests_per_second: float = 2.0,
+        burst: Optional[float] = None,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_cap: float = 60.0,
+        timeout: float = 120.0,
+    ):
+        parts = urlsplit(base_url or os.environ.get("CLAUDE_API_BASE_URL") or DEFAULT_BASE_URL)
+        self.api_key = api_key
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path_prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.bucket = TokenBucket(requests_per_second, burst or pool_size)
+        self.retries = 0
+        self.backoff_seconds = 0.0
+
+        self._pool: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._lock = threading.Lock()
+
+    def messages(self, payload: Dict) -> Dict:
+        """POST /v1/messages and return the decoded JSON body."""
+        _, body = self.post_json("/v1/messages", payload)
+        return body
+
+    def post_json(self, path: str, payload: Dict) -> Tuple[int, Dict]:
+        """
+        POST a JSON payload, retrying transient failures.
+
+        Raises:
+            ClaudeAPIError: non-retryable status, or retries exhausted
+        """
+        encoded = json.dumps(payload).encode("utf-8")
+        headers = {
+            "Content-Type": "application/json",
+            "x-api-key": self.api_key,
+            "anthropic-version": ANTHROPIC_VERSION,
+        }
+
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            try:
+                status, response_headers, raw = self._request("POST", self.path_prefix + path, encoded, headers)
+            except (OSError, http.client.HTTPException) as e:
+                if attempt >= self.max_retries:
+                    raise ClaudeAPIError(0, f"connection failed: {e}") from e
+                self._sleep_backoff(attempt, None)
+                attempt += 1
+                continue
+
+            body = _decode(raw)
+            if status == 200:
+                return status, body
+
+            message = body.get("error", {}).get("message", "") if isinstance(body, dict) else ""
+            if status not in RETRY_STATUSES or attempt >= self.max_retries:
+                raise ClaudeAPIError(status, message)
+
+            retry_after = _parse_retry_after(response_headers.get("retry-after"))
+            if status in (429, 529) and retry_after is not None:
+                self.bucket.pause(retry_after)
+            self._sleep_backoff(attempt, retry_after)
+            attempt += 1
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def __enter__(self) -> "ClaudeClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _request(self, method: str, path: str, body: bytes, headers: Dict[str, str]):
+        with self._slots:
+            conn = self._checkout()
+            try:
+                conn.request(method, path, body, headers)
+                resp = conn.getresponse()
+                raw = resp.read()
+            except Exception:
+                conn.close()
+                raise
+            response_headers = {k.lower(): v for k, v in resp.getheaders()}
+            if resp.will_close:
+                conn.close()
+            else:
+                self._pool.put(conn)
+            return resp.status, response_headers, raw
+
+    def _checkout(self) -> http.client.HTTPConnection:
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+        if self.scheme == "http":
+            return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+
+    def _sleep_backoff(self, attempt: int, retry_after: Optional[float]) -> None:
+        with self._lock:
+            self.retries += 1
+        # Full jitter: a random delay up to the exponential ceiling
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        with self._lock:
+            self.backoff_seconds += delay
+        time.sleep(delay)
+
+
+def _decode(raw: bytes) -> Dict:
+    try:
+        return json.loads(raw.decode("utf-8")) if raw else {}
+    except (UnicodeDecodeError, ValueError):
+        return {}
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
@@ -0,0 +1,222 @@
+"""
+Pre-flight cost and quota planning for the translation scripts.
+
+After the scan, same-ko reuse and translation-memory lookups, but before any
+translation request, each script knows exactly which unique texts it is about
+to send. This module turns that into a plan:
+
+    - DeepL characters per column (DeepL bills source characters)
+    - estimated Claude texts and tokens per column, using the share of earlier
+      translations that needed Claude (from the translation memory) or a default
+    - a comparison against the DeepL quota left this billing period
+
+When the DeepL characters exceed the remaining quota or the --budget cap, the
+plan keeps the most important texts and defers the rest to a later run:
+
+    1. cells users actually see: the base column is shown unless a
+       business-team correction (enNorthAmerica, jaJapan, zhHansChina,
+       zhHantTaiwan) overrides it, so cells without a correction come first
+    2. English before other languages (the English value is every other
+       column's last-resort fallback)
+    3. texts that fill the most cells per character
+
+Deferred cells keep their Korean text, so the next run picks them up again.
+"""
+
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from batch_planner import CLAUDE_LIMITS
+
+COL_ENGLISH = 3
+
+# Base column -> business-team correction column that overrides it in the backend
+CORRECTION_COLS = {3: 14, 4: 13, 5: 15, 7: 12}
+
+# Share of DeepL texts assumed to need Claude when the translation memory has no history
+DEFAULT_CLAUDE_SHARE = 0.05
+
+# Claude input: Korean is about one token per character, plus JSON framing per text and the prompt per request
+INPUT_TOKENS_PER_CHAR = 1.0
+INPUT_TOKENS_PER_TEXT = 12
+PROMPT_TOKENS = 150
+CLAUDE_TEXTS_PER_REQUEST = 40
+
+Group = Tuple[List[int], str]
+
+
+def is_overridden(values: Sequence[Sequence], col_idx: int, row_idx: int) -> bool:
+    """True when a business-team correction replaces this cell in the backend."""
+    correction = CORRECTION_COLS.get(col_idx)
+    if correction is None:
+        return False
+    row = values[row_idx]
+    return correction < len(row) and isinstance(row[correction], str) and bool(row[correction].strip())
+
+
+def claude_share(memory, target_lang: str) -> float:
+    """Share of earlier translations for `target_lang` that came from Claude."""
+    counts = memory.engine_counts(target_lang)
+    total = counts.get("deepl", 0) + counts.get("claude", 0)
+    if total < 50:
+        return DEFAULT_CLAUDE_SHARE
+    return counts.get("claude", 0) / total
+
+
+class ColumnPlan:
+    def __init__(self, name: str, share: Optional[float]):
+        self.name = name
+        self.claude_share = share
+        self.texts = 0
+        self.cells = 0
+        self.chars = 0
+        self.deferred_texts = 0
+        self.deferred_cells = 0
+        self.deferred_chars = 0
+
+    def add(self, group: Group, deferred: bool) -> None:
+        rows, text = group
+        if deferred:
+            self.deferred_texts += 1
+            self.deferred_cells += len(rows)
+            self.deferred_chars += len(text)
+        else:
+            self.texts += 1
+            self.cells += len(rows)
+            self.chars += len(text)
+
+    def claude_estimate(self) -> Tuple[int, int, int]:
+        """(texts, input tokens, output tokens) expected to reach Claude."""
+        if self.claude_share is None or not self.texts:
+            return 0, 0, 0
+        texts = round(self.texts * self.claude_share)
+        chars = self.chars * self.claude_share
+        input_tokens = chars * INPUT_TOKENS_PER_CHAR + texts * INPUT_TOKENS_PER_TEXT
+        input_tokens += math.ceil(texts / CLAUDE_TEXTS_PER_REQUEST) * PROMPT_TOKENS
+        output_tokens = chars * CLAUDE_LIMITS.tokens_per_char + texts * CLAUDE_LIMITS.tokens_per_line
+        return texts, int(input_tokens), int(output_tokens)
+
+
+class CostPlan:
+    def __init__(self, columns: Dict[int, ColumnPlan], quota_remaining: Optional[int], budget: Optional[int]):
+        self.columns = columns
+        self.quota_remaining = quota_remaining
+        self.budget = budget
+
+    @property
+    def cap(self) -> Optional[int]:
+        limits = [limit for limit in (self.quota_remaining, self.budget) if limit is not None]
+        return min(limits) if limits else None
+
+    @property
+    def deepl_chars(self) -> int:
+        return sum(c.chars for c in self.columns.values())
+
+    @property
+    def deferred_cells(self) -> int:
+        return sum(c.deferred_cells for c in self.columns.values())
+
+    def report(self) -> str:
+        with_claude = any(c.claude_share is not None for c in self.columns.values())
+        header = f"  {'Column':<22} {'Cells':>8} {'Texts':>8} {'DeepL chars':>12}"
+        if with_claude:
+            header += f" {'Claude texts':>13} {'Claude in':>10} {'Claude out':>11}"
+        lines = ["Cost plan (before any translation request):", header]
+        totals = [0] * 6
+        for c in self.columns.values():
+            if not c.texts and not c.deferred_texts:
+                continue
+            claude = c.claude_estimate()
+            line = f"  {c.name:<22} {c.cells:>8,} {c.texts:>8,} {c.chars:>12,}"
+            if with_claude:
+                line += f" {claude[0]:>13,} {claude[1]:>10,} {claude[2]:>11,}"
+            lines.append(line)
+            for i, value in enumerate((c.cells, c.texts, c.chars) + claude):
+                totals[i] += value
+        line = f"  {'Total':<22} {totals[0]:>8,} {totals[1]:>8,} {totals[2]:>12,}"
+        if with_claude:
+            line += f" {totals[3]:>13,} {totals[4]:>10,} {totals[5]:>11,}"
+            lines.append(line)
+            lines.append("  (Claude figures are estimates; texts reaching Claude for several columns are sent once)")
+        else:
+            lines.append(line)
+
+        if self.quota_remaining is not None:
+            lines.append(f"  DeepL quota remaining: {self.quota_remaining:,} characters")
+        if self.budget is not None:
+            lines.append(f"  Budget (--budget): {self.budget:,} characters")
+        if self.deferred_cells:
+            deferred_texts = sum(c.deferred_texts for c in self.columns.values())
+            deferred_chars = sum(c.deferred_chars for c in self.columns.values())
+            lines.append(
+                f"  Over the {self.cap:,}-character cap: deferring {self.deferred_cells:,} cells "
+                f"({deferred_texts:,} texts, {deferred_chars:,} characters) to a later run"
+            )
+            for c in self.columns.values():
+                if c.deferred_cells:
+                    lines.append(f"    {c.name}: {c.deferred_cells:,} cells deferred")
+        return "\n".join(lines)
+
+
+def _priority(values: Sequence[Sequence], col_idx: int, group: Group) -> Tuple[int, int, float]:
+    rows, text = group
+    visible = not all(is_overridden(values, col_idx, row_idx) for row_idx in rows)
+    return (0 if visible else 1, 0 if col_idx == COL_ENGLISH else 1, -len(rows) / max(1, len(text)))
+
+
+def plan_costs(
+    values: Sequence[Sequence],
+    groups: Dict[int, List[Group]],
+    names: Dict[int, str],
+    quota_remaining: Optional[int] = None,
+    budget: Optional[int] = None,
+    shares: Optional[Dict[int, float]] = None,
+) -> Tuple[CostPlan, Dict[int, List[Group]]]:
+    """
+    Build the cost plan for `groups` ({col_idx: [(rows, text), ...]}) and keep
+    what fits under the smaller of the remaining quota and `budget`.
+
+    Returns:
+        (plan, kept) where `kept` has the same shape as `groups`, in the original order
+    """
+    plan = CostPlan(
+        {col: ColumnPlan(names[col], shares.get(col) if shares is not None else None) for col in groups},
+        quota_remaining, budget,
+    )
+    total = sum(len(text) for col_groups in groups.values() for _, text in col_groups)
+    cap = plan.cap
+    if cap is None or total <= cap:
+        for col, col_groups in groups.items():
+            for group in col_groups:
+                plan.columns[col].add(group, deferred=False)
+        return plan, groups
+
+    ranked = sorted(
+        ((col, i) for col, col_groups in groups.items() for i in range(len(col_groups))),
+        key=lambda key: _priority(values, key[0], groups[key[0]][key[1]]),
+    )
+    keep = set()
+    spent = 0
+    for col, i in ranked:
+        size = len(groups[col][i][1])
+        if spent + size <= cap:
+            keep.add((col, i))
+            spent += size
+
+    kept = {}
+    for col, col_groups in groups.items():
+        kept[col] = []
+        for i, group in enumerate(col_groups):
+            deferred = (col, i) not in keep
+            plan.columns[col].add(group, deferred)
+            if not deferred:
+                kept[col].append(group)
+    return plan, kept
+
+
+def quota_remaining(usage) -> Optional[int]:
+    """Characters left this billing period from deepl.Translator.get_usage(), or None if unlimited."""
+    character = getattr(usage, "character", None)
+    if character is None or not character.limit:
+        return None
+    return max(0, character.limit - character.count)
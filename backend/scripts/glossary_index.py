@@ -0,0 +1,256 @@
+"""
+Python port of the backend glossary model and tokenizers.
+
+Mirrors, rule for rule:
+    - GlossaryInitializer: which sheet rows become Glossary entities and how cells are read
+    - KoreanMorphologyService.stem: particle stripping + verb normalization
+    - TokenizationService.tokenize / tokenizeForIndex / tokenizeMultiLang
+    - TokenIndexService: which column feeds each multi-language index
+
+Strings are handled as UTF-16 code units, like Kotlin's String, so lengths,
+n-grams and token lengths match the JVM even for characters outside the BMP.
+When TokenizationService changes, update this module and bump
+TOKENIZER_VERSION here and in TokenizationService together.
+"""
+
+import re
+from typing import Dict, Iterable, List, Sequence, Set
+
+TOKENIZER_VERSION = 1
+
+# Glossary entity fields in sheet column order (GlossaryInitializer)
+GLOSSARY_FIELDS = [
+    "pageUrl", "keyName", "ko", "en", "zhHans", "ja", "es", "zhHant",
+    "zhHantFromEn", "zhHantFromKo", "zhHansFromEn", "zhHansFromKo",
+    "zhHantTaiwan", "zhHansChina", "enNorthAmerica", "jaJapan",
+    "de", "fr",
+]
+FIELD_INDEX = {name: i for i, name in enumerate(GLOSSARY_FIELDS)}
+
+# Rows shorter than this are skipped by GlossaryInitializer
+MIN_ROW_SIZE = 6
+
+MULTI_LANG_COLUMNS = ["en", "ja", "zh-hans", "zh-hant", "es", "de", "fr"]
+
+# java.util.regex \s only matches ASCII whitespace
+SPLIT_PATTERN = re.compile(r"[ \t\n\x0b\f\r,.!?;:()\[\]{}\"'~·…/\\|@#$%^&*+=<>]+")
+
+COMPLEX_PARTICLES = [
+    "에서는", "으로부터", "에게는", "까지는", "에서도", "처럼", "같이", "대로", "보다", "밖에", "에게서",
+    "부터", "까지", "마저", "조차",
+]
+PARTICLES_NO_BATCHIM = ["에서", "에게", "를", "가", "는", "로", "와", "야", "여", "도", "만", "의", "라"]
+PARTICLES_WITH_BATCHIM = ["에서", "에게", "을", "이", "은", "으로", "과", "아", "도", "만", "의"]
+ALL_PARTICLES = sorted(dict.fromkeys(PARTICLES_NO_BATCHIM + PARTICLES_WITH_BATCHIM), key=len, reverse=True)
+VERB_SUFFIXES = sorted([
+    "합니다", "하세요", "했던", "하기", "하는", "하게", "해서", "하여", "하고", "하면", "한다", "해요", "할",
+    "됩니다", "되다", "되는", "되어", "되고", "되면", "돼요", "된",
+    "스러운", "스럽게", "적",
+    "중", "시",
+], key=len, reverse=True)
+MIN_STEM_LENGTH = 1
+
+
+def utf16(text: str) -> str:
+    """Re-express `text` as UTF-16 code units (astral characters become surrogate pairs)."""
+    if all(ord(ch) < 0x10000 for ch in text):
+        return text
+    out = []
+    for ch in text:
+        cp = ord(ch)
+        if cp < 0x10000:
+            out.append(ch)
+        else:
+            cp -= 0x10000
+            out.append(chr(0xD800 + (cp >> 10)))
+            out.append(chr(0xDC00 + (cp & 0x3FF)))
+    return "".join(out)
+
+
+def _is_whitespace(ch: str) -> bool:
+    # Kotlin Char.isWhitespace (Character.isWhitespace || Character.isSpaceChar)
+    return ch.isspace()
+
+
+def trim(text: str) -> str:
+    start, end = 0, len(text)
+    while start < end and _is_whitespace(text[start]):
+        start += 1
+    while end > start and _is_whitespace(text[end - 1]):
+        end -= 1
+    return text[start:end]
+
+
+def is_blank(text: str) -> bool:
+    return all(_is_whitespace(ch) for ch in text)
+
+
+# --- KoreanMorphologyService ---
+
+def strip_particles(word: str) -> List[str]:
+    if not word:
+        return []
+    results = {}
+    for particle in COMPLEX_PARTICLES:
+        if word.endswith(particle) and len(word) - len(particle) >= MIN_STEM_LENGTH:
+            results[word[:-len(particle)]] = None
+    for particle in ALL_PARTICLES:
+        if word.endswith(particle) and len(word) - len(particle) >= MIN_STEM_LENGTH:
+            results[word[:-len(particle)]] = None
+    return list(results)
+
+
+def normalize_verb(word: str) -> List[str]:
+    if not word:
+        return []
+    results = {}
+    for suffix in VERB_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM_LENGTH:
+            results[word[:-len(suffix)]] = None
+    return list(results)
+
+
+def stem(word: str) -> List[str]:
+    if not word:
+        return []
+    results = {word: None}
+    stripped = strip_particles(word)
+    results.update(dict.fromkeys(stripped))
+    results.update(dict.fromkeys(normalize_verb(word)))
+    for form in stripped:
+        results.update(dict.fromkeys(normalize_verb(form)))
+    return [r for r in results if r]
+
+
+# --- TokenizationService ---
+
+def split_into_words(text: str) -> List[str]:
+    return [w for w in (trim(part) for part in SPLIT_PATTERN.split(utf16(text))) if w]
+
+
+def _ngrams(word: str, min_n: int, max_n: int) -> Set[str]:
+    return {word[i:i + n] for n in range(min_n, min(max_n, len(word)) + 1) for i in range(len(word) - n + 1)}
+
+
+def tokenize(text: str) -> Set[str]:
+    words = split_into_words(text)
+    if not words:
+        return set()
+    tokens = set(words)
+    for word in words:
+        tokens.update(stem(word))
+    for i in range(len(words) - 1):
+        tokens.add(words[i] + words[i + 1])
+    for i in range(len(words) - 2):
+        tokens.add(words[i] + words[i + 1] + words[i + 2])
+    for word in words:
+        tokens.update(_ngrams(word, 2, 8))
+    return {t for t in tokens if len(t) >= 2}
+
+
+def tokenize_for_index(text: str) -> Set[str]:
+    tokens = tokenize(text)
+    trimmed = trim(utf16(text))
+    if len(trimmed) >= 2:
+        tokens.add(trimmed)
+        tokens.update(stem(trimmed))
+    return tokens
+
+
+def _tokenize_latin(text: str) -> Set[str]:
+    words = [w for w in SPLIT_PATTERN.split(text) if len(w) >= 2]
+    tokens = set(words)
+    tokens.add(text)
+    for i in range(len(words) - 1):
+        tokens.add(f"{words[i]} {words[i + 1]}")
+    return tokens
+
+
+def _tokenize_cjk(text: str) -> Set[str]:
+    cleaned = "".join(ch for ch in text if not _is_whitespace(ch))
+    tokens = {cleaned}
+    tokens.update(_ngrams(cleaned, 2, 4))
+    return {t for t in tokens if len(t) >= 2}
+
+
+def tokenize_multi_lang(text: str, lang: str) -> Set[str]:
+    if is_blank(text):
+        return set()
+    trimmed = utf16(trim(text).lower())
+    if lang in ("en", "es", "de", "fr"):
+        return _tokenize_latin(trimmed)
+    if lang in ("zh-hans", "zh_hans", "zh-hant", "zh_hant", "ja"):
+        return _tokenize_cjk(trimmed)
+    if lang == "ko":
+        return tokenize_for_index(text)
+    return _tokenize_latin(trimmed)
+
+
+# --- GlossaryInitializer / TokenIndexService ---
+
+def _safe_text(row: Sequence, index: int) -> str:
+    # Jackson JsonNode.asText() semantics
+    if len(row) <= index:
+        return ""
+    value = row[index]
+    if isinstance(value, str):
+        return value
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return ""
+
+
+def glossary_fields(row: Sequence) -> List[str]:
+    """One sheet row as the GLOSSARY_FIELDS list of its Glossary entity."""
+    return [_safe_text(row, i) for i in range(len(GLOSSARY_FIELDS))]
+
+
+def glossary_rows(values: Sequence[Sequence]) -> List[List[str]]:
+    """The rows GlossaryInitializer turns into Glossary entities, as GLOSSARY_FIELDS lists."""
+    return [glossary_fields(row) for row in values[2:] if len(row) >= MIN_ROW_SIZE]
+
+
+def text_for_lang(fields: Sequence[str], lang: str) -> str:
+    """TokenIndexService.getTextForLang: business-team corrections win over the base column."""
+    def pick(preferred: str, fallback: str) -> str:
+        value = fields[FIELD_INDEX[preferred]]
+        return value if not is_blank(value) else fields[FIELD_INDEX[fallback]]
+
+    if lang == "en":
+        return pick("enNorthAmerica", "en")
+    if lang == "ja":
+        return pick("jaJapan", "ja")
+    if lang == "zh-hans":
+        return pick("zhHansChina", "zhHans")
+    if lang == "zh-hant":
+        return pick("zhHantTaiwan", "zhHant")
+    if lang in ("es", "de", "fr"):
+        return fields[FIELD_INDEX[lang]]
+    return ""
+
+
+def build_ko_index(rows: Iterable[Sequence[str]]) -> Dict[str, List[int]]:
+    """token -> ordinals of the rows whose `ko` produced it (TokenIndexService.buildTokenIndex)."""
+    index: Dict[str, List[int]] = {}
+    for ordinal, fields in enumerate(rows):
+        for token in tokenize_for_index(fields[FIELD_INDEX["ko"]]):
+            index.setdefault(token, []).append(ordinal)
+    return index
+
+
+def build_multi_lang_index(rows: Iterable[Sequence[str]]) -> Dict[str, Dict[str, List[int]]]:
+    """lang -> token -> row ordinals (TokenIndexService.buildMultiLangIndex)."""
+    index: Dict[str, Dict[str, List[int]]] = {lang: {} for lang in MULTI_LANG_COLUMNS}
+    for ordinal, fields in enumerate(rows):
+        for lang in MULTI_LANG_COLUMNS:
+            text = text_for_lang(fields, lang)
+            if is_blank(text):
+                continue
+            lang_index = index[lang]
+            for token in tokenize_multi_lang(text, lang):
+                lang_index.setdefault(token, []).append(ordinal)
+    return index
@@ -0,0 +1,598 @@
+"""
+Python port of GlossarySearchService.search / searchByLanguage.
+
+Runs the backend's 4-tier relevance search over sheet_db.json in memory, so
+glossary QA does not need the JVM or one HTTP request per query:
+
+    search (Korean)                      searchByLanguage
+    1. exact `ko`            100         1. exact column value      100
+    2. stem-exact `ko`        90         2. lowercase column value   90 (only if tier 1 found nothing)
+    3. token index       up to 60        3. multi-language tokens  up to 60
+    4. LIKE per word          30         4. LIKE on the whole input  30
+    +15 when the entry's pageUrl and the query's pageUrl are prefixes of each other
+
+Each tier only adds entries the tiers before it did not find, exactly like the
+service, and the results are the `limit` best by score, earlier tiers first on
+equal scores. Within a tier, entries come in glossary id order. (H2 returns the
+token-table rows of tier 3 in an order it does not guarantee, so entries with
+exactly the same token score may be ordered differently than in the backend.)
+
+What replaces the H2 queries:
+
+    - every column is indexed by distinct value, so rows sharing a text are
+      matched once: dictionaries for exact and lowercase matches, the token
+      tables TokenIndexService builds (glossary_index.py), and character-bigram
+      postings for LIKE '%x%' (candidates from the rarest bigram, then a
+      substring check; patterns with the H2 wildcards % _ \\ are scanned)
+    - tier 3 is scored from the longest matched token down and stops once no
+      shorter token can reach the `limit` best scores, so a common bigram that
+      matches half the glossary costs a set union, not a score per row
+    - the pageUrl bonus only looks at the rows on the query's page (found from
+      the prefixes of the page URL), not at every hit
+"""
+
+import bisect
+import re
+from collections import Counter
+from itertools import chain
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import glossary_index
+import sheet_stream
+from glossary_index import FIELD_INDEX, is_blank, trim, utf16
+
+SCORE_EXACT = 100.0
+SCORE_STEM_EXACT = 90.0
+SCORE_LOWERCASE = 90.0
+SCORE_TOKEN_MAX = 60.0
+SCORE_LIKE = 30.0
+PAGE_BONUS = 15.0
+# Highest count bonus a tier-3 match can add to its length score
+MAX_COUNT_BONUS = 10.0
+
+# Tier order, used to break score ties the way the service's insertion order does
+TIER_EXACT, TIER_CLOSE, TIER_TOKEN, TIER_LIKE = range(4)
+
+# Column searched by findExactByLang / findByLangIgnoreCase / findByLangLike
+LANG_FIELDS = {
+    "en": "en", "ja": "ja", "es": "es", "de": "de", "fr": "fr",
+    "zh-hans": "zhHans", "zh_hans": "zhHans", "zh-hant": "zhHant", "zh_hant": "zhHant",
+}
+# Columns the repository compares with LOWER(); the Chinese queries are case-sensitive
+CASE_INSENSITIVE_FIELDS = {"en", "ja", "es", "de", "fr"}
+
+_LIKE_SPECIAL = re.compile(r"[%_\\]")
+
+
+def _like_pattern(needle: str) -> "re.Pattern[str]":
+    """H2 `LIKE '%needle%'` (escape character \\) as a regex for re.search."""
+    out = []
+    chars = iter(needle)
+    for ch in chars:
+        if ch == "%":
+            out.append(".*")
+        elif ch == "_":
+            out.append(".")
+        elif ch == "\\":
+            out.append(re.escape(next(chars, "\\")))
+        else:
+            out.append(re.escape(ch))
+    return re.compile("".join(out), re.DOTALL)
+
+
+class SubstringIndex:
+    """Character-bigram postings over a list of texts, for LIKE '%needle%'."""
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.postings: Dict[str, List[int]] = {}
+        for text_id, text in enumerate(texts):
+            for gram in {text[i:i + 2] for i in range(len(text) - 1)}:
+                self.postings.setdefault(gram, []).append(text_id)
+
+    def containing(self, needle: str) -> List[int]:
+        """Ids of the texts that contain `needle`, ascending."""
+        if _LIKE_SPECIAL.search(needle):
+            pattern = _like_pattern(needle)
+            return [text_id for text_id, text in enumerate(self.texts) if pattern.search(text)]
+        if len(needle) < 2:
+            return [text_id for text_id, text in enumerate(self.texts) if needle in text]
+        rarest: Optional[List[int]] = None
+        for i in range(len(needle) - 1):
+            posting = self.postings.get(needle[i:i + 2])
+            if posting is None:
+                return []
+            if rarest is None or len(posting) < len(rarest):
+                rarest = posting
+        if len(needle) == 2:
+            return list(rarest)
+        texts = self.texts
+        return [text_id for text_id in rarest if needle in texts[text_id]]
+
+
+class Column:
+    """
+    One column of the glossary, indexed by distinct value.
+
+    Text ids number the distinct values; `rows[text_id]` lists the ordinals of
+    the rows holding it, ascending. Blank values get no tokens, as in
+    TokenIndexService. The token, lowercase and LIKE indexes are built on first use.
+    """
+
+    def __init__(self, values: Iterable[str], tokenizer: Callable[[str], Set[str]], case_insensitive: bool = False):
+        self.ids: Dict[str, int] = {}
+        self.texts: List[str] = []
+        self.rows: List[List[int]] = []
+        self.text_of_row: List[int] = []
+        for ordinal, value in enumerate(values):
+            value = utf16(value)
+            text_id = self.ids.get(value)
+            if text_id is None:
+                text_id = self.ids[value] = len(self.texts)
+                self.texts.append(value)
+                self.rows.append([])
+            self.rows[text_id].append(ordinal)
+            self.text_of_row.append(text_id)
+        self.tokenizer = tokenizer
+        self.case_insensitive = case_insensitive
+        self._tokens: Optional[Dict[str, List[int]]] = None
+        self._lower: Optional[Dict[str, List[int]]] = None
+        self._like: Optional[SubstringIndex] = None
+
+    def ordinals(self, text_ids: Iterable[int]) -> List[int]:
+        return sorted(chain.from_iterable(self.rows[text_id] for text_id in text_ids))
+
+    def exact(self, text: str) -> List[int]:
+        text_id = self.ids.get(text)
+        return [] if text_id is None else self.rows[text_id]
+
+    def lower(self, text: str) -> List[int]:
+        if self._lower is None:
+            self._lower = {}
+            for text_id, value in enumerate(self.texts):
+                self._lower.setdefault(value.lower(), []).append(text_id)
+        return self.ordinals(self._lower.get(text.lower(), ()))
+
+    def like(self, needle: str) -> List[int]:
+        """Text ids matching LIKE '%needle%' (LOWER() on both sides for case-insensitive columns)."""
+        if self._like is None:
+            texts = [text.lower() for text in self.texts] if self.case_insensitive else self.texts
+            self._like = SubstringIndex(texts)
+        return self._like.containing(needle.lower() if self.case_insensitive else needle)
+
+    @property
+    def tokens(self) -> Dict[str, List[int]]:
+        """token -> ids of the texts that produce it."""
+        if self._tokens is None:
+            self._tokens = {}
+            for text_id, text in enumerate(self.texts):
+                if is_blank(text):
+                    continue
+                for token in self.tokenizer(text):
+                    self._tokens.setdefault(token, []).append(text_id)
+        return self._tokens
+
+
+def _token_score(length: int, count: int, divisor: int) -> float:
+    length_ratio = length / divisor
+    return min(length_ratio * 60.0 + min(count - 1, 5) * 2.0, SCORE_TOKEN_MAX)
+
+
+def _in_posting(posting: List[int], text_id: int) -> bool:
+    i = bisect.bisect_left(posting, text_id)
+    return i < len(posting) and posting[i] == text_id
+
+
+class TokenMatches:
+    """
+    Tier 3 for one query: the texts sharing a token with the input.
+
+    A text's score depends on its longest matched token and on how many
+    distinct tokens it matched. Nothing is computed per text up front: groups()
+    walks the matched tokens from the longest down and only scores the texts
+    it reaches, and single texts are looked up by bisecting the (sorted)
+    postings. A common bigram matching half the glossary is only expanded when
+    the longer tokens did not already fill the results.
+    """
+
+    # Texts in a bucket above which counting every posting at once is cheaper than bisecting
+    COUNT_ALL_ABOVE = 64
+    # Rough cost of one bisect lookup, in posting entries counted
+    BISECT_COST = 32
+
+    def __init__(self, postings: Dict[str, List[int]], tokens: Iterable[str], input_len: int):
+        by_length: Dict[int, List[List[int]]] = {}
+        for token in tokens:
+            posting = postings.get(token)
+            if posting:
+                by_length.setdefault(len(token), []).append(posting)
+        # (token length, postings), longest first
+        self.lengths = sorted(by_length.items(), reverse=True)
+        self.postings = [posting for _, group in self.lengths for posting in group]
+        self.divisor = max(input_len, 1)
+        self._counts: Optional[Counter] = None
+        self._union: Optional[Set[int]] = None
+        # text id -> longest matched token length, once materialize() ran
+        self._longest: Optional[Dict[int, int]] = None
+
+    def __contains__(self, text_id: int) -> bool:
+        if self._longest is not None:
+            return text_id in self._longest
+        return any(_in_posting(posting, text_id) for posting in self.postings)
+
+    def union(self) -> Set[int]:
+        if self._union is None:
+            self._union = set(chain.from_iterable(self.postings))
+        return self._union
+
+    def matching(self, text_ids: Set[int]) -> Set[int]:
+        """The `text_ids` that matched a token; indexes every matched text first when that beats bisecting."""
+        bisects = len(text_ids) * len(self.postings) * self.BISECT_COST
+        if self._longest is None and bisects > sum(len(posting) for posting in self.postings):
+            self._counts = self._counts or Counter(chain.from_iterable(self.postings))
+            self._longest = {}
+            for length, group in reversed(self.lengths):
+                self._longest.update(dict.fromkeys(chain.from_iterable(group), length))
+        if self._longest is not None:
+            return text_ids & self._longest.keys()
+        return {text_id for text_id in text_ids if text_id in self}
+
+    def min_texts(self) -> int:
+        """A lower bound on len(union()) that costs nothing."""
+        return max((len(posting) for posting in self.postings), default=0)
+
+    def _count(self, text_id: int) -> int:
+        if self._counts is not None:
+            return self._counts[text_id]
+        return sum(1 for posting in self.postings if _in_posting(posting, text_id))
+
+    def score(self, text_id: int) -> float:
+        if self._longest is not None:
+            return _token_score(self._longest[text_id], self._counts[text_id], self.divisor)
+        for length, group in self.lengths:
+            if any(_in_posting(posting, text_id) for posting in group):
+                return _token_score(length, self._count(text_id), self.divisor)
+        raise KeyError(text_id)
+
+    def groups(self) -> Iterator[Tuple[float, List[int]]]:
+        """(score, text ids) from the best score down, each score once."""
+        pending: Dict[float, List[int]] = {}
+        seen: Set[int] = set()
+        for i, (length, group) in enumerate(self.lengths):
+            text_ids = set(chain.from_iterable(group))
+            text_ids -= seen
+            seen |= text_ids
+            if len(text_ids) > self.COUNT_ALL_ABOVE and self._counts is None:
+                self._counts = Counter(chain.from_iterable(self.postings))
+            # Score by distinct tokens matched; the count bonus stops growing at 6
+            table = [_token_score(length, count, self.divisor) for count in range(7)]
+            count = self._counts.__getitem__ if self._counts is not None else self._count
+            for text_id in text_ids:
+                matched = count(text_id)
+                pending.setdefault(table[matched if matched < 6 else 6], []).append(text_id)
+            if i + 1 < len(self.lengths):
+                # The best any shorter token can still reach; equal scores must wait for it
+                bound = min(self.lengths[i + 1][0] / self.divisor * 60.0 + MAX_COUNT_BONUS, SCORE_TOKEN_MAX)
+            else:
+                bound = -1.0
+            for score in sorted((s for s in pending if s > bound), reverse=True):
+                yield score, pending.pop(score)
+
+
+class ScoredGlossary:
+    """One search hit. `ordinal` indexes GlossarySearch.rows; the backend id is ordinal + 1."""
+
+    __slots__ = ("ordinal", "score", "match_type")
+
+    def __init__(self, ordinal: int, score: float, match_type: str):
+        self.ordinal = ordinal
+        self.score = score
+        self.match_type = match_type
+
+    @property
+    def id(self) -> int:
+        return self.ordinal + 1
+
+    def __repr__(self) -> str:
+        return f"ScoredGlossary(id={self.id}, score={self.score:g}, match_type={self.match_type!r})"
+
+
+class _Hits:
+    """The tiers one query matched, before the page bonus and the limit."""
+
+    def __init__(self, tokens: TokenMatches, token_column: Column):
+        # Tiers 1-2: (score, tier, match type, ordinals ascending, the same as a set)
+        self.fixed: List[Tuple[float, int, str, List[int], Set[int]]] = []
+        self.fixed_all: Set[int] = set()
+        self.tokens = tokens
+        self.token_column = token_column
+        # Tier 4: one sorted ordinal list per LIKE word, and ordinal -> word index
+        self.like: List[List[int]] = []
+        self.like_word: Dict[int, int] = {}
+
+    def add_fixed(self, ordinals: List[int], score: float, tier: int, match_type: str) -> None:
+        if self.fixed_all:
+            ordinals = [ordinal for ordinal in ordinals if ordinal not in self.fixed_all]
+        if ordinals:
+            members = set(ordinals)
+            self.fixed.append((score, tier, match_type, ordinals, members))
+            self.fixed_all |= members
+
+    def count_below(self, limit: int) -> bool:
+        """Whether tiers 1-3 found fewer than `limit` entries."""
+        if max(len(self.fixed_all), self.tokens.min_texts()) >= limit:
+            return False
+        return len(self.fixed_all | self.token_ordinals()) < limit
+
+    def token_ordinals(self) -> Set[int]:
+        return set(self.token_column.ordinals(self.tokens.union()))
+
+    def add_like(self, ordinals: List[int]) -> None:
+        word = len(self.like)
+        self.like.append(ordinals)
+        for ordinal in ordinals:
+            self.like_word[ordinal] = word
+
+    def scored(
+        self, rows: Set[int], rows_by_text: Dict[int, List[int]], bonus: float
+    ) -> List[Tuple[float, int, int, int, str]]:
+        """
+        (score + bonus, tier, LIKE word, ordinal, match type) of the hits among
+        `rows`, which `rows_by_text` groups by text id in the token column.
+        """
+        out = []
+        for score, tier, match_type, _, members in self.fixed:
+            for ordinal in members & rows:
+                out.append((score + bonus, tier, 0, ordinal, match_type))
+        for text_id in self.tokens.matching(rows_by_text.keys()):
+            score = self.tokens.score(text_id) + bonus
+            for ordinal in rows_by_text[text_id]:
+                if ordinal not in self.fixed_all:
+                    out.append((score, TIER_TOKEN, 0, ordinal, "token"))
+        if self.like_word:
+            for ordinal in self.like_word.keys() & rows:
+                out.append((SCORE_LIKE + bonus, TIER_LIKE, self.like_word[ordinal], ordinal, "like"))
+        return out
+
+    def ranked(self, skip: Set[int]) -> Iterator[Tuple[float, int, int, int, str]]:
+        """(score, tier, LIKE word, ordinal, match type) of every hit not in `skip`, best first."""
+        for score, tier, match_type, ordinals, _ in self.fixed:
+            for ordinal in ordinals:
+                if ordinal not in skip:
+                    yield score, tier, 0, ordinal, match_type
+
+        like = ((SCORE_LIKE, TIER_LIKE, word, ordinals) for word, ordinals in enumerate(self.like))
+        next_like = next(like, None)
+        for score, text_ids in self.tokens.groups():
+            while next_like is not None and next_like[0] > score:
+                yield from self._like_group(next_like, skip)
+                next_like = next(like, None)
+            for ordinal in self.token_column.ordinals(text_ids):
+                if ordinal not in skip and ordinal not in self.fixed_all:
+                    yield score, TIER_TOKEN, 0, ordinal, "token"
+        while next_like is not None:
+            yield from self._like_group(next_like, skip)
+            next_like = next(like, None)
+
+    @staticmethod
+    def _like_group(group, skip: Set[int]) -> Iterator[Tuple[float, int, int, int, str]]:
+        score, tier, word, ordinals = group
+        for ordinal in ordinals:
+            if ordinal not in skip:
+                yield score, tier, word, ordinal, "like"
+
+
+def _ko_tokenizer(text: str) -> Set[str]:
+    return glossary_index.tokenize_for_index(text)
+
+
+class GlossarySearch:
+    """
+    The glossary of one sheet, indexed for search() and search_by_language().
+
+    `rows` are GLOSSARY_FIELDS lists (glossary_index.glossary_rows) in the order
+    GlossaryInitializer saves them; `sheet_rows` optionally maps each ordinal
+    to its row index in sheet_db.json. Per-language indexes are built the
+    first time a language is searched.
+    """
+
+    def __init__(self, rows: List[List[str]], sheet_rows: Optional[List[int]] = None):
+        self.rows = rows
+        self.sheet_rows = sheet_rows
+        self._ko = Column((fields[FIELD_INDEX["ko"]] for fields in rows), _ko_tokenizer)
+        self._fields: Dict[str, Column] = {}
+        self._lang_tokens: Dict[str, Column] = {}
+        self._urls: Optional[Dict[str, List[int]]] = None
+        self._sorted_urls: List[str] = []
+        self._page_rows: Dict[str, Tuple[Set[int], bool]] = {}
+        self._page_by_text: Dict[Tuple[str, int], Dict[int, List[int]]] = {}
+
+    @classmethod
+    def from_sheet(cls, path: Path) -> "GlossarySearch":
+        """Index sheet_db.json, streaming it (see sheet_stream.py)."""
+        rows, sheet_rows = [], []
+        for row_idx, row in sheet_stream.SheetReader(path).rows():
+            if row_idx >= 2 and len(row) >= glossary_index.MIN_ROW_SIZE:
+                rows.append(glossary_index.glossary_fields(row))
+                sheet_rows.append(row_idx)
+        return cls(rows, sheet_rows)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def field(self, hit: ScoredGlossary, name: str) -> str:
+        return self.rows[hit.ordinal][FIELD_INDEX[name]]
+
+    # --- search ---
+
+    def search(self, input_text: str, page_url: Optional[str] = None, limit: int = 10) -> List[ScoredGlossary]:
+        """GlossarySearchService.search: Korean input against `ko`."""
+        ko = self._ko
+        trimmed = utf16(trim(input_text))
+        words = glossary_index.split_into_words(trimmed)
+        hits = _Hits(TokenMatches(ko.tokens, glossary_index.tokenize(trimmed), len(trimmed)), ko)
+
+        hits.add_fixed(ko.exact(trimmed), SCORE_EXACT, TIER_EXACT, "exact")
+        stems = {s for word in words for s in glossary_index.stem(word)}
+        stem_ids = {ko.ids[s] for s in stems if s in ko.ids}
+        hits.add_fixed(ko.ordinals(stem_ids), SCORE_STEM_EXACT, TIER_CLOSE, "stem-exact")
+
+        if hits.count_below(limit):
+            scored = hits.fixed_all | hits.token_ordinals()
+            count = len(scored)
+            for word in words:
+                if len(word) < 2:
+                    continue
+                ordinals = [o for o in ko.ordinals(ko.like(word)) if o not in scored]
+                hits.add_like(ordinals)
+                scored.update(ordinals)
+                count += len(ordinals)
+                if count >= limit * 2:
+                    break
+
+        return self._finish(hits, page_url, limit)
+
+    def search_by_language(
+        self, input_text: str, search_lang: str, page_url: Optional[str] = None, limit: int = 10
+    ) -> List[ScoredGlossary]:
+        """GlossarySearchService.searchByLanguage: input in `search_lang` against that language's column."""
+        if search_lang == "ko":
+            return self.search(input_text, page_url, limit)
+
+        trimmed = utf16(trim(input_text))
+        # The token table is keyed by the canonical language code: "zh_hans" tokenizes but finds nothing
+        token_column = self._lang_token_column(search_lang)
+        tokens = glossary_index.tokenize_multi_lang(trimmed, search_lang)
+        hits = _Hits(TokenMatches(token_column.tokens, tokens, len(trimmed)), token_column)
+
+        name = LANG_FIELDS.get(search_lang.lower())
+        if name is not None:
+            column = self._field_column(name)
+            hits.add_fixed(column.exact(trimmed), SCORE_EXACT, TIER_EXACT, "exact")
+            if not hits.fixed:
+                matches = column.lower(trimmed) if column.case_insensitive else column.exact(trimmed)
+                hits.add_fixed(matches, SCORE_LOWERCASE, TIER_CLOSE, "lowercase")
+
+            if len(trimmed) >= 2 and hits.count_below(limit):
+                scored = hits.fixed_all | hits.token_ordinals()
+                hits.add_like([o for o in column.ordinals(column.like(trimmed)) if o not in scored])
+
+        return self._finish(hits, page_url, limit)
+
+    def _finish(self, hits: _Hits, page_url: Optional[str], limit: int) -> List[ScoredGlossary]:
+        """The `limit` best hits after the page bonus, in the service's order."""
+        listed: Set[int] = set()
+        scored = []
+        rest_bonus = 0.0
+        if page_url is not None and not is_blank(page_url):
+            # Score the smaller side (rows on the page, or the rows off it) directly
+            listed, inverted = self._page_matches(page_url)
+            rest_bonus = PAGE_BONUS if inverted else 0.0
+            rows_by_text = self._page_texts(page_url, hits.token_column)
+            scored = hits.scored(listed, rows_by_text, 0.0 if inverted else PAGE_BONUS)
+            scored.sort(key=lambda hit: (-hit[0], hit[1], hit[2], hit[3]))
+
+        # Every other hit, best first, merged with the listed ones
+        results = []
+        rest = hits.ranked(listed)
+        nxt = next(rest, None)
+        i = 0
+        while len(results) < limit:
+            best = scored[i] if i < len(scored) else None
+            if nxt is not None:
+                candidate = (nxt[0] + rest_bonus,) + nxt[1:]
+                if best is None or (-candidate[0], *candidate[1:4]) < (-best[0], *best[1:4]):
+                    best = candidate
+                    nxt = next(rest, None)
+                else:
+                    i += 1
+            elif best is not None:
+                i += 1
+            else:
+                break
+            results.append(ScoredGlossary(best[3], best[0], best[4]))
+        return results
+
+    # --- indexes built on first use ---
+
+    def _field_column(self, name: str) -> Column:
+        if name not in self._fields:
+            idx = FIELD_INDEX[name]
+            self._fields[name] = Column(
+                (fields[idx] for fields in self.rows), lambda text: set(), name in CASE_INSENSITIVE_FIELDS
+            )
+        return self._fields[name]
+
+    def _lang_token_column(self, lang: str) -> Column:
+        """TokenIndexService's multi-language token table for `lang` (empty for non-canonical codes)."""
+        if lang not in self._lang_tokens:
+            if lang in glossary_index.MULTI_LANG_COLUMNS:
+                values = (glossary_index.text_for_lang(fields, lang) for fields in self.rows)
+                self._lang_tokens[lang] = Column(values, lambda text: glossary_index.tokenize_multi_lang(text, lang))
+            else:
+                self._lang_tokens[lang] = Column(("" for _ in self.rows), lambda text: set())
+        return self._lang_tokens[lang]
+
+    def _page_matches(self, page_url: str) -> Tuple[Set[int], bool]:
+        """
+        Ordinals whose pageUrl is a prefix of `page_url` or starts with it, as
+        (ordinals, False); or, when that is most rows (page "/"), the ordinals
+        that do not match, as (ordinals, True).
+        """
+        if page_url in self._page_rows:
+            return self._page_rows[page_url]
+        if self._urls is None:
+            url_field = FIELD_INDEX["pageUrl"]
+            self._urls = {}
+            for ordinal, fields in enumerate(self.rows):
+                self._urls.setdefault(fields[url_field], []).append(ordinal)
+            self._sorted_urls = sorted(self._urls)
+        matches: Set[int] = set()
+        for end in range(len(page_url) + 1):
+            matches.update(self._urls.get(page_url[:end], ()))
+        start = bisect.bisect_left(self._sorted_urls, page_url)
+        for url in self._sorted_urls[start:]:
+            if not url.startswith(page_url):
+                break
+            matches.update(self._urls[url])
+        if len(matches) > len(self.rows) // 2:
+            result = (set(range(len(self.rows))) - matches, True)
+        else:
+            result = (matches, False)
+        self._page_rows[page_url] = result
+        return result
+
+    def _page_texts(self, page_url: str, column: Column) -> Dict[int, List[int]]:
+        """The rows of _page_matches(page_url), grouped by their text id in `column`."""
+        key = (page_url, id(column))
+        if key not in self._page_by_text:
+            rows_by_text: Dict[int, List[int]] = {}
+            text_of_row = column.text_of_row
+            for ordinal in self._page_matches(page_url)[0]:
+                rows_by_text.setdefault(text_of_row[ordinal], []).append(ordinal)
+            self._page_by_text[key] = rows_by_text
+        return self._page_by_text[key]
+
+    def warm(self, langs: Iterable[str]) -> None:
+        """Build the indexes for `langs` now instead of on the first query (e.g. before forking workers)."""
+        for lang in langs:
+            if lang == "ko":
+                self._ko.tokens
+                self._ko.like("")
+                continue
+            self._lang_token_column(lang).tokens
+            name = LANG_FIELDS.get(lang.lower())
+            if name is not None:
+                column = self._field_column(name)
+                column.like("")
+                column.lower("")
+
+
+# (text, lang, page_url, limit)
+Query = Tuple[str, str, Optional[str], int]
+
+
+def run_query(search: GlossarySearch, query: Query) -> List[ScoredGlossary]:
+    text, lang, page_url, limit = query
+    return search.search_by_language(text, lang, page_url, limit)
@@ -0,0 +1,265 @@
+"""
+Template translation for parameterised labels.
+
+Many Korean cells differ only by an artist/group name, a number or a date:
+"방탄소년단 앨범 구매" / "세븐틴 앨범 구매", "3개 남음" / "12개 남음". Each
+variant would be a separate unique text for DeepL. Instead:
+
+    1. Slots are cut out of every text still to send:
+         - known names (see NameIndex), optionally followed by a particle
+         - Latin-script runs ("BTS", "NCT DREAM"), kept as they are
+         - numbers ("3", "2024.05.01"), except a number directly before 월
+           (month names are translated, not copied)
+    2. Texts that share the rest (the template) are collapsed when at least
+       MIN_VARIANTS of them do, e.g. "<v1/> 앨범 구매" and "<v1/>개 남음"
+    3. Each template is translated once per language with DeepL's XML tag
+       handling, which keeps the <vN/> tags in place (and moves them where the
+       target language needs them)
+    4. The slots are filled locally: names with the target-language form from
+       the sheet, numbers and Latin runs unchanged
+
+A template whose translation lost or duplicated a tag, or still contains
+Hangul, is dropped and its variants are translated one by one as before.
+"""
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape, unescape
+
+from sheet_scanner import has_korean
+
+COL_KOREAN = 2
+COL_ENGLISH = 3
+
+# Fewest distinct texts sharing a template before it is translated as one
+MIN_VARIANTS = 3
+MAX_SLOTS = 4
+MAX_NAME_CHARS = 15
+
+# Particles that may follow a name inside a word: "방탄소년단의", "세븐틴과"
+PARTICLES = ("에서", "에게", "으로", "이랑", "하고", "의", "은", "는", "이", "가", "을", "를", "와", "과", "에", "도", "로", "만", "랑")
+
+_HANGUL_WORD = re.compile(r"^[가-힣]+$")
+_LATIN = r"[A-Za-z][A-Za-z0-9&'.\-]*(?: [A-Za-z][A-Za-z0-9&'.\-]*)*"
+_NUMBER = r"(?<![\d.,:/])\d+(?:[.,:/]\d+)*(?![\d]|\s*월)"
+_SLOT_TAG = re.compile(r"<v(\d+)\s*/>")
+_ANY_TAG = re.compile(r"</?[A-Za-z][^>]*>")
+
+Group = Tuple[List[int], str]
+# (kind, source value): kind is "name", "latin" or "number"
+Slot = Tuple[str, str]
+
+
+class NameIndex:
+    """
+    Korean proper nouns known from the sheet, with their form in each column.
+
+    Fed one row at a time while the sheet streams by. A row counts as a name
+    when its `ko` value is a single Hangul word and its English value, free of
+    Hangul, is also used verbatim in at least two other language columns:
+    names are kept romanised across languages ("방탄소년단" -> "BTS" in en, es,
+    ja, ...), ordinary words are not ("품절" -> "Sold Out" / "Agotado").
+
+    translate_remaining.py's English fallback and empty-cell fill copy the
+    English value into other columns too, so a row whose every other filled
+    column repeats the English value is not taken as a name: it cannot be told
+    apart from an ordinary word that was never translated.
+    """
+
+    def __init__(self, cols: Iterable[int]):
+        self.cols = list(cols)
+        self.names: Dict[str, Dict[int, str]] = {}
+        self._pattern: Optional["re.Pattern[str]"] = None
+
+    def add(self, row: Sequence) -> None:
+        if len(row) <= COL_ENGLISH:
+            return
+        ko, english = row[COL_KOREAN], row[COL_ENGLISH]
+        if not isinstance(ko, str) or not isinstance(english, str) or ko in self.names:
+            return
+        if not _HANGUL_WORD.match(ko) or len(ko) > MAX_NAME_CHARS:
+            return
+        if not english.strip() or has_korean(english):
+            return
+        forms = {}
+        for col_idx in self.cols:
+            value = row[col_idx] if col_idx < len(row) else None
+            if isinstance(value, str) and value.strip() and not has_korean(value):
+                forms[col_idx] = value
+        others = [value for col_idx, value in forms.items() if col_idx != COL_ENGLISH]
+        same = sum(value == english for value in others)
+        if same < 2 or same == len(others):
+            return
+        forms[COL_ENGLISH] = english
+        self.names[ko] = forms
+        self._pattern = None
+
+    def form(self, name: str, col_idx: int) -> str:
+        forms = self.names[name]
+        return forms.get(col_idx, forms[COL_ENGLISH])
+
+    @property
+    def pattern(self) -> "re.Pattern[str]":
+        if self._pattern is None:
+            parts = []
+            if self.names:
+                names = "|".join(re.escape(name) for name in sorted(self.names, key=len, reverse=True))
+                particles = "|".join(PARTICLES)
+                parts.append(rf"(?P<name>(?<![가-힣])(?:{names})(?=$|[^가-힣]|(?:{particles})(?:$|[^가-힣])))")
+            parts.append(rf"(?P<latin>{_LATIN})")
+            parts.append(rf"(?P<number>{_NUMBER})")
+            self._pattern = re.compile("|".join(parts))
+        return self._pattern
+
+
+class Template:
+    """One template text and the (rows, text, slots) variants it stands for."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.variants: List[Tuple[List[int], str, List[Slot]]] = []
+        # The (rows, text) group the cost planner sees; set once the variants are known
+        self.group: Optional[Group] = None
+
+    @property
+    def rows(self) -> List[int]:
+        return [row_idx for rows, _, _ in self.variants for row_idx in rows]
+
+    def fill(self, translated: str, col_idx: int, names: NameIndex) -> Optional[List[Tuple[List[int], str, str]]]:
+        """
+        [(rows, source text, translation)] for every variant, or None when the
+        translation did not keep each slot tag exactly once or still has Hangul.
+        """
+        if not translated:
+            return None
+        slots = len(self.variants[0][2])
+        tags = sorted(int(i) for i in _SLOT_TAG.findall(translated))
+        if tags != list(range(1, slots + 1)):
+            return None
+        pieces = _SLOT_TAG.split(translated)
+        literal = pieces[0::2]
+        if any(_ANY_TAG.search(piece) or has_korean(piece) for piece in literal):
+            return None
+        literal = [unescape(piece) for piece in literal]
+        order = [int(i) - 1 for i in pieces[1::2]]
+        filled = []
+        for rows, text, values in self.variants:
+            out = [literal[0]]
+            for slot_idx, piece in zip(order, literal[1:]):
+                kind, value = values[slot_idx]
+                out.append(names.form(value, col_idx) if kind == "name" else value)
+                out.append(piece)
+            filled.append((rows, text, "".join(out).strip()))
+        return filled
+
+
+class TemplateStats:
+    def __init__(self):
+        self.templates = 0
+        self.texts = 0
+        self.failed_templates = 0
+        self.failed = 0
+
+    @property
+    def texts_saved(self) -> int:
+        return (self.texts - self.failed) - (self.templates - self.failed_templates)
+
+    def summary(self) -> str:
+        return (f"Templates: {self.templates} sent for {self.texts} texts "
+                f"({self.texts_saved} API texts saved, {self.failed} sent one by one)")
+
+
+def templatize(text: str, names: NameIndex) -> Optional[Tuple[str, List[Slot]]]:
+    """(template, slots) for a text with at least one slot, or None."""
+    slots: List[Slot] = []
+    out = []
+    pos = 0
+    for match in names.pattern.finditer(text):
+        kind = match.lastgroup
+        slots.append((kind, match.group(kind)))
+        out.append(escape(text[pos:match.start()]))
+        out.append(f"<v{len(slots)}/>")
+        pos = match.end()
+    if not slots or len(slots) > MAX_SLOTS:
+        return None
+    out.append(escape(text[pos:]))
+    template = "".join(out)
+    return (template, slots) if has_korean(template) else None
+
+
+def collapse(groups: List[Group], names: NameIndex) -> Tuple[List[Group], List[Template]]:
+    """
+    Split one column's (rows, text) groups into plain groups and templates
+    shared by at least MIN_VARIANTS texts. Plain groups keep their order.
+    """
+    by_template: Dict[str, Template] = {}
+    parsed = []
+    for rows, text in groups:
+        result = templatize(text, names)
+        parsed.append(result)
+        if result is not None:
+            template, slots = result
+            by_template.setdefault(template, Template(template)).variants.append((rows, text, slots))
+    templates = {key: t for key, t in by_template.items() if len(t.variants) >= MIN_VARIANTS}
+    plain = [group for group, result in zip(groups, parsed) if result is None or result[0] not in templates]
+    for template in templates.values():
+        template.group = (template.rows, template.text)
+    return plain, list(templates.values())
+
+
+def with_templates(groups: Dict[int, List[Group]], templates: Dict[int, List[Template]]) -> Dict[int, List[Group]]:
+    """Plain groups plus one group per template, for the cost planner."""
+    return {col_idx: col_groups + [t.group for t in templates.get(col_idx, [])] for col_idx, col_groups in groups.items()}
+
+
+def split_planned(
+    kept: Dict[int, List[Group]], templates: Dict[int, List[Template]]
+) -> Tuple[Dict[int, List[Group]], Dict[int, List[Template]]]:
+    """Separate the groups the cost planner kept back into plain groups and templates."""
+    by_id = {id(t.group): t for col_templates in templates.values() for t in col_templates}
+    plain = {col_idx: [g for g in col_groups if id(g) not in by_id] for col_idx, col_groups in kept.items()}
+    kept_templates = {col_idx: [by_id[id(g)] for g in col_groups if id(g) in by_id] for col_idx, col_groups in kept.items()}
+    return plain, kept_templates
+
+
+def translate_templates(
+    templates: Dict[int, List[Template]],
+    translate: Callable[[int, List[str]], List[str]],
+    names: NameIndex,
+    stats: TemplateStats,
+    max_texts: int,
+    workers: int = 1,
+) -> Tuple[Dict[int, List[Tuple[List[int], str, str]]], Dict[int, List[Group]]]:
+    """
+    Translate every template with `translate(col_idx, texts)` (which must keep
+    <vN/> tags, e.g. DeepL with tag_handling="xml", and return "" for a
+    failure) in batches of up to `max_texts`, on up to `workers` threads.
+
+    Returns:
+        (filled, leftover): per column, the (rows, source text, translation)
+        of every variant filled from a template, and the (rows, text) groups of
+        variants whose template failed, to be translated one by one
+    """
+    batches = [
+        (col_idx, col_templates[i:i + max_texts])
+        for col_idx, col_templates in templates.items()
+        for i in range(0, len(col_templates), max_texts)
+    ]
+    filled: Dict[int, List[Tuple[List[int], str, str]]] = {col_idx: [] for col_idx in templates}
+    leftover: Dict[int, List[Group]] = {col_idx: [] for col_idx in templates}
+    for col_templates in templates.values():
+        stats.templates += len(col_templates)
+        stats.texts += sum(len(t.variants) for t in col_templates)
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="template") as pool:
+        results = pool.map(lambda batch: translate(batch[0], [t.text for t in batch[1]]), batches)
+        for (col_idx, batch), translations in zip(batches, results):
+            for template, translated in zip(batch, translations):
+                variants = template.fill(translated, col_idx, names)
+                if variants is None:
+                    stats.failed_templates += 1
+                    stats.failed += len(template.variants)
+                    leftover[col_idx].extend((rows, text) for rows, text, _ in template.variants)
+                else:
+                    filled[col_idx].extend(variants)
+    return filled, leftover
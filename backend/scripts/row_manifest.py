@@ -0,0 +1,161 @@
+"""
+Incremental change detection for the translation scripts.
+
+After a successful run, each script saves a manifest to
+`.state/<script name>.manifest.json` containing:
+
+    - the size, mtime and SHA-256 of the sheet it just wrote
+    - a short content hash (key name + all language columns) of every row that
+      needed no more work, packed as 64-bit integers
+
+On the next run:
+
+    - if sheet_db.json is byte-for-byte what the last run wrote and that run
+      left no unfinished rows, there is nothing to do and the script exits
+      before connecting to DeepL or parsing the sheet
+    - otherwise only rows whose hash is not in the manifest (added or edited
+      since the last run, or still unfinished) are scanned
+
+Row hashes ignore position, so inserting or reordering rows in the sheet
+export does not invalidate the rest. Pass --full-scan to ignore the manifest.
+"""
+
+import base64
+import hashlib
+import json
+import os
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Callable, Optional, Sequence
+
+from checkpoint import DEFAULT_STATE_DIR
+
+# 2: row hashes stored as packed 64-bit integers
+MANIFEST_VERSION = 2
+COL_KEY_NAME = 1
+
+# Rows 0-1 are headers
+FIRST_DATA_ROW = 2
+
+
+def manifest_path_for(script_name: str, state_dir: Path = DEFAULT_STATE_DIR) -> Path:
+    return state_dir / f"{Path(script_name).stem}.manifest.json"
+
+
+def row_hash(row: Sequence) -> int:
+    """Short content hash of a row's key name and all language columns."""
+    payload = "\x1f".join(cell if isinstance(cell, str) else json.dumps(cell) for cell in row[COL_KEY_NAME:])
+    return int.from_bytes(hashlib.blake2b(payload.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def file_digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _pack(hashes: array) -> str:
+    return base64.b64encode(hashes.tobytes()).decode("ascii")
+
+
+def _unpack(text: str) -> array:
+    hashes = array("Q")
+    hashes.frombytes(base64.b64decode(text))
+    return hashes
+
+
+class RowManifest:
+    """
+    Row hashes and sheet fingerprint recorded by the last successful run.
+
+    Hashes are kept as a sorted array of 64-bit integers (8 bytes per row), so
+    the manifest stays small next to a streamed sheet. Rows are checked and
+    recorded one at a time while the sheet streams by: `changed()` during the
+    read, `record()` for every row whose final state is known, then `save()`.
+    """
+
+    def __init__(self, path: Path, enabled: bool = True):
+        self.path = Path(path)
+        self.enabled = enabled
+        self.rows = array("Q")
+        self.sheet: Optional[dict] = None
+        self.skipped = 0
+        self._done = array("Q")
+        self._pending = 0
+
+        if enabled and self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    stored = json.load(f)
+            except ValueError:
+                stored = {}
+            if stored.get("version") == MANIFEST_VERSION:
+                self.rows = _unpack(stored.get("rows", ""))
+                self.sheet = stored.get("sheet")
+
+    def sheet_unchanged(self, data_path: Path) -> bool:
+        """True when `data_path` is exactly the file the last successful run wrote and nothing was left unfinished."""
+        if not self.enabled or not self.sheet or self.sheet.get("pending", 1):
+            return False
+        if self.sheet.get("path") != str(Path(data_path).resolve()):
+            return False
+        st = os.stat(data_path)
+        if st.st_size != self.sheet.get("size"):
+            return False
+        if st.st_mtime_ns == self.sheet.get("mtime_ns"):
+            return True
+        # Same size but touched (e.g. re-exported with identical content)
+        return file_digest(data_path) == self.sheet.get("sha256")
+
+    def changed(self, row: Sequence) -> bool:
+        """
+        True if the row is new or differs from the last run.
+
+        An unchanged row needed no more work last time, so it is recorded as
+        done right away and counted in `skipped`.
+        """
+        if not self.enabled or not self.rows:
+            return True
+        h = row_hash(row)
+        i = bisect_left(self.rows, h)
+        if i < len(self.rows) and self.rows[i] == h:
+            self._done.append(h)
+            self.skipped += 1
+            return False
+        return True
+
+    def record(self, row: Sequence, needs_work: Callable[[Sequence], bool]) -> None:
+        """Record the final state of a row for the next run."""
+        if not self.enabled:
+            return
+        if needs_work(row):
+            self._pending += 1
+        else:
+            self._done.append(row_hash(row))
+
+    def save(self, data_path: Path) -> None:
+        """Save the recorded rows plus the fingerprint of the saved sheet."""
+        if not self.enabled:
+            return
+        data_path = Path(data_path)
+        st = os.stat(data_path)
+        done = array("Q", sorted(self._done))
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "sheet": {
+                "path": str(data_path.resolve()),
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+                "sha256": file_digest(data_path),
+                "pending": self._pending,
+            },
+            "rows": _pack(done),
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, self.path)
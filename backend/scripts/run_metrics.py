@@ -0,0 +1,309 @@
+"""
+Run instrumentation for the translation scripts.
+
+A RunMetrics collects, for one run:
+
+    - wall time per phase (connect, load, scan, prepare, translate, save, ...)
+    - per-engine request latency (p50/p90/p95/p99/max), texts, characters,
+      characters per second and failed requests
+    - counters such as Claude retries, time spent waiting on the rate limiter,
+      cells filled per engine and cells deferred by the cost plan
+
+`session()` wraps a script's run: it prints the phase and latency table at the
+end and writes the metrics even when the run fails, to
+
+    .state/<script name>.metrics.json   full detail, one file per script
+    .state/<script name>.prom           Prometheus textfile-collector format
+
+(--metrics-dir writes both somewhere else, e.g. node_exporter's textfile
+directory). With --profile the run also goes through cProfile and
+tracemalloc; the profile is saved next to the metrics as <script name>.prof
+and the top functions and allocation sites are printed.
+"""
+
+import argparse
+import cProfile
+import io
+import json
+import math
+import os
+import pstats
+import re
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from checkpoint import DEFAULT_STATE_DIR
+
+PERCENTILES = (50, 90, 95, 99)
+
+# Upper bounds (seconds) of the Prometheus request latency histogram
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+PROFILE_TOP = 25
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class EngineMetrics:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors = 0
+        self.texts = 0
+        self.chars = 0
+        self.first_start: Optional[float] = None
+        self.last_end: Optional[float] = None
+
+    @property
+    def requests(self) -> int:
+        return len(self.latencies)
+
+    def to_dict(self) -> Dict:
+        ordered = sorted(self.latencies)
+        active = (self.last_end - self.first_start) if self.requests else 0.0
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "texts": self.texts,
+            "chars": self.chars,
+            "active_seconds": round(active, 3),
+            "chars_per_sec": round(self.chars / active, 1) if active else 0.0,
+            "latency_seconds": {
+                **{f"p{p}": round(percentile(ordered, p), 4) for p in PERCENTILES},
+                "max": round(ordered[-1], 4) if ordered else 0.0,
+                "mean": round(sum(ordered) / len(ordered), 4) if ordered else 0.0,
+            },
+        }
+
+
+class RunMetrics:
+    """Phase timings, engine request latencies and counters of one run. Thread-safe."""
+
+    def __init__(self, script_name: str):
+        self.script = Path(script_name).stem
+        self.started_at = time.time()
+        self.status = "running"
+        self.phases: Dict[str, float] = {}
+        self.engines: Dict[str, EngineMetrics] = {}
+        self.counters: Dict[str, float] = {}
+        self._started = time.perf_counter()
+        self._finished: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def seconds(self) -> float:
+        return (self._finished or time.perf_counter()) - self._started
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Add the wall time of the block to phase `name` (phases may repeat)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    @contextmanager
+    def request(self, engine: str, texts: int, chars: int) -> Iterator[None]:
+        """Time one API request; an exception counts it as failed and is re-raised."""
+        started = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            ended = time.perf_counter()
+            with self._lock:
+                m = self.engines.setdefault(engine, EngineMetrics())
+                m.latencies.append(ended - started)
+                m.errors += failed
+                m.texts += texts
+                m.chars += chars
+                m.first_start = started if m.first_start is None else min(m.first_start, started)
+                m.last_end = ended if m.last_end is None else max(m.last_end, ended)
+
+    def count(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set(self, name: str, value: float) -> None:
+        with self._lock:
+            self.counters[name] = value
+
+    def finish(self, status: str) -> None:
+        self.status = status
+        self._finished = time.perf_counter()
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "script": self.script,
+                "started": datetime.fromtimestamp(self.started_at, timezone.utc).isoformat(),
+                "status": self.status,
+                "seconds": round(self.seconds, 3),
+                "phases": {name: round(seconds, 3) for name, seconds in self.phases.items()},
+                "engines": {name: m.to_dict() for name, m in self.engines.items()},
+                "counters": dict(self.counters),
+            }
+
+    def report(self) -> str:
+        data = self.to_dict()
+        lines = [f"Run metrics ({data['status']}, {data['seconds']:.1f}s):"]
+        if data["phases"]:
+            accounted = sum(data["phases"].values())
+            for name, seconds in data["phases"].items():
+                lines.append(f"  {name:<12} {seconds:>9.2f}s {seconds / max(data['seconds'], 1e-9):>6.0%}")
+            lines.append(f"  {'other':<12} {max(0.0, data['seconds'] - accounted):>9.2f}s")
+        for name, m in data["engines"].items():
+            lat = m["latency_seconds"]
+            lines.append(
+                f"  {name}: {m['requests']} requests ({m['errors']} failed), {m['chars']:,} chars, "
+                f"{m['chars_per_sec']:,.0f} chars/s; latency p50 {lat['p50']:.2f}s p95 {lat['p95']:.2f}s "
+                f"p99 {lat['p99']:.2f}s max {lat['max']:.2f}s"
+            )
+        return "\n".join(lines)
+
+    def prometheus(self) -> str:
+        """The metrics in Prometheus text exposition format (for the node_exporter textfile collector)."""
+        data = self.to_dict()
+        script = f'script="{self.script}"'
+        out: List[str] = []
+
+        def metric(name: str, kind: str, help_text: str, samples: List[str]) -> None:
+            out.append(f"# HELP translation_{name} {help_text}")
+            out.append(f"# TYPE translation_{name} {kind}")
+            out.extend(f"translation_{sample}" for sample in samples)
+
+        metric("run_timestamp_seconds", "gauge", "Start time of the last run.",
+               [f"run_timestamp_seconds{{{script}}} {self.started_at:.0f}"])
+        metric("run_duration_seconds", "gauge", "Wall time of the last run.",
+               [f"run_duration_seconds{{{script}}} {data['seconds']}"])
+        metric("run_success", "gauge", "1 if the last run finished without an error.",
+               [f"run_success{{{script}}} {int(data['status'] == 'ok')}"])
+        metric("run_phase_seconds", "gauge", "Wall time per phase of the last run.",
+               [f'run_phase_seconds{{{script},phase="{name}"}} {seconds}' for name, seconds in data["phases"].items()])
+
+        with self._lock:
+            engines = {name: (sorted(m.latencies), m) for name, m in self.engines.items()}
+        samples = []
+        for name, (ordered, m) in engines.items():
+            labels = f'{script},engine="{name}"'
+            cumulative = 0
+            for bound in LATENCY_BUCKETS:
+                while cumulative < len(ordered) and ordered[cumulative] <= bound:
+                    cumulative += 1
+                samples.append(f'request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            samples.append(f'request_duration_seconds_bucket{{{labels},le="+Inf"}} {len(ordered)}')
+            samples.append(f"request_duration_seconds_sum{{{labels}}} {sum(ordered):.4f}")
+            samples.append(f"request_duration_seconds_count{{{labels}}} {len(ordered)}")
+        metric("request_duration_seconds", "histogram", "API request latency per engine in the last run.", samples)
+        metric("request_errors", "gauge", "Failed API requests per engine in the last run.",
+               [f'request_errors{{{script},engine="{name}"}} {m["errors"]}' for name, m in data["engines"].items()])
+        metric("request_chars", "gauge", "Source characters sent per engine in the last run.",
+               [f'request_chars{{{script},engine="{name}"}} {m["chars"]}' for name, m in data["engines"].items()])
+        metric("request_chars_per_second", "gauge", "Source characters per second while the engine was active.",
+               [f'request_chars_per_second{{{script},engine="{name}"}} {m["chars_per_sec"]}'
+                for name, m in data["engines"].items()])
+
+        for name, value in sorted(data["counters"].items()):
+            metric_name = "run_" + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+            metric(metric_name, "gauge", f"{name} in the last run.", [f"{metric_name}{{{script}}} {value}"])
+        return "\n".join(out) + "\n"
+
+    def write(self, directory: Path) -> List[Path]:
+        """Write <script>.metrics.json and <script>.prom to `directory` (atomically). Returns the paths."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        paths = [directory / f"{self.script}.metrics.json", directory / f"{self.script}.prom"]
+        _write_atomic(paths[0], json.dumps(self.to_dict(), indent=2) + "\n")
+        _write_atomic(paths[1], self.prometheus())
+        return paths
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    # The textfile collector must never read a half-written file
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+def _profile_report(profiler: cProfile.Profile, snapshot: tracemalloc.Snapshot, peak: int, path: Path) -> str:
+    profiler.dump_stats(str(path))
+    buffer = io.StringIO()
+    pstats.Stats(profiler, stream=buffer).sort_stats("cumulative").print_stats(PROFILE_TOP)
+    lines = [f"Profile saved to {path} (open with: python -m pstats {path})", buffer.getvalue().rstrip()]
+    lines.append(f"\nPeak traced memory: {peak / 1e6:.1f} MB; top allocation sites still live at the end:")
+    for stat in snapshot.statistics("lineno")[:10]:
+        lines.append(f"  {stat.size / 1e6:8.2f} MB  {stat.count:>9,} blocks  {stat.traceback[0]}")
+    return "\n".join(lines)
+
+
+def add_metrics_arguments(parser: argparse.ArgumentParser) -> None:
+    """Register the instrumentation command-line options."""
+    parser.add_argument("--metrics-dir", type=Path, default=DEFAULT_STATE_DIR,
+                        help="Directory for <script>.metrics.json and <script>.prom (default: .state)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Run under cProfile and tracemalloc and print the hot spots (slower)")
+
+
+@contextmanager
+def session(script_name: str, args: argparse.Namespace) -> Iterator[RunMetrics]:
+    """Collect metrics for the enclosed run; always print and write them at the end."""
+    metrics = RunMetrics(script_name)
+    profiler = None
+    if args.profile:
+        tracemalloc.start()
+        profiler = cProfile.Profile()
+        profiler.enable()
+    status = "failed"
+    try:
+        yield metrics
+        status = "ok"
+    except SystemExit as e:
+        status = "ok" if not e.code else "failed"
+        raise
+    except KeyboardInterrupt:
+        status = "interrupted"
+        raise
+    finally:
+        metrics.finish(status)
+        profile_text = None
+        if profiler is not None:
+            profiler.disable()
+            _, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            args.metrics_dir.mkdir(parents=True, exist_ok=True)
+            profile_text = _profile_report(profiler, snapshot, peak, args.metrics_dir / f"{metrics.script}.prof")
+        print()
+        print(metrics.report())
+        try:
+            paths = metrics.write(args.metrics_dir)
+            print(f"Metrics: {paths[0]}, {paths[1]}")
+        except OSError as e:
+            print(f"WARNING: could not write metrics: {e}")
+        if profile_text:
+            print()
+            print(profile_text)
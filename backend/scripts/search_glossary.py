@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Run the backend glossary search offline (see glossary_search.py).
+
+Three modes:
+
+    - one query, printed as a table
+    - a batch of queries from a file, written as JSON Lines
+    - --check-rows: findability QA. Every glossary row (or only the rows a patch
+      touches) is searched for by its own text in each --langs column, with its
+      own pageUrl; rows that do not come back within --limit are listed and the
+      exit status is 1
+
+Query files hold one Korean query per line, or JSON objects per line:
+{"text": "...", "lang": "en", "pageUrl": "/artist", "limit": 10}
+(lang, pageUrl and limit are optional). Results are written one JSON object per
+query: {"text", "lang", "pageUrl", "results": [{"id", "row", "keyName", "ko",
+"score", "matchType"}, ...]}.
+
+USAGE:
+    python search_glossary.py "앨범 구매"
+    python search_glossary.py --lang en --page-url /shop "album"
+    python search_glossary.py --queries queries.jsonl --output results.jsonl --workers 4
+    python search_glossary.py --check-rows --langs ko,en,ja
+    python search_glossary.py --check-rows --patch ../patches/remaining.patch.jsonl.gz
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import glossary_search
+import sheet_patch
+from glossary_index import FIELD_INDEX, is_blank
+from glossary_search import GlossarySearch, Query, ScoredGlossary
+from sheet_scanner import has_korean
+
+DATA_DIR = Path(__file__).parent.parent / "src" / "main" / "resources" / "data"
+
+# Misses printed before the rest are summarised
+MAX_MISSES_SHOWN = 20
+# Queries handed to a worker process at a time
+CHUNK_SIZE = 500
+
+# Set before the worker processes fork, so they share the indexes copy-on-write
+_SEARCH: Optional[GlossarySearch] = None
+
+
+def _run_chunk(queries: List[Query]) -> List[List[Tuple[int, float, str]]]:
+    return [
+        [(hit.ordinal, hit.score, hit.match_type) for hit in glossary_search.run_query(_SEARCH, query)]
+        for query in queries
+    ]
+
+
+def run_queries(search: GlossarySearch, queries: Sequence[Query], workers: int) -> Dict[Query, List[ScoredGlossary]]:
+    """Run every distinct query once, on `workers` forked processes when there is more than one."""
+    global _SEARCH
+    distinct = list(dict.fromkeys(queries))
+    search.warm({lang for _, lang, _, _ in distinct})
+    if workers <= 1 or len(distinct) < CHUNK_SIZE or "fork" not in multiprocessing.get_all_start_methods():
+        return {query: glossary_search.run_query(search, query) for query in distinct}
+
+    _SEARCH = search
+    chunks = [distinct[i:i + CHUNK_SIZE] for i in range(0, len(distinct), CHUNK_SIZE)]
+    results: Dict[Query, List[ScoredGlossary]] = {}
+    with multiprocessing.get_context("fork").Pool(workers) as pool:
+        for chunk, chunk_results in zip(chunks, pool.imap(_run_chunk, chunks)):
+            for query, hits in zip(chunk, chunk_results):
+                results[query] = [ScoredGlossary(*hit) for hit in hits]
+    _SEARCH = None
+    return results
+
+
+def read_queries(path: Path, lang: str, page_url: Optional[str], limit: int) -> Iterator[Query]:
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.rstrip("\n")
+            if not line.strip():
+                continue
+            if not line.lstrip().startswith("{"):
+                yield (line, lang, page_url, limit)
+                continue
+            try:
+                obj = json.loads(line)
+                yield (obj["text"], obj.get("lang", lang), obj.get("pageUrl", page_url), int(obj.get("limit", limit)))
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"{path}:{line_no}: bad query ({e})") from None
+
+
+def hit_json(search: GlossarySearch, hit: ScoredGlossary) -> dict:
+    return {
+        "id": hit.id,
+        "row": search.sheet_rows[hit.ordinal],
+        "keyName": search.field(hit, "keyName"),
+        "ko": search.field(hit, "ko"),
+        "score": hit.score,
+        "matchType": hit.match_type,
+    }
+
+
+def print_hits(search: GlossarySearch, hits: List[ScoredGlossary]) -> None:
+    if not hits:
+        print("No results")
+        return
+    print(f"{'score':>6}  {'match':<10}  {'row':>7}  {'keyName':<30}  ko")
+    for hit in hits:
+        print(f"{hit.score:>6.1f}  {hit.match_type:<10}  {search.sheet_rows[hit.ordinal]:>7}  "
+              f"{search.field(hit, 'keyName')[:30]:<30}  {search.field(hit, 'ko')[:60]}")
+
+
+def row_queries(
+    search: GlossarySearch, ordinals: Sequence[int], langs: Sequence[str], limit: int, use_page_url: bool
+) -> List[Tuple[int, Query]]:
+    """(ordinal, query) for every row searched by its own text in each of `langs`."""
+    queries = []
+    for ordinal in ordinals:
+        fields = search.rows[ordinal]
+        page_url = fields[FIELD_INDEX["pageUrl"]] if use_page_url else None
+        for lang in langs:
+            field = "ko" if lang == "ko" else glossary_search.LANG_FIELDS[lang]
+            text = fields[FIELD_INDEX[field]]
+            # Untranslated cells are the translation scripts' business, not search's
+            if is_blank(text) or (lang != "ko" and has_korean(text)):
+                continue
+            queries.append((ordinal, (text, lang, page_url, limit)))
+    return queries
+
+
+def check_rows(search: GlossarySearch, args: argparse.Namespace, langs: List[str]) -> int:
+    """Findability QA; returns the number of misses."""
+    ordinals = list(range(len(search)))
+    if args.patch:
+        wanted = set()
+        for path in args.patch:
+            try:
+                wanted.update(sheet_patch.Patch.read(path).rows())
+            except (OSError, ValueError) as e:
+                print(f"ERROR: {e}")
+                sys.exit(1)
+        ordinals = [ordinal for ordinal in ordinals if search.sheet_rows[ordinal] in wanted]
+        print(f"Checking {len(ordinals):,} glossary rows touched by {len(args.patch)} patch(es)")
+
+    started = time.perf_counter()
+    queries = row_queries(search, ordinals, langs, args.limit, not args.no_page_url)
+    results = run_queries(search, [query for _, query in queries], args.workers)
+    elapsed = time.perf_counter() - started
+
+    stats = {lang: {"checked": 0, "first": 0, "found": 0} for lang in langs}
+    misses = []
+    for ordinal, query in queries:
+        lang = query[1]
+        stats[lang]["checked"] += 1
+        rank = next((i for i, hit in enumerate(results[query], 1) if hit.ordinal == ordinal), None)
+        if rank is None:
+            misses.append((ordinal, query, results[query]))
+        else:
+            stats[lang]["found"] += 1
+            stats[lang]["first"] += rank == 1
+
+    print(f"\n{len(queries):,} searches ({len(results):,} distinct) in {elapsed:.2f}s "
+          f"({len(queries) / max(elapsed, 1e-9):,.0f}/s)\n")
+    print(f"  {'lang':<8} {'checked':>9} {'rank 1':>9} {'in top ' + str(args.limit):>10} {'missing':>9}")
+    for lang, s in stats.items():
+        print(f"  {lang:<8} {s['checked']:>9,} {s['first']:>9,} {s['found']:>10,} {s['checked'] - s['found']:>9,}")
+
+    if misses:
+        print(f"\nNot found within the top {args.limit}:")
+        for ordinal, (text, lang, _, _), hits in misses[:MAX_MISSES_SHOWN]:
+            best = f"best: row {search.sheet_rows[hits[0].ordinal]} ({hits[0].score:g})" if hits else "no results"
+            print(f"  row {search.sheet_rows[ordinal]} [{lang}] {text[:50]!r}: {best}")
+        if len(misses) > MAX_MISSES_SHOWN:
+            print(f"  ... and {len(misses) - MAX_MISSES_SHOWN:,} more")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            for ordinal, (text, lang, page_url, _), hits in misses:
+                f.write(json.dumps({
+                    "row": search.sheet_rows[ordinal], "lang": lang, "text": text, "pageUrl": page_url,
+                    "results": [hit_json(search, hit) for hit in hits],
+                }, ensure_ascii=False) + "\n")
+        print(f"\nMisses written to {args.output}")
+    return len(misses)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the backend glossary search offline over sheet_db.json")
+    parser.add_argument("query", nargs="?", help="Search for this text and print the results")
+    parser.add_argument("--sheet", type=Path, default=DATA_DIR / "sheet_db.json", help="Sheet to search")
+    parser.add_argument("--lang", default="ko", help="Language of the query text (default: ko)")
+    parser.add_argument("--page-url", help="Page the query comes from (+15 for entries on that page)")
+    parser.add_argument("--limit", type=int, default=10, help="Results per query (default: 10)")
+    parser.add_argument("--queries", type=Path, help="Run every query in this file (one per line, text or JSON)")
+    parser.add_argument("--check-rows", action="store_true", help="Check that every row is found by its own text")
+    parser.add_argument("--langs", default="ko", help="Columns to check with --check-rows (default: ko)")
+    parser.add_argument("--patch", type=Path, action="append", help="With --check-rows, check only the rows this patch touches")
+    parser.add_argument("--no-page-url", action="store_true", help="With --check-rows, search without the row's pageUrl")
+    parser.add_argument("--output", type=Path, help="Write the query results (or --check-rows misses) as JSON Lines")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes for batches")
+    args = parser.parse_args()
+
+    if sum(bool(mode) for mode in (args.query, args.queries, args.check_rows)) != 1:
+        parser.error("give a query, --queries FILE or --check-rows")
+    langs = [lang.strip() for lang in args.langs.split(",") if lang.strip()]
+    unknown = [lang for lang in langs if lang != "ko" and lang not in glossary_search.LANG_FIELDS]
+    if unknown:
+        parser.error(f"unknown language(s): {', '.join(unknown)}")
+    if not args.sheet.exists():
+        print(f"ERROR: Data file not found: {args.sheet}")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    search = GlossarySearch.from_sheet(args.sheet)
+    print(f"Indexed {len(search):,} glossary rows from {args.sheet} in {time.perf_counter() - started:.1f}s",
+          file=sys.stderr if args.queries and not args.output else sys.stdout)
+
+    if args.check_rows:
+        sys.exit(1 if check_rows(search, args, langs) else 0)
+
+    if args.query:
+        print_hits(search, glossary_search.run_query(search, (args.query, args.lang, args.page_url, args.limit)))
+        return
+
+    try:
+        queries = list(read_queries(args.queries, args.lang, args.page_url, args.limit))
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    started = time.perf_counter()
+    results = run_queries(search, queries, args.workers)
+    elapsed = time.perf_counter() - started
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for query in queries:
+            text, lang, page_url, _ = query
+            out.write(json.dumps({
+                "text": text, "lang": lang, "pageUrl": page_url,
+                "results": [hit_json(search, hit) for hit in results[query]],
+            }, ensure_ascii=False) + "\n")
+    finally:
+        if args.output:
+            out.close()
+    print(f"{len(queries):,} queries ({len(results):,} distinct) in {elapsed:.2f}s "
+          f"({len(queries) / max(elapsed, 1e-9):,.0f}/s)", file=sys.stderr if not args.output else sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
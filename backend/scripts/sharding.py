@@ -0,0 +1,146 @@
+"""
+Deterministic work splitting for the translation scripts (--shard i/n).
+
+With --shard i/n a script still streams the whole sheet (every row feeds the
+same-ko reuse index and the name index for label templates), but only keeps
+the rows shard i owns:
+
+    --shard-by text  (default) by a CRC-32 of the row's Korean text, so every
+                     row sharing a source string lands in the same shard and is
+                     still sent to the APIs once; rows without Korean text go by
+                     row index
+    --shard-by row   by row index
+
+Shards are numbered 1..n and never overlap, so their patches can be merged in
+any order (shards.py merge). A sharded run always writes a patch instead of
+the sheet: --patch-out, or .state/shards/<script>.shard<i>of<n>.patch.jsonl.gz.
+Its journal and metrics get the same shard suffix, so shards can run side by
+side in one checkout.
+
+Each shard can use its own API keys (api_key): <NAME>_SHARD_<i>, then the i-th
+entry of the comma-separated <NAME>S, then <NAME> itself. The patch header
+records which variable was used, never the key.
+
+--budget is the budget of the whole sharded run, so each shard plans with 1/n
+of it. Shards sharing a DeepL key (all n with one DEEPL_API_KEY) also split the
+key's remaining quota between them (deepl_limits); both parts are recorded in
+the patch header.
+"""
+
+import argparse
+import os
+import zlib
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+from checkpoint import DEFAULT_STATE_DIR
+
+SHARD_DIR = DEFAULT_STATE_DIR / "shards"
+SHARD_BY = ("text", "row")
+
+COL_KOREAN = 2
+
+
+class Shard:
+    def __init__(self, index: int, count: int, by: str = "text"):
+        if not 1 <= index <= count:
+            raise ValueError(f"shard {index}/{count} is out of range (use 1/{count} .. {count}/{count})")
+        if by not in SHARD_BY:
+            raise ValueError(f"unknown shard key {by!r} (use one of {', '.join(SHARD_BY)})")
+        self.index = index
+        self.count = count
+        self.by = by
+
+    @classmethod
+    def parse(cls, spec: str, by: str = "text") -> "Shard":
+        """
+        "2/4" -> shard 2 of 4.
+
+        Raises:
+            ValueError: not i/n, or i outside 1..n
+        """
+        index, sep, count = spec.partition("/")
+        if not sep or not index.strip().isdigit() or not count.strip().isdigit():
+            raise ValueError(f"bad shard {spec!r} (expected i/n, e.g. 1/4)")
+        return cls(int(index), int(count), by)
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+    def owns(self, row_idx: int, row: Sequence) -> bool:
+        if self.count == 1:
+            return True
+        text = row[COL_KOREAN] if len(row) > COL_KOREAN else None
+        if self.by == "text" and isinstance(text, str) and text.strip():
+            key = zlib.crc32(text.encode("utf-8"))
+        else:
+            key = row_idx
+        return key % self.count == self.index - 1
+
+    def state_name(self, script: str) -> str:
+        """Script name for the shard's journal and metrics files."""
+        return f"{Path(script).stem}-shard{self.index}of{self.count}"
+
+    def default_patch(self, script: str) -> Path:
+        return SHARD_DIR / f"{Path(script).stem}.shard{self.index}of{self.count}.patch.jsonl.gz"
+
+    def header(self, keys: Dict[str, str]) -> Dict:
+        """Patch header fields identifying the shard (see shards.py merge)."""
+        return {"shard": str(self), "shard_by": self.by, "keys": keys}
+
+
+def api_key(name: str, shard: Optional[Shard]) -> Tuple[Optional[str], str]:
+    """(key, where it came from) for the environment variable `name`, per the module docstring."""
+    if shard is not None:
+        own = f"{name}_SHARD_{shard.index}"
+        if os.environ.get(own):
+            return os.environ[own], own
+        pool = [key.strip() for key in os.environ.get(f"{name}S", "").split(",") if key.strip()]
+        if pool:
+            position = (shard.index - 1) % len(pool)
+            return pool[position], f"{name}S[{position}]"
+    return os.environ.get(name), name
+
+
+def key_users(name: str, shard: Shard) -> int:
+    """How many of the n shards use the same `name` key as `shard`, going by this process's environment."""
+    source = api_key(name, shard)[1]
+    return sum(api_key(name, Shard(i, shard.count, shard.by))[1] == source for i in range(1, shard.count + 1))
+
+
+def deepl_limits(
+    shard: Shard, quota_remaining: Optional[int], budget: Optional[int], key_name: str = "DEEPL_API_KEY"
+) -> Tuple[Optional[int], Optional[int], Dict]:
+    """
+    (quota, budget, patch header fields) for this shard's cost plan.
+
+    The budget is split between all n shards, the quota between the shards
+    using the same DeepL key. None (unlimited) stays None.
+    """
+    users = key_users(key_name, shard)
+    if quota_remaining is not None:
+        quota_remaining //= users
+    if budget is not None:
+        budget //= shard.count
+    return quota_remaining, budget, {"deepl_quota": quota_remaining, "deepl_key_shards": users, "budget": budget}
+
+
+def add_shard_arguments(parser: argparse.ArgumentParser) -> None:
+    """Register --shard / --shard-by."""
+    parser.add_argument("--shard", metavar="I/N",
+                        help="Only work on shard I of N and write a patch (see sharding.py; merge with shards.py)")
+    parser.add_argument("--shard-by", choices=SHARD_BY, default="text",
+                        help="Split by Korean text (default; keeps deduplication) or by row index")
+
+
+def from_args(parser: argparse.ArgumentParser, args: argparse.Namespace) -> Optional[Shard]:
+    """The shard to run, or None; sets args.patch_out to the shard's default patch when unset."""
+    if not args.shard:
+        return None
+    try:
+        shard = Shard.parse(args.shard, args.shard_by)
+    except ValueError as e:
+        parser.error(str(e))
+    if not args.patch_out:
+        args.patch_out = shard.default_patch(parser.prog)
+    return shard
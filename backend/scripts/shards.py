@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Run a translation script as N shards and merge their patches (see sharding.py).
+
+Commands:
+
+    run SCRIPT -n N   start shards 1/N .. N/N of SCRIPT as local processes, each
+                      writing its patch and log to --dir, then merge the patches
+                      if every shard succeeded (unless --no-merge)
+    merge PATCH...    combine shard patches into sheet_db.json
+
+Shards on other machines run the script themselves with --shard I/N and
+--patch-out; copy the patches back and merge them here.
+
+The merge is deterministic: patches are ordered by (script, shard), whatever
+order they are given in. Before anything is written it checks that:
+
+    - no shard is missing or given twice (--allow-partial merges what is there)
+    - no two patches set the same cell to different values; such cells are
+      left alone and reported
+    - every cell still holds the value the patch recorded (as apply_patch.py)
+
+Conflicts stop the merge unless --skip-conflicts. The sheet is backed up into
+the backup store (backup_store.py) before it is written, and per-shard
+statistics (rows, cells per engine, which API key variables were used) are
+printed either way.
+
+USAGE:
+    python shards.py run translate_remaining.py -n 4
+    python shards.py run translate_missing_glossary.py -n 8 --shard-by row -- --batch-size 40
+    python shards.py merge .state/shards/translate_remaining.shard*of4.patch.jsonl.gz
+    python shards.py merge --dry-run host1/*.patch.jsonl.gz host2/*.patch.jsonl.gz
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import backup_store
+import sharding
+import sheet_patch
+import sheet_stream
+
+DATA_DIR = Path(__file__).parent.parent / "src" / "main" / "resources" / "data"
+# The sheet the scripts translate; `run` always merges into it
+DEFAULT_SHEET = DATA_DIR / "sheet_db.json"
+SCRIPTS = ("translate_missing_glossary.py", "translate_remaining.py")
+
+# Conflicts printed before the rest are summarised
+MAX_CONFLICTS_SHOWN = 20
+
+
+def shard_key(patch: sheet_patch.Patch) -> Tuple[str, int, int]:
+    """(script, shard count, shard index); unsharded patches sort last, in the order given."""
+    spec = patch.header.get("shard")
+    if not spec:
+        return (patch.header.get("script", ""), sys.maxsize, sys.maxsize)
+    shard = sharding.Shard.parse(spec)
+    return (patch.header.get("script", ""), shard.count, shard.index)
+
+
+def check_shards(patches: List[sheet_patch.Patch]) -> List[str]:
+    """Problems with the shard sets: duplicates, mixed shard counts and missing shards."""
+    problems = []
+    by_script: Dict[str, Dict[int, List[int]]] = {}
+    for patch in patches:
+        script, count, index = shard_key(patch)
+        if count != sys.maxsize:
+            by_script.setdefault(script, {}).setdefault(count, []).append(index)
+    for script, counts in by_script.items():
+        if len(counts) > 1:
+            problems.append(f"{script}: shards of different splits ({', '.join(f'n={n}' for n in sorted(counts))})")
+        for count, indices in counts.items():
+            for index, times in Counter(indices).items():
+                if times > 1:
+                    problems.append(f"{script}: shard {index}/{count} given {times} times")
+            missing = sorted(set(range(1, count + 1)) - set(indices))
+            if missing:
+                problems.append(f"{script}: missing shard(s) {', '.join(f'{i}/{count}' for i in missing)}")
+    return problems
+
+
+def drop_overlaps(patches: List[sheet_patch.Patch]) -> Tuple[List[sheet_patch.Patch], List[str], int]:
+    """
+    Patches without the cells two of them set to different values.
+
+    Returns:
+        (patches, overlap descriptions, cells set identically by more than one patch)
+    """
+    setters: Dict[Tuple[int, int], List[Tuple[sheet_patch.Patch, sheet_patch.Change]]] = {}
+    for patch in patches:
+        for change in patch.changes:
+            setters.setdefault((change[0], change[1]), []).append((patch, change))
+    overlaps, duplicates = [], 0
+    dropped = set()
+    for (row_idx, col_idx), changes in setters.items():
+        if len(changes) == 1:
+            continue
+        if len({repr(change[3]) for _, change in changes}) == 1:
+            duplicates += len(changes) - 1
+            # Keep the first; the rest would only count as "already applied"
+            dropped.update(id(change) for _, change in changes[1:])
+            continue
+        dropped.update(id(change) for _, change in changes)
+        overlaps.append(f"row {row_idx} col {col_idx}: " + ", ".join(
+            f"{patch.path.name} sets {change[3]!r}" for patch, change in changes))
+    if not dropped:
+        return patches, overlaps, duplicates
+    kept = [
+        sheet_patch.Patch(patch.path, patch.header, [c for c in patch.changes if id(c) not in dropped])
+        for patch in patches
+    ]
+    return kept, overlaps, duplicates
+
+
+def shard_stats(patches: List[sheet_patch.Patch]) -> str:
+    lines = [f"  {'script':<30} {'shard':>6} {'rows':>8} {'cells':>8}  engines / keys"]
+    for patch in patches:
+        engines = Counter(change[4] or "-" for change in patch.changes)
+        keys = patch.header.get("keys") or {}
+        lines.append(
+            f"  {patch.header.get('script', '?'):<30} {patch.header.get('shard', '-'):>6} {len(patch.rows()):>8,} "
+            f"{len(patch.changes):>8,}  {', '.join(f'{e} {n:,}' for e, n in engines.most_common()) or '-'}"
+            + (f"  [{', '.join(f'{api}: {var}' for api, var in keys.items())}]" if keys else "")
+        )
+    total_cells = sum(len(patch.changes) for patch in patches)
+    lines.append(f"  {'total':<30} {'':>6} {len({r for p in patches for r in p.rows()}):>8,} {total_cells:>8,}")
+    return "\n".join(lines)
+
+
+def merge(args: argparse.Namespace) -> int:
+    """Merge shard patches into the sheet; returns the exit status."""
+    if not args.sheet.exists():
+        print(f"ERROR: Data file not found: {args.sheet}")
+        return 1
+    started = time.perf_counter()
+    patches = []
+    for path in args.patches:
+        try:
+            patches.append(sheet_patch.Patch.read(path))
+            shard_key(patches[-1])
+        except (OSError, ValueError) as e:
+            print(f"ERROR: {e}")
+            return 1
+    patches.sort(key=shard_key)
+
+    print(f"{len(patches)} patches:\n{shard_stats(patches)}\n")
+    problems = check_shards(patches)
+    for problem in problems:
+        print(f"{'WARNING' if args.allow_partial else 'ERROR'}: {problem}")
+    if problems and not args.allow_partial:
+        print("Not merging an incomplete shard set (pass --allow-partial to merge what is there)")
+        return 1
+
+    patches, overlaps, duplicates = drop_overlaps(patches)
+    fingerprint = sheet_stream.fingerprint(args.sheet)
+    rows = sorted({row_idx for patch in patches for row_idx in patch.rows()})
+    result = sheet_patch.plan(sheet_stream.read_rows(args.sheet, rows), patches)
+
+    print(f"Merged: {result.applied:,} cells in {len(result.rows):,} rows")
+    print(f"Already done: {result.already + duplicates:,} cells")
+    conflicts = overlaps + [str(conflict) for conflict in result.conflicts]
+    if overlaps:
+        print(f"Set differently by two patches (left alone): {len(overlaps):,} cells")
+    if result.conflicts:
+        print(f"Changed in the sheet since the patch was made: {len(result.conflicts):,} cells")
+    for conflict in conflicts[:MAX_CONFLICTS_SHOWN]:
+        print(f"  {conflict}")
+    if len(conflicts) > MAX_CONFLICTS_SHOWN:
+        print(f"  ... and {len(conflicts) - MAX_CONFLICTS_SHOWN:,} more")
+
+    if args.dry_run:
+        print("\nDRY RUN - nothing written")
+        return 1 if conflicts else 0
+    if conflicts and not args.skip_conflicts:
+        print(f"\nERROR: not writing {args.sheet}; resolve the conflicts or pass --skip-conflicts")
+        return 1
+    if not result.rows:
+        print("\nNothing to write")
+        return 0
+
+    backup = backup_store.BackupStore()
+    print(f"\nBackup: {backup.backup(args.sheet, label='shards merge').describe()}")
+    backup.prune()
+    try:
+        sheet_stream.splice(args.sheet, result.rows, fingerprint)
+    except sheet_stream.SheetChangedError:
+        print(f"ERROR: {args.sheet} changed while the patches were checked; run again")
+        return 1
+    print(f"Wrote {args.sheet} in {time.perf_counter() - started:.2f}s")
+    return 0
+
+
+def run(args: argparse.Namespace) -> int:
+    """Start every shard, wait for all of them, then merge; returns the exit status."""
+    script = Path(__file__).parent / args.script
+    args.dir.mkdir(parents=True, exist_ok=True)
+    procs = []
+    for index in range(1, args.n + 1):
+        shard = sharding.Shard(index, args.n, args.shard_by)
+        patch = args.dir / shard.default_patch(args.script).name
+        log = args.dir / f"{Path(args.script).stem}.shard{index}of{args.n}.log"
+        command = [sys.executable, str(script), "--shard", str(shard), "--shard-by", args.shard_by,
+                   "--patch-out", str(patch)] + args.script_args
+        with open(log, "w", encoding="utf-8") as out:
+            procs.append((shard, patch, log, time.perf_counter(),
+                          subprocess.Popen(command, stdout=out, stderr=subprocess.STDOUT)))
+        print(f"Shard {shard}: started, log {log}")
+
+    failed = 0
+    for shard, _, log, started, proc in procs:
+        code = proc.wait()
+        failed += code != 0
+        status = "ok" if code == 0 else f"FAILED (exit {code}, see {log})"
+        print(f"Shard {shard}: {status} after {time.perf_counter() - started:.1f}s")
+    if failed:
+        print(f"\n{failed} of {args.n} shards failed; rerun them with --resume, then merge")
+        return 1
+    if args.no_merge:
+        return 0
+    print()
+    args.patches = [patch for _, patch, _, _, _ in procs]
+    args.sheet = DEFAULT_SHEET
+    return merge(args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run translation scripts as shards and merge their patches")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    merge_options = argparse.ArgumentParser(add_help=False)
+    merge_options.add_argument("--dry-run", action="store_true", help="Check the patches without writing")
+    merge_options.add_argument("--skip-conflicts", action="store_true",
+                               help="Merge the non-conflicting cells instead of refusing the whole set")
+    merge_options.add_argument("--allow-partial", action="store_true",
+                               help="Merge even if shards are missing or given twice")
+
+    run_cmd = commands.add_parser("run", parents=[merge_options], help="Run N shards locally, then merge",
+                                  usage="%(prog)s SCRIPT -n N [options] [-- script arguments]")
+    run_cmd.add_argument("script", choices=SCRIPTS, help="Script to shard")
+    run_cmd.add_argument("-n", type=int, required=True, help="Number of shards")
+    run_cmd.add_argument("--shard-by", choices=sharding.SHARD_BY, default="text", help="Split by Korean text or row")
+    run_cmd.add_argument("--dir", type=Path, default=sharding.SHARD_DIR, help="Where patches and logs go (default: .state/shards)")
+    run_cmd.add_argument("--no-merge", action="store_true", help="Only run the shards")
+
+    merge_cmd = commands.add_parser("merge", parents=[merge_options], help="Merge shard patches into the sheet")
+    merge_cmd.add_argument("patches", nargs="+", type=Path, help="Shard patch files, in any order")
+    merge_cmd.add_argument("--sheet", type=Path, default=DEFAULT_SHEET,
+                           help="Sheet to merge into (run always uses the scripts' own sheet)")
+    # Everything after "--" is passed to the script
+    argv = sys.argv[1:]
+    script_args = argv[argv.index("--") + 1:] if "--" in argv else []
+    args = parser.parse_args(argv[:len(argv) - len(script_args) - (1 if "--" in argv else 0)])
+    args.script_args = script_args
+
+    if args.command == "run":
+        if args.n < 1:
+            parser.error("-n must be at least 1")
+        sys.exit(run(args))
+    sys.exit(merge(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Cell-level patches for sheet_db.json.
+
+A patch is a JSON Lines file (gzipped when the name ends in .gz): a header line,
+then one change per line as
+
+    [row, col, old, new, engine]
+
+`old` / `new` are the cell values before and after; null stands for a cell past
+the end of a short row. `engine` is where the value came from (deepl, claude,
+cache, reused, english_fallback, fill, ...).
+
+The translation scripts write one with --patch-out instead of rewriting the
+sheet; apply_patch.py applies or reverts patches. Applying is checked against
+the recorded values, cell by cell:
+
+    - current == old: the change is applied
+    - current == new: already applied, skipped
+    - anything else: a conflict (someone edited the cell since the patch was made)
+
+Reverting swaps old and new and walks the patches backwards. Patch.read sorts
+each patch's changes by (row, col), whatever order the file lists them in:
+extending a short row pads it one cell at a time (old is null for every new
+cell), and reverting removes those cells from the end, so both only work
+column by column. Only the touched rows are read and written
+(sheet_stream.read_rows / splice), so the cost grows with the patch, not with
+the sheet.
+"""
+
+import gzip
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+PATCH_FORMAT = "sheet-patch"
+PATCH_VERSION = 1
+
+# (row_idx, col_idx, old, new, engine)
+Change = Tuple[int, int, Any, Any, Optional[str]]
+
+
+def _open(path: Path, mode: str):
+    if Path(path).suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _cell(row: Sequence, col_idx: int) -> Any:
+    return row[col_idx] if col_idx < len(row) else None
+
+
+def diff_rows(
+    old_rows: Mapping[int, Sequence],
+    new_rows: Mapping[int, Sequence],
+    engines: Mapping[Tuple[int, int], str],
+    default_engine: Optional[str] = None,
+) -> List[Change]:
+    """
+    Changes that turn `old_rows` into `new_rows` ({row_idx: row}), sorted by
+    row and column. The engine of each cell is looked up in `engines`
+    ({(row_idx, col_idx): engine}, e.g. from the checkpoint journal).
+    """
+    changes: List[Change] = []
+    for row_idx in sorted(new_rows):
+        old, new = old_rows.get(row_idx, []), new_rows[row_idx]
+        for col_idx in range(max(len(old), len(new))):
+            before, after = _cell(old, col_idx), _cell(new, col_idx)
+            if before != after:
+                changes.append((row_idx, col_idx, before, after, engines.get((row_idx, col_idx), default_engine)))
+    return changes
+
+
+def write_patch(
+    path: Path, changes: Iterable[Change], base: Path, script: str, extra: Optional[Dict[str, Any]] = None
+) -> int:
+    """
+    Write `changes` as a patch against `base`, with `extra` fields (e.g. the
+    shard, see sharding.py) in the header. Returns the number of changes written.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    changes = list(changes)
+    with _open(path, "w") as f:
+        header = {
+            "format": PATCH_FORMAT,
+            "version": PATCH_VERSION,
+            "base": str(Path(base).resolve()),
+            "script": Path(script).name,
+            "created": time.time(),
+            "changes": len(changes),
+            **(extra or {}),
+        }
+        f.write(json.dumps(header, ensure_ascii=False) + "\n")
+        for change in changes:
+            f.write(json.dumps(list(change), ensure_ascii=False) + "\n")
+    return len(changes)
+
+
+class Patch:
+    def __init__(self, path: Path, header: Dict[str, Any], changes: List[Change]):
+        self.path = Path(path)
+        self.header = header
+        self.changes = changes
+
+    @classmethod
+    def read(cls, path: Path) -> "Patch":
+        """
+        Read a patch, its changes sorted by (row, col) (see the module docstring).
+
+        Raises:
+            ValueError: not a sheet patch, an unsupported version, or truncated
+        """
+        with _open(path, "r") as f:
+            header = json.loads(f.readline() or "{}")
+            if header.get("format") != PATCH_FORMAT:
+                raise ValueError(f"{path} is not a sheet patch")
+            if header.get("version") != PATCH_VERSION:
+                raise ValueError(f"{path}: unsupported patch version {header.get('version')}")
+            changes = [tuple(json.loads(line)) for line in f if line.strip()]
+        if len(changes) != header.get("changes", len(changes)):
+            raise ValueError(f"{path}: expected {header['changes']} changes, found {len(changes)} (truncated?)")
+        # Stable, so repeated changes to one cell keep their file order
+        changes.sort(key=lambda change: (change[0], change[1]))
+        return cls(path, header, changes)
+
+    def rows(self) -> List[int]:
+        return sorted({change[0] for change in self.changes})
+
+
+class Conflict:
+    def __init__(self, patch: Patch, change: Change, current: Any):
+        self.patch = patch
+        self.change = change
+        self.current = current
+
+    def __str__(self) -> str:
+        row_idx, col_idx, expected, wanted, _ = self.change
+        return (f"{self.patch.path.name}: row {row_idx} col {col_idx}: expected {expected!r}, "
+                f"found {self.current!r} (patch sets {wanted!r})")
+
+
+class PatchResult:
+    def __init__(self):
+        self.applied = 0
+        self.already = 0
+        self.conflicts: List[Conflict] = []
+        self.rows: Dict[int, List] = {}
+
+
+def _set_cell(row: List, col_idx: int, value: Any) -> bool:
+    """Set a cell, padding short rows with ""; None removes the last cell. False if that is impossible."""
+    if value is None:
+        if col_idx >= len(row):
+            return True
+        if col_idx != len(row) - 1:
+            return False
+        row.pop()
+        return True
+    while len(row) <= col_idx:
+        row.append("")
+    row[col_idx] = value
+    return True
+
+
+def plan(current: Mapping[int, List], patches: Sequence[Patch], revert: bool = False) -> PatchResult:
+    """
+    Apply (or revert) `patches` in order to copies of the `current` rows
+    ({row_idx: row}, see sheet_stream.read_rows) and collect conflicts.
+
+    `result.rows` holds every row with at least one applied change. Conflicting
+    cells are left as they are; the caller decides whether to write anything.
+    """
+    result = PatchResult()
+    work: Dict[int, List] = {}
+    steps = [(patch, change) for patch in patches for change in patch.changes]
+    if revert:
+        steps.reverse()
+    for patch, change in steps:
+        row_idx, col_idx, old, new, engine = change
+        if revert:
+            old, new = new, old
+        if row_idx not in current:
+            result.conflicts.append(Conflict(patch, (row_idx, col_idx, old, new, engine), "<missing row>"))
+            continue
+        row = work.setdefault(row_idx, list(current[row_idx]))
+        value = _cell(row, col_idx)
+        if value == new:
+            result.already += 1
+        elif value == old and _set_cell(row, col_idx, new):
+            result.applied += 1
+            result.rows[row_idx] = row
+        else:
+            result.conflicts.append(Conflict(patch, (row_idx, col_idx, old, new, engine), value))
+    return result
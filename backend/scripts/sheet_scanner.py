@@ -0,0 +1,124 @@
+"""
+Single-pass classification of the target cells in sheet_db.json.
+
+Both translation scripts need the same facts about every row they visit:
+which target cells still contain Korean, which are empty, and which lie past
+the end of a ragged row. `scan()` walks the rows once and stores one status
+byte per cell in a per-column bytearray. Everything else (Phase A fills,
+Phase B / missing-translation lists, counts, dry-run samples) is read from that
+matrix instead of walking `values` again.
+
+Rows are not padded by the scan. A short row is marked SHORT and is only
+extended when a value is actually written to it (`set_cell`). The backend
+skips rows with fewer than 6 cells, so padding every short row would change
+which rows become glossary entries.
+"""
+
+import re
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+# Rows 0-1 are headers
+FIRST_DATA_ROW = 2
+
+# Cell statuses
+TRANSLATED = 0
+KOREAN = 1
+EMPTY = 2
+SHORT = 3  # the row ends before this column
+
+# Any value that needs no more translating when filled in
+BLANK = (EMPTY, SHORT)
+
+# The whole `values` list, or {row_idx: row} for just the rows kept from a streamed sheet
+Rows = Union[Sequence[List], Mapping[int, List]]
+
+_HANGUL = re.compile("[가-힯]")
+_search_hangul = _HANGUL.search
+
+
+def has_korean(text) -> bool:
+    """Check if text contains Korean Hangul characters."""
+    return isinstance(text, str) and _search_hangul(text) is not None
+
+
+def is_empty(text) -> bool:
+    return not isinstance(text, str) or not text.strip()
+
+
+def classify(value) -> int:
+    """Status of a single cell value."""
+    if not isinstance(value, str) or not value.strip():
+        return EMPTY
+    return KOREAN if _search_hangul(value) else TRANSLATED
+
+
+def cell_status(row: Sequence, col_idx: int) -> int:
+    return classify(row[col_idx]) if col_idx < len(row) else SHORT
+
+
+def set_cell(row: List, col_idx: int, value) -> None:
+    """Write a cell, padding a ragged row with empty strings first."""
+    if col_idx >= len(row):
+        row.extend([""] * (col_idx + 1 - len(row)))
+    row[col_idx] = value
+
+
+class SheetScan:
+    """Status of `cols` for each scanned row; `status[col][pos]` belongs to row `rows[pos]`."""
+
+    def __init__(self, values: Rows, rows: List[int], cols: Sequence[int]):
+        self.values = values
+        self.rows = rows
+        self.cols = tuple(cols)
+        self.status: Dict[int, bytearray] = {col: bytearray(len(rows)) for col in self.cols}
+
+    def count(self, col_idx: int, status: int = KOREAN) -> int:
+        return self.status[col_idx].count(status)
+
+    def positions(self, col_idx: int, statuses: Iterable[int] = (KOREAN,)) -> List[int]:
+        wanted = set(statuses)
+        return [pos for pos, s in enumerate(self.status[col_idx]) if s in wanted]
+
+    def cells(self, col_idx: int, status: int = KOREAN) -> List[Tuple[int, str]]:
+        """(row_idx, text) for every scanned cell of `col_idx` with `status`."""
+        column = self.status[col_idx]
+        rows, values = self.rows, self.values
+        if status not in column:
+            return []
+        return [(rows[pos], values[rows[pos]][col_idx]) for pos, s in enumerate(column) if s == status]
+
+    def by_row(self, status: int = KOREAN) -> Iterator[Tuple[int, List[Tuple[int, str]]]]:
+        """Yield (row_idx, [(col_idx, text), ...]) for rows with at least one cell in `status`."""
+        columns = [(col, self.status[col]) for col in self.cols]
+        for pos, row_idx in enumerate(self.rows):
+            hits = [(col, self.values[row_idx][col]) for col, column in columns if column[pos] == status]
+            if hits:
+                yield row_idx, hits
+
+    def update(self, pos: int, col_idx: int, value) -> None:
+        """Write `value` to the cell at scan position `pos` and reclassify it."""
+        set_cell(self.values[self.rows[pos]], col_idx, value)
+        self.status[col_idx][pos] = classify(value)
+
+
+def scan(values: Rows, cols: Sequence[int], rows: Optional[Iterable[int]] = None) -> SheetScan:
+    """Classify `cols` of every row in `rows` (default: all data rows of a `values` list) in one pass."""
+    rows = list(rows) if rows is not None else list(range(FIRST_DATA_ROW, len(values)))
+    result = SheetScan(values, rows, cols)
+    columns = [(col, result.status[col]) for col in result.cols]
+    search = _search_hangul
+
+    for pos, row_idx in enumerate(rows):
+        row = values[row_idx]
+        width = len(row)
+        for col, column in columns:
+            if col >= width:
+                column[pos] = SHORT
+                continue
+            cell = row[col]
+            if not isinstance(cell, str) or not cell.strip():
+                column[pos] = EMPTY
+            elif search(cell):
+                column[pos] = KOREAN
+            # TRANSLATED is the bytearray's zero default
+    return result
@@ -0,0 +1,468 @@
+"""
+Streaming reader and writer for sheet_db.json.
+
+`json.load` builds every row of the sheet as Python lists, and
+`json.dump(..., indent=2)` builds the whole output again before the first byte
+is written. Both grow with the sheet. Here:
+
+    - SheetReader yields the rows of `values` one at a time; the file is read
+      in 1 MiB chunks and each row is decoded with the C JSON scanner
+    - rewrite() streams the sheet from disk, passes every row through a
+      callback, and writes the result to a temp file that is fsynced and
+      renamed over the original (same atomicity as checkpoint.atomic_write_json)
+    - splice() replaces only the given rows: the file is memory-mapped, the
+      rows are located by their indent=2 layout, and every other byte is copied
+      through without being parsed; read_rows() reads rows the same way
+
+The output is byte-for-byte what `json.dump(data, f, ensure_ascii=False,
+indent=2)` writes, so switching between the two never shows up in a diff.
+
+The scripts keep only the rows they will change ({row_idx: row}); every other
+row passes through without being kept.
+
+splice() and read_rows() only parse the rows they touch. They find them
+through a sparse index of row offsets (RowMarks, in .state/), so once the index
+exists, a small splice costs the touched rows plus a byte copy of the file. A
+sheet that is not in json.dump(indent=2) layout (checked on every touched row)
+falls back to the streaming parser.
+"""
+
+import json
+import mmap
+import os
+import re
+import tempfile
+from bisect import bisect_left, bisect_right
+from json.encoder import encode_basestring
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, TextIO, Tuple
+
+from checkpoint import DEFAULT_STATE_DIR, atomic_write_json
+
+CHUNK_CHARS = 1 << 20
+COPY_BYTES = 8 << 20
+SKIP_BYTES = 256 << 10
+
+# indent=2 layout: rows of "values" start and end on lines indented by exactly four spaces
+_VALUES_START = b'\n  "values": ['
+_ROW_MARK = re.compile(rb"\n    (?! )|\n  \]")
+
+Span = Tuple[int, int, List]
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_decoder = json.JSONDecoder()
+
+
+class SheetChangedError(RuntimeError):
+    """The sheet on disk changed between reading it and writing the result."""
+
+
+def fingerprint(path: Path) -> Tuple[int, int]:
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+class SheetReader:
+    """
+    Incremental parser for a sheet_db.json object.
+
+    `rows()` yields (row_idx, row) for every element of "values". The other
+    top-level members ("range", "majorDimension", ...) end up in `meta`, in
+    file order. `row_count` is set once the rows have been consumed.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.fingerprint = fingerprint(self.path)
+        self.meta: Dict[str, Any] = {}
+        self.keys: List[str] = []
+        self.row_count = 0
+
+    def rows(self) -> Iterator[Tuple[int, List]]:
+        for kind, key, value in self.events():
+            if kind == "row":
+                yield key, value
+
+    def events(self) -> Iterator[Tuple[str, Any, Any]]:
+        """
+        Yield ("member", key, value) for top-level members, ("values", None, None)
+        where "values" starts, ("row", row_idx, row) for each row, and
+        ("end", None, None) after the last row.
+        """
+        with open(self.path, "r", encoding="utf-8") as f:
+            parser = _Parser(f)
+            parser.expect("{")
+            if parser.peek() == "}":
+                return
+            while True:
+                key = parser.value()
+                if not isinstance(key, str):
+                    raise ValueError(f"{self.path}: expected a member name, got {key!r}")
+                parser.expect(":")
+                self.keys.append(key)
+                if key == "values":
+                    yield "values", None, None
+                    parser.expect("[")
+                    if parser.peek() == "]":
+                        parser.expect("]")
+                    else:
+                        while True:
+                            yield "row", self.row_count, parser.value()
+                            self.row_count += 1
+                            if parser.expect(",", "]") == "]":
+                                break
+                    yield "end", None, None
+                else:
+                    self.meta[key] = parser.value()
+                    yield "member", key, self.meta[key]
+                if parser.expect(",", "}") == "}":
+                    return
+
+
+class _Parser:
+    """Buffered tokenizer over a text file; keeps at most about one chunk plus one value in memory."""
+
+    def __init__(self, f: TextIO):
+        self.f = f
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(CHUNK_CHARS)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _skip_whitespace(self) -> None:
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or not self._fill():
+                return
+
+    def peek(self) -> str:
+        self._skip_whitespace()
+        return self.buf[self.pos] if self.pos < len(self.buf) else ""
+
+    def expect(self, *tokens: str) -> str:
+        token = self.peek()
+        if token not in tokens:
+            raise ValueError(f"expected {' or '.join(tokens)} at offset {self.pos}, got {token or 'end of file'!r}")
+        self.pos += 1
+        return token
+
+    def value(self) -> Any:
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+                # A number (or literal) at the very end of the buffer may continue in the next chunk
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except ValueError:
+                if self.eof:
+                    raise
+            if not self._fill():
+                value, self.pos = _decoder.raw_decode(self.buf, self.pos)
+                return value
+
+
+def _encode(value: Any, indent: str) -> str:
+    """json.dumps(value, ensure_ascii=False, indent=2) for a value nested at `indent`."""
+    if isinstance(value, str):
+        return encode_basestring(value)
+    text = json.dumps(value, ensure_ascii=False, indent=2)
+    return text.replace("\n", "\n" + indent)
+
+
+def _encode_row(row: Any) -> str:
+    if not isinstance(row, list):
+        return _encode(row, "    ")
+    if not row:
+        return "[]"
+    cells = ",\n      ".join(_encode(cell, "      ") for cell in row)
+    return f"[\n      {cells}\n    ]"
+
+
+def check_unchanged(path: Path, expected: Optional[Tuple[int, int]]) -> None:
+    """Raise SheetChangedError unless `path` still has the fingerprint() taken when it was read."""
+    if expected is not None and fingerprint(path) != expected:
+        raise SheetChangedError(f"{path} changed on disk during the run; not overwriting it (rerun with --resume)")
+
+
+def _replace(path: Path, write: Callable[[Any], None], mode: str) -> None:
+    """Call `write(out)` on a temp file next to `path`, fsync it, then rename it over `path`."""
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, mode, encoding="utf-8" if "b" not in mode else None) as out:
+            write(out)
+            out.flush()
+            os.fsync(out.fileno())
+        os.chmod(tmp_name, path.stat().st_mode & 0o777)
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+def rewrite(
+    path: Path,
+    transform: Callable[[int, List], List],
+    expected: Optional[Tuple[int, int]] = None,
+) -> int:
+    """
+    Stream `path` through `transform(row_idx, row) -> row` into a temp file and
+    rename it over `path`. Returns the number of rows written.
+
+    Raises:
+        SheetChangedError: `expected` (a fingerprint() taken when the sheet was
+            first read) no longer matches the file
+    """
+    path = Path(path)
+    check_unchanged(path, expected)
+    reader = SheetReader(path)
+
+    def write(out: TextIO) -> None:
+        out.write("{")
+        first_member = True
+        first_row = True
+        for kind, key, value in reader.events():
+            if kind in ("member", "values"):
+                out.write("\n  " if first_member else ",\n  ")
+                first_member = False
+                name = "values" if kind == "values" else key
+                out.write(encode_basestring(name) + ": ")
+                if kind == "member":
+                    out.write(_encode(value, "  "))
+                else:
+                    out.write("[")
+            elif kind == "row":
+                out.write("\n    " if first_row else ",\n    ")
+                first_row = False
+                out.write(_encode_row(transform(key, value)))
+            elif kind == "end":
+                out.write("]" if first_row else "\n  ]")
+        out.write("}" if first_member else "\n}")
+
+    _replace(path, write, "w")
+    return reader.row_count
+
+
+class RowMarks:
+    """
+    Sparse index of where rows start: (row_idx, offset of the newline before
+    the row) about every SKIP_BYTES, saved as .state/<sheet>.rows.json and only
+    trusted while the sheet's fingerprint matches. Marks are added as blocks of
+    rows are skipped; splice() shifts them past the rows it rewrote and saves
+    them under the new fingerprint, so the next splice can seek straight to
+    its rows.
+    """
+
+    def __init__(self, path: Path, state_dir: Path = DEFAULT_STATE_DIR):
+        self.sheet = Path(path).resolve()
+        self.path = Path(state_dir) / f"{self.sheet.stem}.rows.json"
+        self.marks: List[Tuple[int, int]] = []
+        self.dirty = False
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("sheet") == str(self.sheet) and tuple(data.get("fingerprint", ())) == fingerprint(self.sheet):
+            self.marks = [tuple(mark) for mark in data["marks"]]
+
+    def nearest(self, row_idx: int) -> Optional[Tuple[int, int]]:
+        """The last mark at or before `row_idx`."""
+        i = bisect_right(self.marks, (row_idx, float("inf"))) - 1
+        return self.marks[i] if i >= 0 else None
+
+    def add(self, row_idx: int, offset: int) -> None:
+        i = bisect_left(self.marks, (row_idx, 0))
+        if i == len(self.marks) or self.marks[i][0] != row_idx:
+            self.marks.insert(i, (row_idx, offset))
+            self.dirty = True
+
+    def shift(self, edits: List[Tuple[int, int]]) -> None:
+        """Move the marks after each rewritten span; `edits` is [(end offset, size change)] in file order."""
+        shifted = []
+        delta = 0
+        edits_iter = iter(edits)
+        edit = next(edits_iter, None)
+        for row_idx, offset in self.marks:
+            while edit is not None and edit[0] <= offset:
+                delta += edit[1]
+                edit = next(edits_iter, None)
+            shifted.append((row_idx, offset + delta))
+        self.marks = shifted
+        self.dirty = True
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_json(self.path, {
+            "sheet": str(self.sheet),
+            "fingerprint": list(fingerprint(self.sheet)),
+            "marks": [list(mark) for mark in self.marks],
+        })
+        self.dirty = False
+
+
+def _skip_rows(mm: Any, pos: int, row_idx: int, target: int, marks: RowMarks) -> Tuple[int, int]:
+    """
+    Jump over whole blocks of rows that end before `target`, counting row
+    starts with bytes.count instead of walking them, and mark each block
+    boundary. `pos` must be between rows.
+    Returns the new (pos, row_idx), or (-1, -1) if a block is not in the layout.
+    """
+    while True:
+        boundary = mm.find(b"\n    [", pos + SKIP_BYTES)
+        if boundary < 0:
+            return pos, row_idx
+        block = mm[pos:boundary]
+        starts = block.count(b"\n    [")
+        if row_idx + starts >= target or b"\n  ]" in block:
+            return pos, row_idx
+        ends = block.count(b"\n    ]")
+        # Every line indented by exactly four spaces must open or close a list row
+        lines = block.count(b"\n    ") - block.count(b"\n     ")
+        if starts - block.count(b"\n    []") != ends or lines != starts + ends:
+            return -1, -1
+        pos, row_idx = boundary, row_idx + starts
+        marks.add(row_idx + 1, pos)
+
+
+def _locate(mm: Any, wanted: Iterable[int], marks: RowMarks) -> Optional[Dict[int, Span]]:
+    """
+    {row_idx: (start, end, row)} for the wanted rows that exist, found by the
+    indent=2 layout without parsing the rows in between. None when the file is
+    not in that layout or a touched row does not re-encode to the same bytes.
+    """
+    start = mm.find(_VALUES_START)
+    if start < 0:
+        return None
+    spans: Dict[int, Span] = {}
+    pos = start + len(_VALUES_START)
+    if mm[pos:pos + 1] == b"]":
+        return spans
+    row_idx = -1
+    for target in sorted(set(wanted)):
+        if target <= row_idx:
+            continue
+        mark = marks.nearest(target)
+        if mark is not None and mark[0] > row_idx + 1:
+            if mm[mark[1]:mark[1] + 6] != b"\n    [":
+                return None
+            row_idx, pos = mark[0] - 1, mark[1]
+        pos, row_idx = _skip_rows(mm, pos, row_idx, target, marks)
+        if pos < 0:
+            return None
+        row_start = -1
+        for match in _ROW_MARK.finditer(mm, pos):
+            if match.end() - match.start() == 4:
+                return spans  # "\n  ]" closes "values"
+            at = match.end()
+            token = mm[at:at + 1]
+            if token == b"[" and row_start < 0:
+                row_idx += 1
+                if mm[at:at + 2] == b"[]":
+                    end = at + 2
+                else:
+                    row_start = at
+                    continue
+            elif token == b"]" and row_start >= 0:
+                at, end, row_start = row_start, at + 1, -1
+            else:
+                return None
+            if row_idx == target:
+                raw = mm[at:end]
+                row = json.loads(raw)
+                if _encode_row(row).encode("utf-8") != raw:
+                    return None
+                spans[row_idx] = (at, end, row)
+                pos = end
+                break
+        else:
+            return spans
+    return spans
+
+
+def _mapped(path: Path, f: Any) -> Optional[Any]:
+    try:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:
+        return None  # empty file
+
+
+def read_rows(path: Path, row_indices: Iterable[int]) -> Dict[int, List]:
+    """{row_idx: row} for the given rows that exist in the sheet; only those rows are parsed."""
+    path = Path(path)
+    wanted = set(row_indices)
+    marks = RowMarks(path)
+    with open(path, "rb") as f:
+        mm = _mapped(path, f)
+        if mm is not None:
+            with mm:
+                spans = _locate(mm, wanted, marks)
+            if spans is not None:
+                marks.save()
+                return {row_idx: row for row_idx, (_, _, row) in spans.items()}
+    return {row_idx: row for row_idx, row in SheetReader(path).rows() if row_idx in wanted}
+
+
+def splice(path: Path, rows: Mapping[int, List], expected: Optional[Tuple[int, int]] = None) -> None:
+    """
+    Replace the given rows ({row_idx: row}) of `path` and rename the result over
+    it atomically. Only those rows are parsed and encoded; the bytes in between
+    are copied. Every row must already exist (see read_rows).
+
+    Raises:
+        SheetChangedError: see rewrite()
+        IndexError: a row index is past the end of the sheet
+    """
+    path = Path(path)
+    check_unchanged(path, expected)
+    if not rows:
+        return
+    marks = RowMarks(path)
+    edits: List[Tuple[int, int]] = []
+    with open(path, "rb") as f:
+        mm = _mapped(path, f)
+        spans = None
+        if mm is not None:
+            with mm:
+                spans = _locate(mm, rows, marks)
+                if spans is not None:
+                    missing = sorted(set(rows) - set(spans))
+                    if missing:
+                        raise IndexError(f"{path}: row {missing[0]} is past the end of the sheet")
+
+                    def write(out: Any) -> None:
+                        with memoryview(mm) as view:
+                            pos = 0
+                            for row_idx in sorted(spans):
+                                start, end, _ = spans[row_idx]
+                                _copy(view, out, pos, start)
+                                encoded = _encode_row(rows[row_idx]).encode("utf-8")
+                                out.write(encoded)
+                                edits.append((end, len(encoded) - (end - start)))
+                                pos = end
+                            _copy(view, out, pos, len(view))
+
+                    _replace(path, write, "wb")
+    if spans is None:
+        rewrite(path, lambda row_idx, row: rows.get(row_idx, row))
+        return
+    marks.shift(edits)
+    marks.save()
+
+
+def _copy(view: memoryview, out: Any, start: int, end: int) -> None:
+    for offset in range(start, end, COPY_BYTES):
+        out.write(view[offset:min(end, offset + COPY_BYTES)])
@@ -0,0 +1,112 @@
+"""
+In-run deduplication of Korean source strings.
+
+The same Korean label ("구매하기", artist names, button text, ...) appears on many
+pageUrl rows. Instead of sending every copy to DeepL/Claude, the scripts:
+
+    1. Copy an existing translation from another row with the same `ko` value
+       (no API call at all)
+    2. Collapse the remaining cells into one request per unique source string
+       and fan the result back out to every row that uses it
+"""
+
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from sheet_scanner import has_korean
+
+COL_KOREAN = 2
+COL_ENGLISH = 3
+
+
+class DedupStats:
+    """Counts how many cells and API characters deduplication saved."""
+
+    def __init__(self):
+        self.cells = 0
+        self.unique = 0
+        self.reused = 0
+        self.chars_saved = 0
+
+    def summary(self) -> str:
+        return (
+            f"Dedup: {self.cells} cells -> {self.unique} unique source strings, "
+            f"{self.reused} copied from rows with the same Korean text, "
+            f"{self.chars_saved:,} API characters saved"
+        )
+
+
+class ReuseIndex:
+    """
+    Per-column map from each Korean `ko` value to a translation already present
+    in that column, built one row at a time (so it can be fed while the sheet
+    streams by). The first row with a usable translation wins.
+
+    Only real translations count: empty cells, cells still containing Hangul,
+    and (for non-English columns) cells that merely repeat the row's English
+    value are skipped.
+    """
+
+    def __init__(self, cols: Iterable[int]):
+        self.columns: Dict[int, Dict[str, str]] = {col: {} for col in cols}
+
+    def add(self, row: Sequence) -> None:
+        if len(row) <= COL_KOREAN:
+            return
+        ko = row[COL_KOREAN]
+        if not ko:
+            return
+        english = row[COL_ENGLISH] if len(row) > COL_ENGLISH else None
+        for col_idx, index in self.columns.items():
+            if len(row) <= col_idx or ko in index:
+                continue
+            value = row[col_idx]
+            if not isinstance(value, str) or not value.strip() or has_korean(value):
+                continue
+            if col_idx != COL_ENGLISH and value == english:
+                continue
+            index[ko] = value
+
+
+def reuse_existing(
+    values: Sequence[Sequence[str]],
+    entries: List[Tuple[int, str]],
+    index: Dict[str, str],
+    stats: DedupStats,
+) -> Tuple[List[Tuple[int, str]], List[Tuple[int, str]]]:
+    """
+    Split `(row_idx, text)` entries into ones that can be copied from another row
+    with the same `ko` value and ones that still need translating.
+
+    `index` is the entries' column of a ReuseIndex; `values` only has to hold
+    the entries' rows.
+
+    Returns:
+        (reused, remaining) where `reused` holds (row_idx, translation) pairs
+    """
+    if not entries:
+        return [], entries
+    reused, remaining = [], []
+    for row_idx, text in entries:
+        row = values[row_idx]
+        ko = row[COL_KOREAN] if len(row) > COL_KOREAN else ""
+        if ko in index:
+            reused.append((row_idx, index[ko]))
+            stats.chars_saved += len(text)
+        else:
+            remaining.append((row_idx, text))
+    stats.reused += len(reused)
+    return reused, remaining
+
+
+def group_by_source(entries: List[Tuple[int, str]], stats: DedupStats) -> List[Tuple[List[int], str]]:
+    """
+    Collapse `(row_idx, text)` entries into `(row_indices, text)` groups, one per
+    unique source text, in first-seen order.
+    """
+    groups: Dict[str, List[int]] = {}
+    for row_idx, text in entries:
+        groups.setdefault(text, []).append(row_idx)
+    stats.cells += len(entries)
+    stats.unique += len(groups)
+    stats.chars_saved += sum(len(text) * (len(rows) - 1) for text, rows in groups.items())
+    return [(rows, text) for text, rows in groups.items()]
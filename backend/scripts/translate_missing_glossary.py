@@ -14,27 +14,70 @@ USAGE:
 
     Optional arguments:
         --dry-run    : Show what would be translated without making changes
-        --batch-size : Number of texts to translate in one API call (default: 50)
+        --batch-size : Maximum number of texts in one API call (default: 50, DeepL's limit)
+        --no-cache   : Skip the on-disk translation memory (see translation_memory.py)
+        --resume     : Replay the checkpoint journal of an interrupted run
+        --full-scan  : Scan every row instead of only rows changed since the last run
+        --budget     : Max DeepL characters to send this run (see cost_planner.py)
+        --patch-out  : Write the changed cells to a patch file instead of updating the
+                       sheet (see sheet_patch.py; apply it with apply_patch.py)
+        --no-templates: Send texts that differ only by a name or number one by one
+        --shard I/N  : Only translate shard I of N and write a patch (see sharding.py;
+                       merge the shards' patches with shards.py)
+        --shard-by   : Split shards by Korean text (default) or by row index
+        --metrics-dir: Where to write the run metrics (default: .state, see run_metrics.py)
+        --profile    : Run under cProfile and tracemalloc and print the hot spots
+
+    Identical Korean strings are sent once per target language and the result
+    is written to every row that uses them (see source_dedup.py). Strings that
+    differ only by a name or number ("<name> 앨범 구매") are translated once per
+    language as a label template (see label_templates.py).
 
 BEHAVIOR:
-    - Creates a backup file before modifying: sheet_db.json.backup.TIMESTAMP
-    - Processes all rows starting from index 2 (after header rows)
+    - Backs up the sheet before modifying it, into a compressed, deduplicated store
+      outside the resources tree (see backup_store.py; restore with backups.py)
+    - Processes rows starting from index 2 (after header rows); rows unchanged since
+      the last successful run are skipped (see row_manifest.py)
     - Detects Korean text in target language columns using Unicode range check
-    - Translates in batches for efficiency
+    - Reuses earlier translations from the translation memory before calling DeepL
+    - Plans the DeepL characters per language before any translation request; if they
+      exceed the remaining quota or --budget, the most important cells go first and
+      the rest are left for a later run
+    - Translates in batches packed by text count and length; the batch size shrinks
+      after a failed request and grows back after successful ones (see batch_planner.py)
     - Shows progress and summary statistics
     - Logs errors for failed translations (continues processing)
+    - Journals every translated cell after each batch (see checkpoint.py)
+    - Streams the sheet instead of loading it whole (see sheet_stream.py): only rows
+      with missing translations are kept in memory, and only the rows that changed
+      are spliced into a temp file that replaces the sheet atomically
+    - Times each phase and every DeepL request; writes the metrics as JSON and
+      Prometheus textfile format (see run_metrics.py)
 """
 
-import json
 import os
-import re
 import sys
-import shutil
-from datetime import datetime
+from collections import deque
 from pathlib import Path
-from typing import Dict, List, Tuple
+from itertools import islice
+from typing import Dict, Iterable, List, Optional
 import argparse
 
+import backup_store
+import checkpoint
+import cost_planner
+import label_templates
+import row_manifest
+import run_metrics
+import sharding
+import sheet_patch
+import sheet_stream
+from batch_planner import BatchPlanner, DEEPL_LIMITS
+import sheet_scanner
+import source_dedup
+import translation_memory
+from sheet_scanner import has_korean
+
 try:
     import deepl
 except ImportError:
@@ -72,62 +115,59 @@ LANG_NAMES = {
 }
 
 
-def has_korean(text: str) -> bool:
-    """Check if text contains Korean Hangul characters."""
-    if not text or not isinstance(text, str):
-        return False
-    return bool(re.search(r'[\uAC00-\uD7AF]', text))
+def row_needs_translation(row: List[str]) -> bool:
+    """Check if any target column of a row still contains Korean text."""
+    return any(col_idx < len(row) and has_korean(row[col_idx]) for col_idx in DEEPL_LANG_MAP.keys())
 
 
-def find_missing_translations(data: Dict) -> Dict[int, List[Tuple[int, str]]]:
+def find_missing_translations(
+    values: sheet_scanner.Rows, rows: Optional[Iterable[int]] = None
+) -> sheet_scanner.SheetScan:
     """
-    Find all entries where target columns contain Korean text.
+    Classify every target cell in one pass (see sheet_scanner.py).
+
+    Args:
+        values: The `values` list, or {row_idx: row} for the rows kept from a streamed sheet
+        rows: Row indices to check (default: every data row of a `values` list)
 
     Returns:
-        Dict mapping row_index to list of (col_index, korean_text) tuples
+        Scan whose KOREAN cells are the missing translations
     """
-    missing = {}
-    values = data.get("values", [])
-
-    # Start from index 2 (skip header rows)
-    for row_idx in range(2, len(values)):
-        row = values[row_idx]
-        row_missing = []
-
-        # Check each target language column
-        for col_idx in DEEPL_LANG_MAP.keys():
-            if col_idx < len(row):
-                text = row[col_idx]
-                if has_korean(text):
-                    row_missing.append((col_idx, text))
+    return sheet_scanner.scan(values, list(DEEPL_LANG_MAP.keys()), rows)
 
-        if row_missing:
-            missing[row_idx] = row_missing
 
-    return missing
+def create_backup(file_path: Path) -> backup_store.BackupResult:
+    """Back up the original file into the backup store and apply its retention policy."""
+    store = backup_store.BackupStore()
+    result = store.backup(file_path, label=Path(__file__).stem)
+    store.prune()
+    return result
 
 
-def create_backup(file_path: Path) -> Path:
-    """Create a timestamped backup of the original file."""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_path = file_path.with_suffix(f".json.backup.{timestamp}")
-    shutil.copy2(file_path, backup_path)
-    return backup_path
-
-
-def translate_batch(translator: deepl.Translator, texts: List[str], target_lang: str) -> List[str]:
+def translate_batch(
+    translator: deepl.Translator,
+    texts: List[str],
+    target_lang: str,
+    metrics: run_metrics.RunMetrics,
+    tag_handling: Optional[str] = None,
+) -> List[str]:
     """
     Translate a batch of texts to the target language.
 
+    Args:
+        tag_handling: passed to DeepL; "xml" keeps label template slots in place
+
     Returns:
         List of translated texts (same order as input)
     """
     try:
-        results = translator.translate_text(
-            texts,
-            source_lang="KO",
-            target_lang=target_lang
-        )
+        with metrics.request("deepl", len(texts), sum(len(text) for text in texts)):
+            results = translator.translate_text(
+                texts,
+                source_lang="KO",
+                target_lang=target_lang,
+                tag_handling=tag_handling,
+            )
 
         # Handle both single result and list of results
         if isinstance(results, list):
@@ -139,24 +179,101 @@ def translate_batch(translator: deepl.Translator, texts: List[str], target_lang:
         return [""] * len(texts)
 
 
+def save_sheet(
+    data_path: Path,
+    reader: sheet_stream.SheetReader,
+    values: Dict[int, List],
+    manifest: row_manifest.RowManifest,
+    journal: checkpoint.CheckpointJournal,
+    patch_out: Optional[Path],
+    patch_header: Optional[Dict] = None,
+) -> None:
+    """
+    Write the cells that changed in the kept rows, then drop the journal.
+
+    By default only the changed rows are spliced into the sheet (the rest of
+    the file is copied byte for byte) and the manifest is saved. With
+    `patch_out` the changes go to a patch file instead, with the engine of each
+    cell taken from the journal and `patch_header` added to the patch header;
+    the sheet and the manifest are left alone.
+    """
+    engines = {(row_idx, col_idx): engine for row_idx, col_idx, _, engine in journal.read()}
+    try:
+        sheet_stream.check_unchanged(data_path, reader.fingerprint)
+        changes = sheet_patch.diff_rows(sheet_stream.read_rows(data_path, values), values, engines)
+        if patch_out:
+            sheet_patch.write_patch(patch_out, changes, data_path, __file__, patch_header)
+            print(f"Patch: {len(changes)} changed cells written to {patch_out} (apply with apply_patch.py)")
+        else:
+            changed_rows = {change[0] for change in changes}
+            sheet_stream.splice(data_path, {row_idx: values[row_idx] for row_idx in changed_rows}, reader.fingerprint)
+    except sheet_stream.SheetChangedError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    journal.finish()
+    if not patch_out:
+        for row in values.values():
+            manifest.record(row, row_needs_translation)
+        manifest.save(data_path)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Translate missing glossary entries using DeepL API")
     parser.add_argument("--dry-run", action="store_true", help="Show what would be translated without making changes")
-    parser.add_argument("--batch-size", type=int, default=50, help="Number of texts to translate in one API call")
+    parser.add_argument("--batch-size", type=int, default=50, help="Maximum number of texts in one API call")
+    parser.add_argument("--resume", action="store_true", help="Replay the checkpoint journal of an interrupted run")
+    parser.add_argument("--full-scan", action="store_true", help="Scan every row, ignoring the row-hash manifest")
+    parser.add_argument("--budget", type=int, help="Max DeepL characters to send this run; the most important cells go first")
+    parser.add_argument("--no-templates", action="store_true",
+                        help="Send texts that differ only by a name or number one by one instead of as label templates")
+    parser.add_argument("--patch-out", type=Path,
+                        help="Write the changed cells to this patch file instead of updating the sheet (see apply_patch.py)")
+    sharding.add_shard_arguments(parser)
+    translation_memory.add_cache_arguments(parser)
+    run_metrics.add_metrics_arguments(parser)
     args = parser.parse_args()
+    shard = sharding.from_args(parser, args)
 
-    # Check for API key
-    api_key = os.environ.get("DEEPL_API_KEY")
+    with run_metrics.session(shard.state_name(__file__) if shard else __file__, args) as metrics:
+        run(args, metrics, shard)
+
+
+def run(args: argparse.Namespace, metrics: run_metrics.RunMetrics, shard: Optional[sharding.Shard] = None) -> None:
+    """Scan, plan, translate and save; see the module docstring."""
+
+    # Check for API key (a shard may have its own, see sharding.py)
+    api_key, key_source = sharding.api_key("DEEPL_API_KEY", shard)
     if not api_key:
         print("ERROR: DEEPL_API_KEY environment variable is not set.")
         print("Please set it with: export DEEPL_API_KEY=your-api-key-here")
         sys.exit(1)
+    patch_header = shard.header({"deepl": key_source}) if shard else None
+    if shard:
+        print(f"Shard {shard} (by {shard.by}), DeepL key from {key_source}, patch: {args.patch_out}")
+        print()
+
+    data_path = Path(__file__).parent.parent / "src" / "main" / "resources" / "data" / "sheet_db.json"
+
+    if not data_path.exists():
+        print(f"ERROR: Data file not found: {data_path}")
+        sys.exit(1)
+
+    # Skip everything when the sheet is exactly what the last successful run wrote
+    manifest = row_manifest.RowManifest(row_manifest.manifest_path_for(__file__), enabled=not args.full_scan)
+    if not args.resume and manifest.sheet_unchanged(data_path):
+        print(f"No changes since the last successful run: {data_path}")
+        print("Nothing to do (use --full-scan to re-check every row).")
+        if shard:
+            # The merge expects a patch from every shard
+            sheet_patch.write_patch(args.patch_out, [], data_path, __file__, patch_header)
+        return
 
     # Initialize DeepL translator
     try:
-        translator = deepl.Translator(api_key)
-        # Test the connection
-        usage = translator.get_usage()
+        with metrics.phase("connect"):
+            translator = deepl.Translator(api_key, server_url=os.environ.get("DEEPL_SERVER_URL"))
+            # Test the connection
+            usage = translator.get_usage()
         print(f"DeepL API connected successfully.")
         print(f"Character usage: {usage.character.count:,} / {usage.character.limit:,}")
         print()
@@ -164,36 +281,99 @@ def main():
         print(f"ERROR: Failed to connect to DeepL API: {e}")
         sys.exit(1)
 
-    # Load glossary data
-    data_path = Path(__file__).parent.parent / "src" / "main" / "resources" / "data" / "sheet_db.json"
-
-    if not data_path.exists():
-        print(f"ERROR: Data file not found: {data_path}")
-        sys.exit(1)
+    # A shard plans with its part of the quota and of --budget (see sharding.py)
+    quota, budget = cost_planner.quota_remaining(usage), args.budget
+    if shard:
+        quota, budget, limits = sharding.deepl_limits(shard, quota, budget)
+        patch_header.update(limits)
+        print(f"Shard limits: quota {limits['deepl_quota']} (key shared by {limits['deepl_key_shards']} shards), "
+              f"budget {limits['budget']}")
+        print()
 
+    # Cells finished by an interrupted run are replayed while the sheet streams by
+    journal = checkpoint.CheckpointJournal(
+        checkpoint.journal_path_for(shard.state_name(__file__) if shard else __file__), data_path
+    )
+    records: List[checkpoint.Record] = []
+    if args.resume and journal.path.exists():
+        try:
+            records = journal.read()
+        except ValueError as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+    replay = checkpoint.group_by_row(records)
+    restored = 0
+
+    # Stream the glossary data; keep only changed rows that still contain Korean
     print(f"Loading glossary data from: {data_path}")
-    with open(data_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    total_rows = len(data.get("values", [])) - 2  # Exclude header rows
+    reader = sheet_stream.SheetReader(data_path)
+    reuse = source_dedup.ReuseIndex(DEEPL_LANG_MAP.keys())
+    names = None if args.no_templates else label_templates.NameIndex(DEEPL_LANG_MAP.keys())
+    values: Dict[int, List] = {}
+    with metrics.phase("load"):
+        for row_idx, row in reader.rows():
+            if row_idx < sheet_scanner.FIRST_DATA_ROW:
+                continue
+            replayed = 0
+            if row_idx in replay:
+                replayed = checkpoint.replay_row(row, replay[row_idx], has_korean)
+                restored += replayed
+            reuse.add(row)
+            if names is not None:
+                names.add(row)
+            if not replayed and not manifest.changed(row):
+                continue
+            if shard and not shard.owns(row_idx, row):
+                continue
+            # Replayed rows differ from the file and are always written back
+            if replayed or row_needs_translation(row):
+                values[row_idx] = row
+            else:
+                manifest.record(row, row_needs_translation)
+
+    total_rows = reader.row_count - 2  # Exclude header rows
     print(f"Total data rows: {total_rows}")
+    metrics.set("rows", total_rows)
     print()
+    if records:
+        print(f"Resumed: restored {restored} of {len(records)} journaled cells")
+        print()
 
     # Find missing translations
     print("Scanning for missing translations...")
-    missing = find_missing_translations(data)
+    with metrics.phase("scan"):
+        scan = find_missing_translations(values, list(values))
+    if manifest.skipped:
+        print(f"Row manifest: {manifest.skipped} unchanged rows skipped, {len(values)} changed rows need work")
+    metrics.set("rows_scanned", len(scan.rows))
 
-    if not missing:
+    # Count by language
+    lang_counts = {col: scan.count(col) for col in DEEPL_LANG_MAP.keys()}
+
+    if not any(lang_counts.values()):
         print("No missing translations found. All entries are complete!")
+        if args.dry_run:
+            return
+        if records:
+            # The journal covered every remaining cell; its replayed cells are only in `values` so far
+            if restored and not args.patch_out:
+                with metrics.phase("backup"):
+                    backup = create_backup(data_path)
+                metrics.set("backup_written_bytes", backup.written_bytes)
+                print(f"Backup: {backup.describe()}")
+            print(f"Saving {restored} restored cells to: {args.patch_out or data_path}")
+            with metrics.phase("save"):
+                save_sheet(data_path, reader, values, manifest, journal, args.patch_out, patch_header)
+        elif shard:
+            sheet_patch.write_patch(args.patch_out, [], data_path, __file__, patch_header)
+        else:
+            # Nothing was replayed, so the sheet on disk already holds every kept row as scanned
+            for row in values.values():
+                manifest.record(row, row_needs_translation)
+            manifest.save(data_path)
         return
 
-    # Count by language
-    lang_counts = {col: 0 for col in DEEPL_LANG_MAP.keys()}
-    for row_missing in missing.values():
-        for col_idx, _ in row_missing:
-            lang_counts[col_idx] += 1
-
-    print(f"Found {len(missing)} rows with missing translations:")
+    print(f"Found {sum(1 for _ in scan.by_row())} rows with missing translations:")
     for col_idx, count in lang_counts.items():
         if count > 0:
             print(f"  - {LANG_NAMES[col_idx]}: {count} entries")
@@ -202,71 +382,182 @@ def main():
     if args.dry_run:
         print("DRY RUN MODE - No changes will be made")
         print("\nSample entries that would be translated:")
-        for row_idx in list(missing.keys())[:5]:
-            row = data["values"][row_idx]
+        for row_idx, row_missing in islice(scan.by_row(), 5):
+            row = values[row_idx]
             key_name = row[COL_KEY_NAME] if len(row) > COL_KEY_NAME else ""
             korean_text = row[COL_KOREAN] if len(row) > COL_KOREAN else ""
             print(f"  Row {row_idx}: {key_name}")
             print(f"    Korean: {korean_text[:50]}...")
-            for col_idx, text in missing[row_idx]:
+            for col_idx, text in row_missing:
                 print(f"    {LANG_NAMES[col_idx]}: {text[:50]}...")
-        return
-
-    # Create backup
-    backup_path = create_backup(data_path)
-    print(f"Created backup: {backup_path}")
-    print()
+        print()
 
-    # Process translations by language (more efficient batching)
-    translation_stats = {col: {"success": 0, "failed": 0} for col in DEEPL_LANG_MAP.keys()}
+    # Fill what needs no API call, then collapse the rest to unique source texts
+    translation_stats = {col: {"success": 0, "failed": 0, "cached": 0, "reused": 0} for col in DEEPL_LANG_MAP.keys()}
     failed_entries = []
+    memory = translation_memory.open_from_args(args)
+    dedup = source_dedup.DedupStats()
+    planner = BatchPlanner(DEEPL_LIMITS, initial_texts=args.batch_size)
+    groups_by_lang = {}
+    templates_by_lang: Dict[int, List[label_templates.Template]] = {}
+    template_stats = label_templates.TemplateStats()
+    prepared = []
+
+    with metrics.phase("prepare"):
+        for col_idx, target_lang in DEEPL_LANG_MAP.items():
+            if lang_counts[col_idx] == 0:
+                continue
+
+            print(f"Preparing {LANG_NAMES[col_idx]} ({lang_counts[col_idx]} entries)...")
+
+            # Collect all texts for this language
+            batch_data = scan.cells(col_idx)
+
+            # Copy translations from other rows with the same Korean text
+            reused, batch_data = source_dedup.reuse_existing(values, batch_data, reuse.columns[col_idx], dedup)
+            for row_idx, translation in reused:
+                values[row_idx][col_idx] = translation
+            prepared.extend((row_idx, col_idx, translation, "reused") for row_idx, translation in reused)
+            translation_stats[col_idx]["success"] += len(reused)
+            translation_stats[col_idx]["reused"] = len(reused)
+            if reused:
+                print(f"  {len(reused)} copied from rows with the same Korean text")
+
+            # Fill what the translation memory already knows
+            cached = memory.lookup((text for _, text in batch_data), target_lang)
+            if cached:
+                for row_idx, text in batch_data:
+                    if text in cached:
+                        values[row_idx][col_idx] = cached[text][0]
+                        translation_stats[col_idx]["success"] += 1
+                        translation_stats[col_idx]["cached"] += 1
+                prepared.extend((row_idx, col_idx, cached[text][0], "cache") for row_idx, text in batch_data if text in cached)
+                batch_data = [(row_idx, text) for row_idx, text in batch_data if text not in cached]
+                print(f"  {translation_stats[col_idx]['cached']} from translation memory")
+
+            # One request per unique source text, fanned out to every row using it
+            groups_by_lang[col_idx] = source_dedup.group_by_source(batch_data, dedup)
+            if names is not None:
+                groups_by_lang[col_idx], templates_by_lang[col_idx] = label_templates.collapse(
+                    groups_by_lang[col_idx], names
+                )
+            if groups_by_lang[col_idx]:
+                print(f"  {len(groups_by_lang[col_idx])} unique texts to send for {len(batch_data)} entries")
+            if templates_by_lang.get(col_idx):
+                variants = sum(len(t.variants) for t in templates_by_lang[col_idx])
+                print(f"  {len(templates_by_lang[col_idx])} label templates for {variants} more unique texts")
+        print()
 
-    for col_idx, target_lang in DEEPL_LANG_MAP.items():
-        if lang_counts[col_idx] == 0:
-            continue
-
-        print(f"Translating {LANG_NAMES[col_idx]} ({lang_counts[col_idx]} entries)...")
-
-        # Collect all texts for this language
-        batch_data = []
-        for row_idx, row_missing in missing.items():
-            for col, text in row_missing:
-                if col == col_idx:
-                    batch_data.append((row_idx, text))
-
-        # Process in batches
-        for i in range(0, len(batch_data), args.batch_size):
-            batch = batch_data[i:i + args.batch_size]
-            texts = [text for _, text in batch]
-            row_indices = [row_idx for row_idx, _ in batch]
-
-            print(f"  Batch {i // args.batch_size + 1}/{(len(batch_data) + args.batch_size - 1) // args.batch_size} ({len(texts)} texts)...", end=" ")
-
-            try:
-                translations = translate_batch(translator, texts, target_lang)
+        # Plan DeepL characters before any translation request; a template is planned as one text
+        plan, kept = cost_planner.plan_costs(
+            values, label_templates.with_templates(groups_by_lang, templates_by_lang), LANG_NAMES,
+            quota_remaining=quota, budget=budget,
+        )
+        groups_by_lang, templates_by_lang = label_templates.split_planned(kept, templates_by_lang)
+    metrics.set("planned_deepl_chars", plan.deepl_chars)
+    print(plan.report())
+    print()
 
-                # Update the data
-                for j, (row_idx, translation) in enumerate(zip(row_indices, translations)):
-                    if translation:
-                        data["values"][row_idx][col_idx] = translation
-                        translation_stats[col_idx]["success"] += 1
-                    else:
-                        translation_stats[col_idx]["failed"] += 1
-                        failed_entries.append((row_idx, col_idx, texts[j]))
+    if args.dry_run:
+        memory.close()
+        return
 
-                print("Done")
-            except Exception as e:
-                print(f"FAILED: {e}")
-                translation_stats[col_idx]["failed"] += len(texts)
-                for row_idx, text in batch:
-                    failed_entries.append((row_idx, col_idx, text))
+    # Create backup (a patch run leaves the sheet alone)
+    backup = None
+    if not args.patch_out:
+        with metrics.phase("backup"):
+            backup = create_backup(data_path)
+        metrics.set("backup_written_bytes", backup.written_bytes)
+        print(f"Backup: {backup.describe()}")
+        print()
 
+    if journal.path.exists() and not args.resume:
+        print(f"Discarding journal of an unfinished run (use --resume to replay it): {journal.path}")
+        print()
+    # Already read and checked above; only reopen it for appending
+    journal.open(append=bool(records))
+    journal.record(prepared)
+
+    # Label templates first; variants of a failed template join the per-text batches
+    if any(templates_by_lang.values()):
+        with metrics.phase("templates"):
+            filled, leftover = label_templates.translate_templates(
+                templates_by_lang,
+                lambda col_idx, texts: translate_batch(translator, texts, DEEPL_LANG_MAP[col_idx], metrics, "xml"),
+                names, template_stats, DEEPL_LIMITS.max_texts,
+            )
+        for col_idx, variants in filled.items():
+            applied = []
+            for rows, _, translation in variants:
+                for row_idx in rows:
+                    values[row_idx][col_idx] = translation
+                    applied.append((row_idx, col_idx, translation, "template"))
+                translation_stats[col_idx]["success"] += len(rows)
+            journal.record(applied)
+            memory.store([(text, translation) for _, text, translation in variants], DEEPL_LANG_MAP[col_idx], "deepl")
+        for col_idx, col_groups in leftover.items():
+            groups_by_lang[col_idx] = col_groups + groups_by_lang.get(col_idx, [])
+        print(template_stats.summary())
         print()
 
-    # Save updated data
-    print(f"Saving updated data to: {data_path}")
-    with open(data_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    # Process translations by language (more efficient batching)
+    with metrics.phase("translate"):
+        for col_idx, groups in groups_by_lang.items():
+            if not groups:
+                continue
+            target_lang = DEEPL_LANG_MAP[col_idx]
+            print(f"Translating {LANG_NAMES[col_idx]} ({len(groups)} unique texts)...")
+
+            # Process in batches cut to the planner's current text and character budget
+            queue = deque(groups)
+            batch_number = 0
+            while queue:
+                batch = planner.next_batch(queue)
+                texts = [text for _, text in batch]
+                row_groups = [rows for rows, _ in batch]
+                batch_number += 1
+
+                print(f"  Batch {batch_number} ({len(texts)} texts, {len(queue)} left)...", end=" ")
+
+                try:
+                    translations = translate_batch(translator, texts, target_lang, metrics)
+                    # translate_batch reports a failed request as all-empty results
+                    if any(translations):
+                        planner.succeeded(batch)
+                    else:
+                        planner.shrink(batch)
+
+                    # Update the data
+                    accepted = []
+                    applied = []
+                    for j, (rows, translation) in enumerate(zip(row_groups, translations)):
+                        if translation:
+                            for row_idx in rows:
+                                values[row_idx][col_idx] = translation
+                                applied.append((row_idx, col_idx, translation, "deepl"))
+                            translation_stats[col_idx]["success"] += len(rows)
+                            if not has_korean(translation):
+                                accepted.append((texts[j], translation))
+                        else:
+                            translation_stats[col_idx]["failed"] += len(rows)
+                            failed_entries.extend((row_idx, col_idx, texts[j]) for row_idx in rows)
+                    journal.record(applied)
+                    memory.store(accepted, target_lang, "deepl")
+
+                    print("Done")
+                except Exception as e:
+                    print(f"FAILED: {e}")
+                    for rows, text in batch:
+                        translation_stats[col_idx]["failed"] += len(rows)
+                        failed_entries.extend((row_idx, col_idx, text) for row_idx in rows)
+
+            print()
+
+    memory.close()
+
+    print(f"Saving updated data to: {args.patch_out or data_path}")
+    with metrics.phase("save"):
+        save_sheet(data_path, reader, values, manifest, journal, args.patch_out, patch_header)
 
     # Print summary
     print("\n" + "=" * 60)
@@ -284,23 +575,39 @@ def main():
 
         if success + failed > 0:
             print(f"\n{LANG_NAMES[col_idx]}:")
-            print(f"  Success: {success}")
+            print(f"  Success: {success} ({translation_stats[col_idx]['reused']} same-ko rows, "
+                  f"{translation_stats[col_idx]['cached']} from translation memory)")
             print(f"  Failed:  {failed}")
 
     print(f"\nTotal:")
     print(f"  Success: {total_success}")
     print(f"  Failed:  {total_failed}")
+    metrics.set("cells_success", total_success)
+    metrics.set("cells_failed", total_failed)
+    metrics.set("cells_reused", sum(s["reused"] for s in translation_stats.values()))
+    metrics.set("cells_cache", sum(s["cached"] for s in translation_stats.values()))
+    metrics.set("cells_deferred", plan.deferred_cells)
+    metrics.set("dedup_chars_saved", dedup.chars_saved)
+    metrics.set("template_texts_saved", template_stats.texts_saved)
+    metrics.set("cache_hits", memory.hits)
+    metrics.set("cache_misses", memory.misses)
+    if plan.deferred_cells:
+        print(f"  Deferred by the cost plan: {plan.deferred_cells} (still Korean; picked up by the next run)")
 
     if failed_entries:
         print(f"\nFailed entries ({len(failed_entries)} total):")
         for row_idx, col_idx, text in failed_entries[:10]:
-            row = data["values"][row_idx]
+            row = values[row_idx]
             key_name = row[COL_KEY_NAME] if len(row) > COL_KEY_NAME else ""
             print(f"  Row {row_idx} ({key_name}), {LANG_NAMES[col_idx]}: {text[:50]}...")
         if len(failed_entries) > 10:
             print(f"  ... and {len(failed_entries) - 10} more")
 
-    print(f"\nBackup file: {backup_path}")
+    print(f"\n{dedup.summary()}")
+    print(planner.summary("DeepL"))
+    print(memory.summary())
+    if backup:
+        print(f"\nBackup: {backup.snapshot.id} (undo with: python backups.py restore {backup.snapshot.id})")
     print("=" * 60)
 
 
@@ -4,18 +4,75 @@ Translate ALL remaining untranslated/empty glossary entries.
 - Columns 6 (ES), 7 (ZH-HANT): DeepL -> Claude AI fallback -> English value
 - Columns 3 (EN), 4 (ZH-HANS), 5 (JA): DeepL -> Claude AI fallback -> English value
 - Empty values in columns 4, 5, 6, 7: fill with English value
+
+Batches for all columns run concurrently on bounded per-engine thread pools
+(--deepl-concurrency / --claude-concurrency). Each cell still goes through
+DeepL -> Claude -> English fallback in that order, but the stages run as a
+pipeline: DeepL rejects flow to Claude and Claude rejects to English fallback
+while DeepL is still working. Claude requests share one pooled, rate-limited
+client (claude_client.py). A Korean text that needs Claude for several
+columns is sent once and asked for all of them.
+
+Korean texts that differ only by a name or number ("<name> 앨범 구매", "3개
+남음") are translated once per language as a label template before the
+chain starts (label_templates.py); --no-templates turns this off.
+
+Each engine has a circuit breaker (circuit_breaker.py): while DeepL or Claude
+keeps failing or answering slowly, its batches go straight to the next engine
+until a probe request succeeds again. A DeepL batch that runs longer than
+DeepL's observed p95 is hedged with a duplicate Claude request, and whichever
+answers first is used (--no-breakers / --no-hedging turn these off).
+
+Every applied cell is journaled after each batch (checkpoint.py); after a crash,
+--resume replays the journal and only the unfinished cells are sent again.
+
+The sheet is streamed (sheet_stream.py): only rows that still need work are
+kept in memory, and only the rows that changed are spliced into a temp file
+that replaces the sheet atomically. --patch-out writes the changed cells to a
+patch file instead (sheet_patch.py, applied with apply_patch.py).
+
+Only rows added or changed since the last successful run are scanned
+(row_manifest.py); --full-scan visits every row.
+
+Phase timings, per-engine request latencies and counters are printed at the
+end and written to .state/ as JSON and Prometheus textfile metrics
+(run_metrics.py); --profile adds cProfile and tracemalloc.
+
+--shard I/N works on one of N disjoint slices of the rows (by Korean text, or
+by row with --shard-by row) and writes a patch; shards.py runs the shards and
+merges their patches (sharding.py).
+
+The sheet is backed up into a compressed, deduplicated store in .state/
+before it is changed (backup_store.py); backups.py lists and restores them.
 """
 
+import argparse
 import json
 import os
 import re
 import sys
-import shutil
 import time
-import http.client
-from datetime import datetime
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from pathlib import Path
 
+import backup_store
+import checkpoint
+import circuit_breaker
+import cost_planner
+import row_manifest
+import run_metrics
+import label_templates
+import sharding
+import sheet_patch
+import sheet_stream
+from batch_planner import BatchPlanner, CLAUDE_LIMITS, CLAUDE_MAX_TOKENS, DEEPL_LIMITS
+import sheet_scanner
+import source_dedup
+from claude_client import ClaudeClient
+from sheet_scanner import has_korean, is_empty
+import translation_memory
+
 try:
     import deepl
 except ImportError:
@@ -38,91 +95,708 @@ TARGET_COLS = {
     COL_ZH_HANT:   {"deepl": "ZH-HANT", "claude": "Traditional Chinese",  "name": "Chinese Traditional"},
 }
 
-def has_korean(text):
-    if not text or not isinstance(text, str):
+FILL_COLS = [COL_ZH_HANS, COL_JAPANESE, COL_SPANISH, COL_ZH_HANT]
+
+def row_needs_work(row):
+    status = {col_idx: sheet_scanner.cell_status(row, col_idx) for col_idx in TARGET_COLS}
+    if sheet_scanner.KOREAN in status.values():
+        return True
+    if status[COL_ENGLISH] in sheet_scanner.BLANK:
         return False
-    return bool(re.search(r'[\uAC00-\uD7AF]', text))
-
-def is_empty(text):
-    return not text or not isinstance(text, str) or text.strip() == ""
-
-def claude_translate_batch(texts, target_lang_name, api_key):
-    if not texts:
-        return []
-    prompt_texts = "\n".join(f"{i+1}. {t}" for i, t in enumerate(texts))
-    body = json.dumps({
-        "model": "claude-sonnet-4-20250514",
-        "max_tokens": 4096,
-        "messages": [{"role": "user", "content": (
-            f"Translate the following Korean texts to {target_lang_name}. "
-            f"These are K-pop merchandise/product terms for a fan commerce platform. "
-            f"For artist names, group names, or brand names that are proper nouns, "
-            f"keep them in their commonly known romanized/English form. "
-            f"Return ONLY the translations, one per line, numbered to match:\n\n{prompt_texts}"
-        )}]
-    })
-    conn = http.client.HTTPSConnection("api.anthropic.com")
-    conn.request("POST", "/v1/messages", body, {
-        "Content-Type": "application/json",
-        "x-api-key": api_key,
-        "anthropic-version": "2023-06-01"
-    })
-    resp = conn.getresponse()
-    data = json.loads(resp.read().decode())
-    conn.close()
-    if resp.status != 200:
-        print(f"  Claude API error: {resp.status} {data.get('error', {}).get('message', '')}")
-        return [""] * len(texts)
-    response_text = data["content"][0]["text"]
-    lines = [l.strip() for l in response_text.strip().split("\n") if l.strip()]
-    results = [re.sub(r'^\d+[\.\)]\s*', '', l) for l in lines]
-    while len(results) < len(texts):
-        results.append("")
-    return results[:len(texts)]
+    return any(status[col_idx] in sheet_scanner.BLANK for col_idx in FILL_COLS)
+
+CLAUDE_MAX_FOLLOWUPS = 2
+
+# DeepL holds back while the Claude queue holds this many full batches per worker
+CLAUDE_BACKLOG_BATCHES = 2
+
+# Start of an `"id": value` member; the value is decoded with raw_decode
+KEYED_MEMBER = re.compile(r'"(\d+)"\s*:\s*')
+
+
+def parse_keyed_response(text):
+    """{id: value} from a JSON object response; tolerates code fences and truncation."""
+    body = text.strip()
+    if body.startswith("```"):
+        body = body.strip("`").split("\n", 1)[-1]
+    try:
+        parsed = json.loads(body)
+        if isinstance(parsed, dict):
+            return {str(k): v for k, v in parsed.items()}
+    except ValueError:
+        pass
+    # Cut off at max_tokens: keep every member that is complete
+    decoder = json.JSONDecoder()
+    result = {}
+    pos = 0
+    while True:
+        match = KEYED_MEMBER.search(body, pos)
+        if not match:
+            return result
+        try:
+            result[match.group(1)], pos = decoder.raw_decode(body, match.end())
+        except ValueError:
+            pos = match.end()
+
+
+def claude_request(items, client, metrics):
+    """One keyed request for {id: {"text", "targets"}}. Returns ({id: {language: translation}}, truncated, output_tokens)."""
+    with metrics.request("claude", len(items), sum(len(item["text"]) for item in items.values())):
+        data = client.messages({
+            "model": "claude-sonnet-4-20250514",
+            "max_tokens": CLAUDE_MAX_TOKENS,
+            "messages": [{"role": "user", "content": (
+                f"Translate each of the following Korean texts into every language listed in its \"targets\". "
+                f"These are K-pop merchandise/product terms for a fan commerce platform. "
+                f"For artist names, group names, or brand names that are proper nouns, "
+                f"keep them in their commonly known romanized/English form. "
+                f"The input is a JSON object mapping ids to {{\"text\", \"targets\"}}. Return ONLY a JSON object "
+                f"with exactly the same ids, each mapped to an object from target language to translation:\n\n"
+                f"{json.dumps(items, ensure_ascii=False, indent=0)}"
+            )}]
+        })
+    response_text = "".join(block.get("text", "") for block in data["content"])
+    return (parse_keyed_response(response_text), data.get("stop_reason") == "max_tokens",
+            data.get("usage", {}).get("output_tokens"))
+
+
+def claude_translate_batch(items, client, metrics):
+    """
+    Translate [(text, [language, ...]), ...] with one request for all languages of all texts.
+    Returns (translations, truncated, output_tokens, followups), translations
+    index-aligned with `items` as {language: translation}.
+
+    Every text gets an id; a translation is only accepted for its own id and
+    language, and only if it is a non-empty string without Hangul. Missing,
+    invalid or truncated (id, language) pairs are sent again on their own, up
+    to CLAUDE_MAX_FOLLOWUPS times, so one skipped line costs one small call.
+    Only the first request raises; a failed follow-up is counted and the
+    translations accepted so far are returned, so just the pairs still
+    missing fall back.
+    """
+    if not items:
+        return [], False, None, 0
+    results = [{} for _ in items]
+    todo = {i: list(languages) for i, (_, languages) in enumerate(items)}
+    truncated, output_tokens, followups = False, None, 0
+    for attempt in range(CLAUDE_MAX_FOLLOWUPS + 1):
+        request = {str(i + 1): {"text": items[i][0], "targets": languages} for i, languages in todo.items()}
+        if attempt == 0:
+            answers, truncated, output_tokens = claude_request(request, client, metrics)
+        else:
+            try:
+                answers, _, _ = claude_request(request, client, metrics)
+            except Exception as e:
+                metrics.count("claude_followup_errors")
+                print(f"  Claude follow-up ({len(request)} texts)... FAILED: {e}")
+                break
+            followups += 1
+        for i, languages in todo.items():
+            answer = answers.get(str(i + 1))
+            if not isinstance(answer, dict):
+                continue
+            for language in languages:
+                translated = answer.get(language)
+                if isinstance(translated, str) and translated.strip() and not has_korean(translated):
+                    results[i][language] = translated.strip()
+        remaining = {i: [l for l in languages if l not in results[i]] for i, languages in todo.items()}
+        remaining = {i: languages for i, languages in remaining.items() if languages}
+        if not remaining or remaining == todo and attempt > 0:
+            break
+        todo = remaining
+    return results, truncated, output_tokens, followups
+
+
+def deepl_translate_batch(translator, texts, target_lang, metrics, tag_handling=None):
+    with metrics.request("deepl", len(texts), sum(len(t) for t in texts)):
+        results = translator.translate_text(texts, source_lang="KO", target_lang=target_lang, tag_handling=tag_handling)
+    if not isinstance(results, list):
+        results = [results]
+    return [r.text for r in results], False, None, 0
+
+
+def translate_templates(values, templates, names, template_stats, stats, translator, memory, journal, metrics, workers, breaker):
+    """
+    Translate each label template once per column (DeepL, XML tag handling)
+    and fill its variants; returns the groups of variants whose template
+    failed, or was skipped while DeepL's breaker is open, per column, to go
+    through the normal engine chain.
+    """
+    def translate(col_idx, texts):
+        if not breaker.allow():
+            return [""] * len(texts)
+        started = time.monotonic()
+        try:
+            translated = deepl_translate_batch(translator, texts, TARGET_COLS[col_idx]["deepl"], metrics, tag_handling="xml")[0]
+        except Exception as e:
+            breaker.record(time.monotonic() - started, ok=False)
+            print(f"  [{TARGET_COLS[col_idx]['name']}] Template batch ({len(texts)} templates)... FAILED: {e}")
+            return [""] * len(texts)
+        breaker.record(time.monotonic() - started, ok=True)
+        return translated
+
+    filled, leftover = label_templates.translate_templates(
+        templates, translate, names, template_stats, DEEPL_LIMITS.max_texts, workers,
+    )
+    applied = []
+    for col_idx, variants in filled.items():
+        for rows, _, translated in variants:
+            for row_idx in rows:
+                values[row_idx][col_idx] = translated
+                applied.append((row_idx, col_idx, translated, "template"))
+            stats[col_idx]["deepl"] += len(rows)
+        memory.store([(text, translated) for _, text, translated in variants], TARGET_COLS[col_idx]["deepl"], "deepl")
+    journal.record(applied)
+    return leftover
+
+
+def english_fallback(values, cells, stats):
+    """Copy the English value into [(row_idx, col_idx, korean_text)] cells; returns the journal records."""
+    applied = []
+    for row_idx, col_idx, korean_text in cells:
+        row = values[row_idx]
+        eng_val = row[COL_ENGLISH] if len(row) > COL_ENGLISH else ""
+        # For English column, can't fallback to itself
+        if col_idx != COL_ENGLISH and eng_val and not has_korean(eng_val):
+            row[col_idx] = eng_val
+            stats[col_idx]["english_fallback"] += 1
+            applied.append((row_idx, col_idx, eng_val, "english_fallback"))
+        else:
+            stats[col_idx]["failed"] += 1
+            key_name = row[COL_KEY_NAME] if len(row) > COL_KEY_NAME else "?"
+            print(f"    FAILED: [{TARGET_COLS[col_idx]['name']}] row {row_idx} ({key_name}): {korean_text[:40]}")
+    return applied
+
+
+def prepare_columns(values, missing, memory, dedup, reuse, names):
+    """
+    Fill what needs no API call and collapse the rest to unique source texts.
+
+    Cells are copied from rows with the same `ko` value (`reuse`, a
+    source_dedup.ReuseIndex of the whole sheet) or filled from the translation
+    memory; the remaining cells of each column become (row_indices, text)
+    groups, one per unique text. Texts that differ only by a name or number
+    are collapsed into label templates (label_templates.py, `names` is its
+    NameIndex of the whole sheet).
+
+    Returns (groups, templates, stats, records): groups and templates per
+    column, per-column stats, and the journal records of every cell filled here.
+    """
+    stats = {col: {"reused": 0, "cache": 0, "deepl": 0, "claude": 0, "english_fallback": 0, "failed": 0} for col in TARGET_COLS}
+    groups = {col: [] for col in TARGET_COLS}
+    templates = {col: [] for col in TARGET_COLS}
+    records = []
+    for col_idx, info in TARGET_COLS.items():
+        entries = missing[col_idx]
+        if not entries:
+            continue
+        print(f"Translating {info['name']} ({len(entries)} entries)")
+
+        reused, entries = source_dedup.reuse_existing(values, entries, reuse.columns[col_idx], dedup)
+        for row_idx, translation in reused:
+            values[row_idx][col_idx] = translation
+        records.extend((row_idx, col_idx, translation, "reused") for row_idx, translation in reused)
+        stats[col_idx]["reused"] = len(reused)
+
+        cached = memory.lookup((t for _, t in entries), info["deepl"])
+        if cached:
+            for row_idx, text in entries:
+                if text in cached:
+                    values[row_idx][col_idx] = cached[text][0]
+                    stats[col_idx]["cache"] += 1
+            records.extend((r, col_idx, cached[t][0], "cache") for r, t in entries if t in cached)
+            entries = [(r, t) for r, t in entries if t not in cached]
+            print(f"  {stats[col_idx]['cache']} from translation memory")
+        if reused:
+            print(f"  {len(reused)} copied from rows with the same Korean text")
+        if not entries:
+            continue
+        groups[col_idx] = source_dedup.group_by_source(entries, dedup)
+        if names is not None:
+            groups[col_idx], templates[col_idx] = label_templates.collapse(groups[col_idx], names)
+        variants = sum(len(t.variants) for t in templates[col_idx])
+        note = f" and {len(templates[col_idx])} templates for {variants} more" if templates[col_idx] else ""
+        print(f"  {len(groups[col_idx])} unique texts to send{note}")
+    print()
+    return groups, templates, stats, records
+
+
+def translate_concurrently(values, groups, stats, translator, claude, memory, journal, metrics, deepl_workers, claude_workers,
+                           breakers, hedging=True):
+    """
+    Run DeepL, Claude and English fallback as one pipeline, all stages at once.
+
+    Each engine gets its own bounded thread pool. Workers only call the APIs;
+    results are applied to `values` on the calling thread, so the sheet and the
+    stats are never touched concurrently.
+
+    `groups` holds the (row_indices, text) groups of each column still to
+    send (see prepare_columns). A BatchPlanner cuts the next DeepL batch off a
+    column's queue whenever a worker is free, sized by text length and by how
+    earlier responses went; columns take turns so every text's DeepL results
+    arrive at about the same time.
+
+    A DeepL reject (no output, or output still containing Hangul) moves on to
+    the Claude queue as soon as DeepL has answered that text for every column
+    it was sent for: a text DeepL could not translate for several columns is
+    still sent to Claude once, asking for all of those languages together.
+    Claude gets a full batch, or whatever is ready when no Claude batch is in
+    flight. Claude rejects go straight to English fallback, which waits only
+    for that row's English cell to be final. DeepL holds back while the
+    Claude queue holds more than a few full batches.
+
+    `breakers` holds a circuit_breaker.CircuitBreaker per engine. While
+    DeepL's is open its batches are handed to Claude as if DeepL had rejected
+    every text; while Claude's is open its batches go to English fallback.
+    With `hedging`, a DeepL batch still running after DeepL's observed p95 is
+    also sent to Claude when a Claude worker is free; the first good answer is
+    applied and the other one is dropped.
+
+    Every applied cell is written to the checkpoint journal as soon as its
+    batch is applied.
+    """
+    deepl_queues = {col: deque(groups[col]) for col in TARGET_COLS}
+    claude_queue = deque()
+    # DeepL answers still due per text, and the columns whose answer was a reject
+    deepl_due = {}
+    for col_idx in TARGET_COLS:
+        for _, text in groups[col_idx]:
+            deepl_due[text] = deepl_due.get(text, 0) + 1
+    needs = {}
+    # Rows whose English cell is still being translated; their fallbacks wait for it
+    english_pending = {row_idx for rows, _ in groups[COL_ENGLISH] for row_idx in rows}
+    english_waiting = {}
+    in_flight = {"deepl": 0, "claude": 0}
+    sent = {"deepl": {col: 0 for col in TARGET_COLS}, "claude": 0}
+    claude_texts = {"texts": 0, "translations": 0}
+    fallback_cells = {col: 0 for col in TARGET_COLS}
+    skipped = {"deepl": 0, "claude": 0}
+    hedges = {"sent": 0, "won": 0}
+    planners = {
+        "deepl": BatchPlanner(DEEPL_LIMITS),
+        # A Claude item is ({col: rows}, text) and produces one translation per column
+        "claude": BatchPlanner(CLAUDE_LIMITS, outputs_per_item=lambda item: len(item[0])),
+    }
+    claude_backlog = CLAUDE_BACKLOG_BATCHES * claude_workers * CLAUDE_LIMITS.max_texts
+    deepl_pool = ThreadPoolExecutor(max_workers=deepl_workers, thread_name_prefix="deepl")
+    claude_pool = ThreadPoolExecutor(max_workers=claude_workers, thread_name_prefix="claude")
+    # future -> (kind, job, started); kind is "deepl", "claude" or "hedge" (a Claude copy of a DeepL batch)
+    pending = {}
+    # DeepL batches without an answer yet, by their DeepL future
+    unanswered = {}
+    # Requests whose batch the other one answered: not waited for, only recorded if they finish
+    losers = set()
+
+    def fill():
+        held = False
+        applied = []
+        while in_flight["deepl"] < deepl_workers and any(deepl_queues.values()):
+            if len(claude_queue) >= claude_backlog:
+                held = True
+                break
+            for col_idx in TARGET_COLS:
+                queue = deepl_queues[col_idx]
+                if not queue or in_flight["deepl"] >= deepl_workers:
+                    continue
+                if not breakers["deepl"].allow():
+                    # Straight on to Claude, as if DeepL had rejected every text
+                    skipped["deepl"] += min(len(queue), DEEPL_LIMITS.max_texts)
+                    for _ in range(min(len(queue), DEEPL_LIMITS.max_texts)):
+                        rows, text = queue.popleft()
+                        deepl_answered(col_idx, rows, text, rejected=True)
+                    continue
+                batch = planners["deepl"].next_batch(queue)
+                in_flight["deepl"] += 1
+                sent["deepl"][col_idx] += 1
+                future = deepl_pool.submit(
+                    deepl_translate_batch, translator, [t for _, t in batch], TARGET_COLS[col_idx]["deepl"], metrics,
+                )
+                job = {"col": col_idx, "batch": batch, "bn": sent["deepl"][col_idx], "deepl": future, "hedge": None,
+                       "error": None, "started": time.monotonic()}
+                pending[future] = ("deepl", job, job["started"])
+                unanswered[future] = job
+        if held:
+            metrics.count("deepl_backpressure")
+        deepl_done = not in_flight["deepl"] and not any(deepl_queues.values())
+        while claude_queue and in_flight["claude"] < claude_workers:
+            # Wait for a full batch while Claude is busy and DeepL may still add to it
+            if len(claude_queue) < planners["claude"].target_texts and in_flight["claude"] and not deepl_done:
+                break
+            if not breakers["claude"].allow():
+                skipped["claude"] += min(len(claude_queue), CLAUDE_LIMITS.max_texts)
+                for _ in range(min(len(claude_queue), CLAUDE_LIMITS.max_texts)):
+                    cols, text = claude_queue.popleft()
+                    for c, rows in cols.items():
+                        claude_rejected(c, rows, text, applied)
+                continue
+            batch = planners["claude"].next_batch(claude_queue)
+            in_flight["claude"] += 1
+            sent["claude"] += 1
+            items = [(text, [TARGET_COLS[c]["claude"] for c in cols]) for cols, text in batch]
+            future = claude_pool.submit(claude_translate_batch, items, claude, metrics)
+            pending[future] = ("claude", (batch, sent["claude"]), time.monotonic())
+        journal.record(applied)
+
+    def hedge():
+        """Send a Claude copy of every DeepL batch past DeepL's p95; returns seconds until the next is due, or None."""
+        after = breakers["deepl"].hedge_after() if hedging else None
+        if after is None:
+            return None
+        now = time.monotonic()
+        next_due = None
+        for job in unanswered.values():
+            if job["hedge"] is not None:
+                continue
+            due = job["started"] + after - now
+            if due > 0:
+                next_due = due if next_due is None else min(next_due, due)
+                continue
+            # A Claude worker must be free, or the copy would only queue behind other batches; a
+            # recovering Claude is probed by its own batches, not by hedges
+            if (in_flight["claude"] >= claude_workers or breakers["claude"].state != circuit_breaker.CLOSED
+                    or not circuit_breaker.hedge_allowed(hedges["sent"], sum(sent["deepl"].values()))):
+                continue
+            in_flight["claude"] += 1
+            hedges["sent"] += 1
+            language = TARGET_COLS[job["col"]]["claude"]
+            job["hedge"] = claude_pool.submit(claude_translate_batch, [(t, [language]) for _, t in job["batch"]], claude, metrics)
+            pending[job["hedge"]] = ("hedge", job, now)
+        return next_due
+
+    def deepl_answered(col_idx, rows, text, rejected):
+        if rejected:
+            needs.setdefault(text, {})[col_idx] = rows
+        deepl_due[text] -= 1
+        if not deepl_due[text]:
+            del deepl_due[text]
+            cols = needs.pop(text, None)
+            if cols:
+                claude_queue.append((cols, text))
+                claude_texts["texts"] += 1
+                claude_texts["translations"] += len(cols)
+
+    def english_done(rows, applied):
+        for row_idx in rows:
+            english_pending.discard(row_idx)
+            waiting = english_waiting.pop(row_idx, None)
+            if waiting:
+                applied.extend(english_fallback(values, waiting, stats))
+
+    def claude_rejected(col_idx, rows, text, applied):
+        # English fallback (for cols 4,5,6,7 only; col 3 IS English) reads the English column
+        fallback_cells[col_idx] += len(rows)
+        ready = []
+        for row_idx in rows:
+            if col_idx != COL_ENGLISH and row_idx in english_pending:
+                english_waiting.setdefault(row_idx, []).append((row_idx, col_idx, text))
+            else:
+                ready.append((row_idx, col_idx, text))
+        applied.extend(english_fallback(values, ready, stats))
+        if col_idx == COL_ENGLISH:
+            english_done(rows, applied)
+
+    def apply(col_idx, rows, text, translated, engine, applied, accepted, stage):
+        """Apply one answer of `engine`; a reject moves on from `stage`, the step the cell was at."""
+        if translated and not has_korean(translated):
+            for row_idx in rows:
+                values[row_idx][col_idx] = translated
+                applied.append((row_idx, col_idx, translated, engine))
+            stats[col_idx][engine] += len(rows)
+            accepted.setdefault(col_idx, []).append((text, translated))
+            if col_idx == COL_ENGLISH:
+                english_done(rows, applied)
+            return True
+        if stage == "deepl":
+            deepl_answered(col_idx, rows, text, rejected=True)
+        else:
+            claude_rejected(col_idx, rows, text, applied)
+        return False
+
+    def deepl_finished(kind, job, future, applied, accepted):
+        """
+        Handle an answer to a DeepL batch, from DeepL or its hedge. The first
+        success is applied; a failure waits for the other request if there is
+        one. Returns the engine whose translations were applied, or None.
+        """
+        other = job["hedge"] if kind == "deepl" else job["deepl"]
+        if job["deepl"] not in unanswered:
+            return None
+        col_idx, batch, bn = job["col"], job["batch"], job["bn"]
+        error = future.exception()
+        if error is not None and other is not None and other in pending:
+            if kind == "deepl":
+                job["error"] = error
+            return None
+        del unanswered[job["deepl"]]
+        if error is not None:
+            planners["deepl"].shrink(batch)
+            print(f"  [{TARGET_COLS[col_idx]['name']}] DeepL batch {bn} ({len(batch)} texts)... FAILED: {job['error'] or error}")
+            for rows, text in batch:
+                deepl_answered(col_idx, rows, text, rejected=True)
+            return None
+        if other is not None and other in pending:
+            # The loser's answer is dropped when it arrives; a copy still queued is not sent at all
+            if not other.cancel():
+                losers.add(other)
+        if kind == "deepl":
+            engine, note = "deepl", ""
+            translations = future.result()[0]
+            planners["deepl"].succeeded(batch)
+        else:
+            engine, note = "claude", f" via Claude hedge after {time.monotonic() - job['started']:.1f}s"
+            hedges["won"] += 1
+            language = TARGET_COLS[col_idx]["claude"]
+            translations = [by_language.get(language) for by_language in future.result()[0]]
+        ok = 0
+        for (rows, text), translated in zip(batch, translations):
+            if apply(col_idx, rows, text, translated, engine, applied, accepted, "deepl"):
+                ok += 1
+                deepl_answered(col_idx, rows, text, rejected=False)
+        print(f"  [{TARGET_COLS[col_idx]['name']}] DeepL batch {bn} ({len(batch)} texts)... OK{note} ({ok}/{len(batch)})")
+        return engine
+
+    def claude_finished(batch, bn, future, applied, accepted):
+        planner = planners["claude"]
+        try:
+            translations, truncated, output_tokens, followups = future.result()
+        except Exception as e:
+            planner.shrink(batch)
+            print(f"  Claude batch {bn} ({len(batch)} texts)... FAILED: {e}")
+            for cols, text in batch:
+                for c, rows in cols.items():
+                    claude_rejected(c, rows, text, applied)
+            return
+        # Ids cut off by truncation were already re-requested by claude_translate_batch
+        if truncated:
+            metrics.count("claude_truncated")
+            planner.shrink(batch, truncated=True)
+        else:
+            planner.succeeded(batch, output_tokens)
+        metrics.count("claude_followups", followups)
+        note = f", {followups} follow-up{'s' if followups != 1 else ''}" if followups else ""
+        wanted = sum(len(cols) for cols, _ in batch)
+        ok = sum(apply(c, rows, text, by_language.get(TARGET_COLS[c]["claude"]), "claude", applied, accepted, "claude")
+                 for (cols, text), by_language in zip(batch, translations)
+                 for c, rows in cols.items())
+        print(f"  Claude batch {bn} ({len(batch)} texts, {wanted} translations)... OK ({ok}/{wanted}{note})")
+
+    try:
+        fill()
+        while len(pending) > len(losers):
+            done, _ = wait(pending, timeout=hedge(), return_when=FIRST_COMPLETED)
+            for future in done:
+                kind, job, started = pending.pop(future)
+                losers.discard(future)
+                in_flight["deepl" if kind == "deepl" else "claude"] -= 1
+                if future.cancelled():
+                    continue
+                breakers["deepl" if kind == "deepl" else "claude"].record(
+                    time.monotonic() - started, ok=future.exception() is None,
+                )
+                applied = []
+                accepted = {}
+                if kind == "claude":
+                    engine = "claude"
+                    claude_finished(*job, future, applied, accepted)
+                else:
+                    engine = deepl_finished(kind, job, future, applied, accepted)
+                journal.record(applied)
+                for c, pairs in accepted.items():
+                    memory.store(pairs, TARGET_COLS[c]["deepl"], engine)
+            fill()
+    finally:
+        deepl_pool.shutdown(wait=False, cancel_futures=True)
+        claude_pool.shutdown(wait=False, cancel_futures=True)
+
+    metrics.count("deepl_breaker_skipped_texts", skipped["deepl"])
+    metrics.count("claude_breaker_skipped_texts", skipped["claude"])
+    metrics.count("hedges_sent", hedges["sent"])
+    metrics.count("hedges_won", hedges["won"])
+    if claude_texts["texts"]:
+        print(f"\n  Claude: {claude_texts['texts']} unique texts for {claude_texts['translations']} translations "
+              f"({claude_texts['translations'] - claude_texts['texts']} repeated prompts saved)")
+    for col_idx, count in fallback_cells.items():
+        if count:
+            print(f"  [{TARGET_COLS[col_idx]['name']}] English fallback: {count} proper nouns")
+    if hedges["sent"]:
+        print(f"  Hedged: {hedges['sent']} slow DeepL batches also sent to Claude, {hedges['won']} answered first by Claude")
+    for engine, count in skipped.items():
+        if count:
+            print(f"  {breakers[engine].name} breaker: {count} texts sent on without asking {breakers[engine].name}")
+    print(planners["deepl"].summary("DeepL"))
+    print(planners["claude"].summary("Claude"))
+    return stats
+
+
+def save_sheet(data_path, reader, values, manifest, journal, patch_out, patch_header=None):
+    """
+    Write the cells that changed in the kept rows, then drop the journal.
+
+    By default only the changed rows are spliced into the sheet and the
+    manifest is saved. With --patch-out the changes go to a patch file for
+    apply_patch.py and the sheet and manifest are left alone.
+    """
+    engines = {(row_idx, col_idx): engine for row_idx, col_idx, _, engine in journal.read()}
+    try:
+        sheet_stream.check_unchanged(data_path, reader.fingerprint)
+        changes = sheet_patch.diff_rows(sheet_stream.read_rows(data_path, values), values, engines, "fill")
+        if patch_out:
+            sheet_patch.write_patch(patch_out, changes, data_path, __file__, patch_header)
+            print(f"Patch: {len(changes)} changed cells written to {patch_out} (apply with apply_patch.py)")
+        else:
+            sheet_stream.splice(data_path, {r: values[r] for r in {c[0] for c in changes}}, reader.fingerprint)
+    except sheet_stream.SheetChangedError as e:
+        print(f"ERROR: {e}"); sys.exit(1)
+    journal.finish()
+    if not patch_out:
+        for row in values.values():
+            manifest.record(row, row_needs_work)
+        manifest.save(data_path)
 
 
 def main():
-    deepl_key = os.environ.get("DEEPL_API_KEY")
-    claude_key = os.environ.get("CLAUDE_API_KEY")
+    parser = argparse.ArgumentParser(description="Translate all remaining glossary entries (DeepL -> Claude -> English)")
+    parser.add_argument("--deepl-concurrency", type=int, default=4, help="Max DeepL batches in flight at once")
+    parser.add_argument("--claude-concurrency", type=int, default=2, help="Max Claude batches in flight at once")
+    parser.add_argument("--claude-rps", type=float, default=1.0,
+                        help="Claude requests per second (token bucket; 429 retry-after pauses it further)")
+    parser.add_argument("--no-breakers", action="store_true",
+                        help="Keep sending to an engine that fails or answers slowly instead of skipping it for a while")
+    parser.add_argument("--no-hedging", action="store_true",
+                        help="Do not send a Claude copy of DeepL batches slower than DeepL's p95")
+    parser.add_argument("--breaker-cooldown", type=float, default=circuit_breaker.DEEPL_BREAKER.cooldown,
+                        help="Seconds an open breaker skips its engine before probing it again")
+    parser.add_argument("--deepl-slow-seconds", type=float, default=circuit_breaker.DEEPL_BREAKER.slow_seconds,
+                        help="A DeepL request slower than this counts as failed for the breaker")
+    parser.add_argument("--claude-slow-seconds", type=float, default=circuit_breaker.CLAUDE_BREAKER.slow_seconds,
+                        help="A Claude request slower than this counts as failed for the breaker")
+    parser.add_argument("--resume", action="store_true", help="Replay the checkpoint journal of an interrupted run")
+    parser.add_argument("--full-scan", action="store_true", help="Scan every row, ignoring the row-hash manifest")
+    parser.add_argument("--budget", type=int, help="Max DeepL characters to send this run; the most important cells go first")
+    parser.add_argument("--dry-run", action="store_true", help="Print the cost plan without translating or saving")
+    parser.add_argument("--no-templates", action="store_true",
+                        help="Send texts that differ only by a name or number one by one instead of as label templates")
+    parser.add_argument("--patch-out", type=Path,
+                        help="Write the changed cells to this patch file instead of updating the sheet (see apply_patch.py)")
+    sharding.add_shard_arguments(parser)
+    translation_memory.add_cache_arguments(parser)
+    run_metrics.add_metrics_arguments(parser)
+    args = parser.parse_args()
+    shard = sharding.from_args(parser, args)
+    with run_metrics.session(shard.state_name(__file__) if shard else __file__, args) as metrics:
+        run(args, metrics, shard)
+
+
+def run(args, metrics, shard=None):
+
+    # A shard may have its own keys (sharding.py)
+    deepl_key, deepl_source = sharding.api_key("DEEPL_API_KEY", shard)
+    claude_key, claude_source = sharding.api_key("CLAUDE_API_KEY", shard)
     if not deepl_key:
         print("ERROR: DEEPL_API_KEY not set"); sys.exit(1)
     if not claude_key:
         print("ERROR: CLAUDE_API_KEY not set"); sys.exit(1)
+    patch_header = shard.header({"deepl": deepl_source, "claude": claude_source}) if shard else None
+    if shard:
+        print(f"Shard {shard} (by {shard.by}), keys from {deepl_source} / {claude_source}, patch: {args.patch_out}\n")
+
+    data_path = Path(__file__).parent.parent / "src" / "main" / "resources" / "data" / "sheet_db.json"
+    manifest = row_manifest.RowManifest(row_manifest.manifest_path_for(__file__), enabled=not args.full_scan)
+    if not args.resume and manifest.sheet_unchanged(data_path):
+        print(f"No changes since the last successful run: {data_path}")
+        print("Nothing to do (use --full-scan to re-check every row).")
+        if shard:
+            # The merge expects a patch from every shard
+            sheet_patch.write_patch(args.patch_out, [], data_path, __file__, patch_header)
+        return
 
-    translator = deepl.Translator(deepl_key)
-    usage = translator.get_usage()
+    with metrics.phase("connect"):
+        translator = deepl.Translator(deepl_key, server_url=os.environ.get("DEEPL_SERVER_URL"))
+        usage = translator.get_usage()
     print(f"DeepL connected. Usage: {usage.character.count:,} / {usage.character.limit:,}")
+    # A shard plans with its part of the quota and of --budget (see sharding.py)
+    quota, budget = cost_planner.quota_remaining(usage), args.budget
+    if shard:
+        quota, budget, limits = sharding.deepl_limits(shard, quota, budget)
+        patch_header.update(limits)
+        print(f"Shard limits: quota {limits['deepl_quota']} (key shared by {limits['deepl_key_shards']} shards), "
+              f"budget {limits['budget']}")
 
-    data_path = Path(__file__).parent.parent / "src" / "main" / "resources" / "data" / "sheet_db.json"
-    print(f"Loading: {data_path}")
-    with open(data_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    backup = None
+    if not args.dry_run and not args.patch_out:
+        store = backup_store.BackupStore()
+        with metrics.phase("backup"):
+            backup = store.backup(data_path, label=Path(__file__).stem)
+            store.prune()
+        metrics.set("backup_written_bytes", backup.written_bytes)
+        print(f"Backup: {backup.describe()}\n")
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_path = data_path.with_suffix(f".json.backup.{timestamp}")
-    shutil.copy2(data_path, backup_path)
-    print(f"Backup: {backup_path}\n")
+    journal = checkpoint.CheckpointJournal(checkpoint.journal_path_for(shard.state_name(__file__) if shard else __file__), data_path)
+    if journal.path.exists() and not args.resume and not args.dry_run:
+        print(f"Discarding journal of an unfinished run (use --resume to replay it): {journal.path}")
+    try:
+        if args.dry_run:
+            # Leave the journal untouched; only read it to show what --resume would skip
+            records = journal.read() if args.resume and journal.path.exists() else []
+        else:
+            records = journal.start(args.resume)
+    except ValueError as e:
+        print(f"ERROR: {e}"); sys.exit(1)
+    replay = checkpoint.group_by_row(records)
+    restored = 0
+
+    # Stream the sheet once: replay the journal, index existing translations for
+    # same-ko reuse, and keep only rows added or changed since the last
+    # successful run that still need work
+    print(f"Loading: {data_path}")
+    reader = sheet_stream.SheetReader(data_path)
+    reuse = source_dedup.ReuseIndex(TARGET_COLS)
+    names = None if args.no_templates else label_templates.NameIndex(TARGET_COLS)
+    values = {}
+    with metrics.phase("load"):
+        for row_idx, row in reader.rows():
+            if row_idx < sheet_scanner.FIRST_DATA_ROW:
+                continue
+            replayed = 0
+            if row_idx in replay:
+                replayed = checkpoint.replay_row(row, replay[row_idx], lambda v: is_empty(v) or has_korean(v))
+                restored += replayed
+            reuse.add(row)
+            if names is not None:
+                names.add(row)
+            if not replayed and not manifest.changed(row):
+                continue
+            if shard and not shard.owns(row_idx, row):
+                continue
+            # Replayed rows differ from the file and are always written back
+            if replayed or row_needs_work(row):
+                values[row_idx] = row
+            else:
+                manifest.record(row, row_needs_work)
+    metrics.set("rows", reader.row_count)
+    if records:
+        print(f"Resumed: restored {restored} of {len(records)} journaled cells\n")
+    if manifest.skipped:
+        print(f"Row manifest: {manifest.skipped} unchanged rows skipped, {len(values)} changed rows need work\n")
 
-    values = data["values"]
+    # One pass classifies every target cell of the kept rows; Phases A and B read the status matrix
+    with metrics.phase("scan"):
+        scan = sheet_scanner.scan(values, TARGET_COLS, list(values))
+    metrics.set("rows_scanned", len(scan.rows))
 
     # Phase A: Fill empty values (cols 4,5,6,7) with English value
-    empty_filled = {col: 0 for col in [COL_ZH_HANS, COL_JAPANESE, COL_SPANISH, COL_ZH_HANT]}
+    empty_filled = {col: 0 for col in FILL_COLS}
+    fills = []
     print("Phase A: Filling empty values with English column value...")
-    for row_idx in range(2, len(values)):
-        row = values[row_idx]
-        eng_val = row[COL_ENGLISH] if len(row) > COL_ENGLISH else ""
-        if is_empty(eng_val):
-            continue
-        for col_idx in [COL_ZH_HANS, COL_JAPANESE, COL_SPANISH, COL_ZH_HANT]:
-            if col_idx < len(row):
-                if is_empty(row[col_idx]):
-                    row[col_idx] = eng_val
+    with metrics.phase("fill"):
+        has_english = set(scan.positions(COL_ENGLISH, (sheet_scanner.TRANSLATED, sheet_scanner.KOREAN)))
+        for col_idx in FILL_COLS:
+            for pos in scan.positions(col_idx, sheet_scanner.BLANK):
+                if pos in has_english:
+                    english = values[scan.rows[pos]][COL_ENGLISH]
+                    scan.update(pos, col_idx, english)
+                    fills.append((scan.rows[pos], col_idx, english, "fill"))
                     empty_filled[col_idx] += 1
-            else:
-                while len(row) <= col_idx:
-                    row.append("")
-                row[col_idx] = eng_val
-                empty_filled[col_idx] += 1
 
     for col_idx, count in empty_filled.items():
         if count > 0:
@@ -130,12 +804,7 @@ def main():
     print()
 
     # Phase B: Find remaining Korean-text entries in ALL columns
-    missing = {col: [] for col in TARGET_COLS}
-    for row_idx in range(2, len(values)):
-        row = values[row_idx]
-        for col_idx in TARGET_COLS:
-            if col_idx < len(row) and has_korean(row[col_idx]):
-                missing[col_idx].append((row_idx, row[col_idx]))
+    missing = {col: scan.cells(col) for col in TARGET_COLS}
 
     print("Phase B: Remaining untranslated (Korean text) entries:")
     for col_idx, entries in missing.items():
@@ -145,101 +814,83 @@ def main():
     total_missing = sum(len(v) for v in missing.values())
     if total_missing == 0:
         print("  All entries translated!")
-        with open(data_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        print(f"\nSaved (empty fills only). Backup: {backup_path}")
+        if args.dry_run:
+            return
+        with metrics.phase("save"):
+            save_sheet(data_path, reader, values, manifest, journal, args.patch_out, patch_header)
+        if not args.patch_out:
+            print(f"\nSaved (empty fills only). Backup: {backup.snapshot.id}")
+        return
+
+    print()
+    with metrics.phase("prepare"):
+        memory = translation_memory.open_from_args(args)
+        dedup = source_dedup.DedupStats()
+        groups, templates, stats, prepared = prepare_columns(values, missing, memory, dedup, reuse, names)
+
+        # Plan DeepL characters and Claude tokens before any translation request
+        plan, kept = cost_planner.plan_costs(
+            values, label_templates.with_templates(groups, templates), {col: info["name"] for col, info in TARGET_COLS.items()},
+            quota_remaining=quota, budget=budget,
+            shares={col: cost_planner.claude_share(memory, info["deepl"]) for col, info in TARGET_COLS.items()},
+        )
+        groups, templates = label_templates.split_planned(kept, templates)
+    metrics.set("planned_deepl_chars", plan.deepl_chars)
+    print(plan.report())
+    print()
+    if args.dry_run:
+        memory.close()
+        print("DRY RUN - nothing translated or saved")
         return
 
-    stats = {col: {"deepl": 0, "claude": 0, "english_fallback": 0, "failed": 0} for col in TARGET_COLS}
-    BATCH_SIZE = 30
+    # Fills go first: on --resume they must be replayed before the English cell
+    # they copied is, or Phase A would copy the translated English instead
+    journal.record(fills)
+    journal.record(prepared)
+    claude = ClaudeClient(claude_key, pool_size=args.claude_concurrency, requests_per_second=args.claude_rps)
 
-    for col_idx, info in TARGET_COLS.items():
-        entries = missing[col_idx]
-        if not entries:
-            continue
+    def breaker_changed(breaker, reason):
+        print(f"  {breaker.name} circuit breaker {breaker.state.upper()}: {reason}")
+        if breaker.state != circuit_breaker.HALF_OPEN:
+            event = "opened" if breaker.state == circuit_breaker.OPEN else "closed"
+            metrics.count(f"{breaker.name.lower()}_breaker_{event}")
 
-        print(f"\n{'='*50}")
-        print(f"Translating {info['name']} ({len(entries)} entries)")
-        print(f"{'='*50}")
-
-        # Step 1: DeepL
-        deepl_failed = []
-        for i in range(0, len(entries), BATCH_SIZE):
-            batch = entries[i:i + BATCH_SIZE]
-            texts = [t for _, t in batch]
-            row_indices = [r for r, _ in batch]
-            bn = i // BATCH_SIZE + 1
-            tb = (len(entries) + BATCH_SIZE - 1) // BATCH_SIZE
-            print(f"  DeepL {bn}/{tb} ({len(texts)} texts)...", end=" ")
-            try:
-                results = translator.translate_text(texts, source_lang="KO", target_lang=info["deepl"])
-                if not isinstance(results, list):
-                    results = [results]
-                ok = 0
-                for j, result in enumerate(results):
-                    translated = result.text
-                    if translated and not has_korean(translated):
-                        data["values"][row_indices[j]][col_idx] = translated
-                        stats[col_idx]["deepl"] += 1
-                        ok += 1
-                    else:
-                        deepl_failed.append((row_indices[j], texts[j]))
-                print(f"OK ({ok}/{len(batch)})")
-            except Exception as e:
-                print(f"FAILED: {e}")
-                deepl_failed.extend(batch)
-
-        # Step 2: Claude AI fallback
-        if deepl_failed:
-            print(f"\n  Claude fallback: {len(deepl_failed)} entries...")
-            claude_failed = []
-            for i in range(0, len(deepl_failed), 20):
-                batch = deepl_failed[i:i + 20]
-                texts = [t for _, t in batch]
-                row_indices = [r for r, _ in batch]
-                bn = i // 20 + 1
-                tb = (len(deepl_failed) + 19) // 20
-                print(f"  Claude {bn}/{tb} ({len(texts)} texts)...", end=" ")
-                try:
-                    translations = claude_translate_batch(texts, info["claude"], claude_key)
-                    ok = 0
-                    for j, translation in enumerate(translations):
-                        if translation and not has_korean(translation):
-                            data["values"][row_indices[j]][col_idx] = translation
-                            stats[col_idx]["claude"] += 1
-                            ok += 1
-                        else:
-                            claude_failed.append((row_indices[j], texts[j]))
-                    print(f"OK ({ok}/{len(batch)})")
-                except Exception as e:
-                    print(f"FAILED: {e}")
-                    claude_failed.extend(batch)
-                time.sleep(1)
-
-            # Step 3: English fallback (for cols 4,5,6,7 only; col 3 IS English)
-            if claude_failed:
-                print(f"\n  English fallback: {len(claude_failed)} proper nouns...")
-                for row_idx, korean_text in claude_failed:
-                    row = data["values"][row_idx]
-                    if col_idx == COL_ENGLISH:
-                        # For English column, can't fallback to itself
-                        stats[col_idx]["failed"] += 1
-                        key_name = row[COL_KEY_NAME] if len(row) > COL_KEY_NAME else "?"
-                        print(f"    FAILED: row {row_idx} ({key_name}): {korean_text[:40]}")
-                    else:
-                        eng_val = row[COL_ENGLISH] if len(row) > COL_ENGLISH else ""
-                        if eng_val and not has_korean(eng_val):
-                            data["values"][row_idx][col_idx] = eng_val
-                            stats[col_idx]["english_fallback"] += 1
-                        else:
-                            stats[col_idx]["failed"] += 1
-                            key_name = row[COL_KEY_NAME] if len(row) > COL_KEY_NAME else "?"
-                            print(f"    FAILED: row {row_idx} ({key_name}): {korean_text[:40]}")
+    breakers = {
+        engine: circuit_breaker.CircuitBreaker(
+            name, circuit_breaker.BreakerPolicy(slow_seconds, cooldown=args.breaker_cooldown),
+            enabled=not args.no_breakers, on_change=breaker_changed,
+        )
+        for engine, name, slow_seconds in (
+            ("deepl", "DeepL", args.deepl_slow_seconds), ("claude", "Claude", args.claude_slow_seconds),
+        )
+    }
+    template_stats = label_templates.TemplateStats()
+    try:
+        if any(templates.values()):
+            with metrics.phase("templates"):
+                leftover = translate_templates(
+                    values, templates, names, template_stats, stats, translator, memory, journal, metrics,
+                    args.deepl_concurrency, breakers["deepl"],
+                )
+            for col_idx, col_groups in leftover.items():
+                groups[col_idx] = col_groups + groups[col_idx]
+        with metrics.phase("translate"):
+            stats = translate_concurrently(
+                values, groups, stats, translator, claude, memory, journal, metrics,
+                args.deepl_concurrency, args.claude_concurrency, breakers, hedging=not args.no_hedging,
+            )
+    finally:
+        claude.close()
+        memory.close()
+        journal.close()
+        metrics.set("claude_retries", claude.retries)
+        metrics.set("claude_throttle_seconds", round(claude.bucket.waited, 3))
+        metrics.set("claude_backoff_seconds", round(claude.backoff_seconds, 3))
 
     # Save
-    print(f"\nSaving to: {data_path}")
-    with open(data_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    print(f"\nSaving to: {args.patch_out or data_path}")
+    with metrics.phase("save"):
+        save_sheet(data_path, reader, values, manifest, journal, args.patch_out, patch_header)
 
     # Summary
     print(f"\n{'='*60}")
@@ -256,18 +907,39 @@ def main():
     grand_failed = 0
     for col_idx, info in TARGET_COLS.items():
         s = stats[col_idx]
-        total = s["deepl"] + s["claude"] + s["english_fallback"] + s["failed"]
+        total = s["reused"] + s["cache"] + s["deepl"] + s["claude"] + s["english_fallback"] + s["failed"]
         if total > 0:
             print(f"\n  {info['name']} ({total} entries):")
+            print(f"    Same-ko rows:     {s['reused']}")
+            print(f"    Cache:            {s['cache']}")
             print(f"    DeepL:            {s['deepl']}")
             print(f"    Claude AI:        {s['claude']}")
             print(f"    English fallback: {s['english_fallback']}")
             print(f"    Failed:           {s['failed']}")
-            grand_success += s["deepl"] + s["claude"] + s["english_fallback"]
+            grand_success += s["reused"] + s["cache"] + s["deepl"] + s["claude"] + s["english_fallback"]
             grand_failed += s["failed"]
 
+    for key in ("reused", "cache", "deepl", "claude", "english_fallback", "failed"):
+        metrics.set(f"cells_{key}", sum(s[key] for s in stats.values()))
+    metrics.set("cells_empty_filled", sum(empty_filled.values()))
+    metrics.set("cells_deferred", plan.deferred_cells)
+    metrics.set("dedup_chars_saved", dedup.chars_saved)
+    metrics.set("template_texts_saved", template_stats.texts_saved)
+    metrics.set("cache_hits", memory.hits)
+    metrics.set("cache_misses", memory.misses)
+
     print(f"\nGrand Total: {grand_success} success, {grand_failed} failed")
-    print(f"Backup: {backup_path}")
+    if plan.deferred_cells:
+        print(f"Deferred by the cost plan: {plan.deferred_cells} cells (still Korean; picked up by the next run)")
+    print(dedup.summary())
+    if template_stats.templates:
+        print(template_stats.summary())
+    print(memory.summary())
+    print(f"Claude retries: {claude.retries}")
+    for breaker in breakers.values():
+        print(breaker.summary())
+    if backup:
+        print(f"Backup: {backup.snapshot.id} (undo with: python backups.py restore {backup.snapshot.id})")
     print(f"{'='*60}")
 
 
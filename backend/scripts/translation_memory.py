@@ -0,0 +1,207 @@
+"""
+On-disk translation memory shared by the translation scripts.
+
+Every accepted translation is stored in a small SQLite database keyed by
+(source text, target language, engine). Before a script sends text to DeepL or
+Claude it looks the text up here, so re-running after a sheet re-export costs
+no API characters for strings that were already translated once.
+
+Target languages are always stored as DeepL codes ("EN-US", "JA", ...), so both
+scripts share the same entries regardless of which engine produced them.
+
+Eviction:
+    - Entries older than --cache-ttl-days are ignored on lookup and purged on open
+    - When the table grows past --cache-max-entries, the least recently used
+      entries are dropped on close
+
+A --dry-run opens the database read-only: lookups work, but nothing is
+stored, touched, purged or trimmed.
+"""
+
+import argparse
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+DEFAULT_CACHE_PATH = Path(__file__).parent / ".state" / "translation_memory.sqlite3"
+DEFAULT_TTL_DAYS = 180
+DEFAULT_MAX_ENTRIES = 500_000
+
+# SQLite limits the number of bound parameters per statement
+_LOOKUP_CHUNK = 500
+
+
+class TranslationMemory:
+    """SQLite-backed cache of accepted translations with hit/miss counters."""
+
+    def __init__(
+        self,
+        path: Path = DEFAULT_CACHE_PATH,
+        ttl_days: Optional[float] = DEFAULT_TTL_DAYS,
+        max_entries: Optional[int] = DEFAULT_MAX_ENTRIES,
+        enabled: bool = True,
+        read_only: bool = False,
+    ):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_days * 86400 if ttl_days else None
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.read_only = read_only
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self._conn = None
+
+        if not enabled:
+            return
+        if read_only:
+            # No database yet means nothing cached; do not create one
+            if self.path.exists():
+                self._conn = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True, timeout=60)
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Shards of one run (sharding.py) may share the database; wait out each other's writes
+        self._conn = sqlite3.connect(str(self.path), timeout=60)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS translations (
+                source      TEXT NOT NULL,
+                target_lang TEXT NOT NULL,
+                engine      TEXT NOT NULL,
+                translation TEXT NOT NULL,
+                created_at  REAL NOT NULL,
+                last_used   REAL NOT NULL,
+                PRIMARY KEY (source, target_lang, engine)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_translations_last_used ON translations (last_used)")
+        self._purge_expired()
+        self._conn.commit()
+
+    def lookup(
+        self,
+        texts: Iterable[str],
+        target_lang: str,
+        engines: Sequence[str] = ("deepl", "claude"),
+    ) -> Dict[str, Tuple[str, str]]:
+        """
+        Look up cached translations for a set of source texts.
+
+        Returns:
+            Dict mapping source text to (translation, engine). When several
+            engines have an entry, the one listed first in `engines` wins.
+        """
+        unique = list(dict.fromkeys(texts))
+        if self._conn is None or not unique:
+            self.misses += len(unique)
+            return {}
+
+        rank = {engine: i for i, engine in enumerate(engines)}
+        found: Dict[str, Tuple[str, str]] = {}
+        cutoff = time.time() - self.ttl_seconds if self.ttl_seconds else 0.0
+        engine_marks = ",".join("?" * len(engines))
+
+        for i in range(0, len(unique), _LOOKUP_CHUNK):
+            chunk = unique[i:i + _LOOKUP_CHUNK]
+            rows = self._conn.execute(
+                f"SELECT source, engine, translation FROM translations "
+                f"WHERE target_lang = ? AND created_at >= ? "
+                f"AND engine IN ({engine_marks}) AND source IN ({','.join('?' * len(chunk))})",
+                (target_lang, cutoff, *engines, *chunk),
+            ).fetchall()
+            for source, engine, translation in rows:
+                current = found.get(source)
+                if current is None or rank[engine] < rank[current[1]]:
+                    found[source] = (translation, engine)
+
+        if found and not self.read_only:
+            now = time.time()
+            self._conn.executemany(
+                "UPDATE translations SET last_used = ? WHERE source = ? AND target_lang = ? AND engine = ?",
+                [(now, source, target_lang, engine) for source, (_, engine) in found.items()],
+            )
+            self._conn.commit()
+
+        self.hits += len(found)
+        self.misses += len(unique) - len(found)
+        return found
+
+    def store(self, pairs: Iterable[Tuple[str, str]], target_lang: str, engine: str) -> None:
+        """Store accepted (source, translation) pairs produced by `engine`."""
+        if self._conn is None or self.read_only:
+            return
+        now = time.time()
+        rows = [(source, target_lang, engine, translation, now, now) for source, translation in pairs if translation]
+        if not rows:
+            return
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO translations "
+            "(source, target_lang, engine, translation, created_at, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        self._conn.commit()
+        self.stored += len(rows)
+
+    def engine_counts(self, target_lang: str) -> Dict[str, int]:
+        """Number of stored translations per engine for `target_lang`."""
+        if self._conn is None:
+            return {}
+        rows = self._conn.execute(
+            "SELECT engine, COUNT(*) FROM translations WHERE target_lang = ? GROUP BY engine", (target_lang,)
+        ).fetchall()
+        return dict(rows)
+
+    def close(self) -> None:
+        """Apply the size limit and close the database."""
+        if self._conn is None:
+            return
+        if not self.read_only:
+            self._trim_to_size()
+            self._conn.commit()
+        self._conn.close()
+        self._conn = None
+
+    def summary(self) -> str:
+        if not self.enabled:
+            return "Translation memory: disabled (--no-cache)"
+        return f"Translation memory: {self.hits} hits, {self.misses} misses, {self.stored} stored ({self.path})"
+
+    def _purge_expired(self) -> None:
+        if self.ttl_seconds:
+            self._conn.execute("DELETE FROM translations WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+
+    def _trim_to_size(self) -> None:
+        if not self.max_entries:
+            return
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM translations WHERE rowid IN "
+                "(SELECT rowid FROM translations ORDER BY last_used ASC LIMIT ?)",
+                (excess,),
+            )
+
+
+def add_cache_arguments(parser: argparse.ArgumentParser) -> None:
+    """Register the translation memory command-line options."""
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the translation memory")
+    parser.add_argument("--cache-path", type=Path, default=DEFAULT_CACHE_PATH, help="Translation memory database file")
+    parser.add_argument("--cache-ttl-days", type=float, default=DEFAULT_TTL_DAYS,
+                        help="Ignore and purge cached translations older than this (0 = keep forever)")
+    parser.add_argument("--cache-max-entries", type=int, default=DEFAULT_MAX_ENTRIES,
+                        help="Drop least recently used entries beyond this count (0 = unlimited)")
+
+
+def open_from_args(args: argparse.Namespace) -> TranslationMemory:
+    return TranslationMemory(
+        path=args.cache_path,
+        ttl_days=args.cache_ttl_days,
+        max_entries=args.cache_max_entries,
+        enabled=not args.no_cache,
+        read_only=getattr(args, "dry_run", False),
+    )
@@ -22,6 +22,7 @@ class GlossaryInitializer(
     private val glossaryTokenRepository: GlossaryTokenRepository,
     private val multiLangTokenRepository: GlossaryMultiLangTokenRepository,
     private val tokenIndexService: TokenIndexService,
+    private val glossarySnapshotService: GlossarySnapshotService,
     private val objectMapper: ObjectMapper,
     @Value("\${glossary.local.path:}") private val localJsonPath: String
 ) {
@@ -32,8 +33,23 @@ class GlossaryInitializer(
         if (glossaryRepository.count() > 0) return
 
         val jsonContent = loadJsonContent() ?: return
+
+        // Precompiled snapshot: rows and token indexes are ready, nothing to tokenize
+        val snapshot = glossarySnapshotService.load(jsonContent)
+        if (snapshot != null) {
+            initFromSnapshot(snapshot)
+            return
+        }
+
+        val glossaries = parseGlossaries(jsonContent) ?: return
+
+        glossaryRepository.saveAll(glossaries)
+        logger.info("Initialized ${glossaries.size} glossary items.")
+    }
+
+    internal fun parseGlossaries(jsonContent: String): List<Glossary>? {
         val root: JsonNode = objectMapper.readTree(jsonContent)
-        val values = root.get("values") ?: return
+        val values = root.get("values") ?: return null
 
         val glossaries = mutableListOf<Glossary>()
 
@@ -42,35 +58,44 @@ class GlossaryInitializer(
             val row = values.get(i)
             if (row.size() < 6) continue
 
-            glossaries.add(
-                Glossary(
-                    pageUrl = row.safeText(0),
-                    keyName = row.safeText(1),
-                    ko = row.safeText(2),
-                    en = row.safeText(3),
-                    zhHans = row.safeText(4),
-                    ja = row.safeText(5),
-                    es = row.safeText(6),
-                    zhHant = row.safeText(7),
-                    // DeepL variants
-                    zhHantFromEn = row.safeText(8),
-                    zhHantFromKo = row.safeText(9),
-                    zhHansFromEn = row.safeText(10),
-                    zhHansFromKo = row.safeText(11),
-                    // Business team corrections
-                    zhHantTaiwan = row.safeText(12),
-                    zhHansChina = row.safeText(13),
-                    enNorthAmerica = row.safeText(14),
-                    jaJapan = row.safeText(15),
-                    // Additional languages
-                    de = row.safeText(16),
-                    fr = row.safeText(17)
-                )
-            )
+            glossaries.add(toGlossary { row.safeText(it) })
         }
+        return glossaries
+    }
 
-        glossaryRepository.saveAll(glossaries)
-        logger.info("Initialized ${glossaries.size} glossary items.")
+    internal fun initFromSnapshot(snapshot: GlossarySnapshot) {
+        val glossaries = snapshot.glossaries.map { fields -> toGlossary { fields.getOrElse(it) { "" } } }
+        val saved = glossaryRepository.saveAll(glossaries)
+        logger.info("Initialized ${saved.size} glossary items from snapshot.")
+
+        // saveAll keeps input order, so saved[i] is snapshot row ordinal i
+        tokenIndexService.loadSnapshotIndex(snapshot, saved.map { it.id!! })
+    }
+
+    private fun toGlossary(field: (Int) -> String): Glossary {
+        return Glossary(
+            pageUrl = field(0),
+            keyName = field(1),
+            ko = field(2),
+            en = field(3),
+            zhHans = field(4),
+            ja = field(5),
+            es = field(6),
+            zhHant = field(7),
+            // DeepL variants
+            zhHantFromEn = field(8),
+            zhHantFromKo = field(9),
+            zhHansFromEn = field(10),
+            zhHansFromKo = field(11),
+            // Business team corrections
+            zhHantTaiwan = field(12),
+            zhHansChina = field(13),
+            enNorthAmerica = field(14),
+            jaJapan = field(15),
+            // Additional languages
+            de = field(16),
+            fr = field(17)
+        )
     }
 
     @Async
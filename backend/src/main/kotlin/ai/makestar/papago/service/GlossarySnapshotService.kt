@@ -0,0 +1,106 @@
+package ai.makestar.papago.service
+
+import com.fasterxml.jackson.databind.ObjectMapper
+import com.fasterxml.jackson.module.kotlin.readValue
+import org.slf4j.LoggerFactory
+import org.springframework.beans.factory.annotation.Value
+import org.springframework.core.io.ClassPathResource
+import org.springframework.stereotype.Service
+import java.io.File
+import java.io.IOException
+import java.io.InputStream
+import java.security.MessageDigest
+import java.util.zip.GZIPInputStream
+
+/**
+ * Precompiled glossary rows and token tables built offline by
+ * backend/scripts/build_glossary_snapshot.py.
+ * Token lists hold row ordinals (indexes into [glossaries]), not database ids.
+ */
+data class GlossarySnapshot(
+    val format: String = "",
+    val version: Int = 0,
+    val tokenizerVersion: Int = 0,
+    val sourceSha256: String = "",
+    val glossaries: List<List<String>> = emptyList(),
+    val koTokens: Map<String, List<Int>> = emptyMap(),
+    val multiLangTokens: Map<String, Map<String, List<Int>>> = emptyMap()
+)
+
+@Service
+class GlossarySnapshotService(
+    private val objectMapper: ObjectMapper,
+    @Value("\${glossary.snapshot.path:}") private val localSnapshotPath: String
+) {
+    private val logger = LoggerFactory.getLogger(GlossarySnapshotService::class.java)
+
+    companion object {
+        const val SNAPSHOT_RESOURCE = "data/glossary_snapshot.json.gz"
+        const val SNAPSHOT_FORMAT = "papago-glossary-snapshot"
+        const val SNAPSHOT_VERSION = 1
+    }
+
+    /**
+     * Load the snapshot if one exists and was built from exactly [sheetJson]
+     * with the current tokenizer. Returns null otherwise, so the caller falls
+     * back to parsing the sheet and building the token indexes itself.
+     */
+    fun load(sheetJson: String): GlossarySnapshot? {
+        val input = try {
+            openSnapshot()
+        } catch (e: IOException) {
+            logger.warn("Could not open glossary snapshot: ${e.message}")
+            null
+        } ?: return null
+        return load(sheetJson, input)
+    }
+
+    /**
+     * [load] for an already opened gzipped snapshot stream, which is closed afterwards.
+     */
+    internal fun load(sheetJson: String, input: InputStream): GlossarySnapshot? {
+        val snapshot = readSnapshot(input) ?: return null
+
+        val reason = when {
+            snapshot.format != SNAPSHOT_FORMAT || snapshot.version != SNAPSHOT_VERSION ->
+                "unsupported format ${snapshot.format} v${snapshot.version}"
+            snapshot.tokenizerVersion != TokenizationService.TOKENIZER_VERSION ->
+                "tokenizer version ${snapshot.tokenizerVersion}, expected ${TokenizationService.TOKENIZER_VERSION}"
+            snapshot.sourceSha256 != sha256(sheetJson) ->
+                "built from a different sheet_db.json"
+            else -> null
+        }
+        if (reason != null) {
+            logger.warn("Ignoring glossary snapshot ($reason); rebuild it with build_glossary_snapshot.py.")
+            return null
+        }
+        return snapshot
+    }
+
+    private fun readSnapshot(input: InputStream): GlossarySnapshot? {
+        return try {
+            input.use { GZIPInputStream(it).use { gz -> objectMapper.readValue<GlossarySnapshot>(gz) } }
+        } catch (e: Exception) {
+            logger.warn("Could not read glossary snapshot: ${e.message}")
+            null
+        }
+    }
+
+    private fun openSnapshot(): InputStream? {
+        // 1. Classpath resource (works in Docker/JAR)
+        val resource = ClassPathResource(SNAPSHOT_RESOURCE)
+        if (resource.exists()) return resource.inputStream
+
+        // 2. Local file path (development only)
+        if (localSnapshotPath.isNotBlank()) {
+            val localFile = File(localSnapshotPath)
+            if (localFile.exists()) return localFile.inputStream()
+        }
+        return null
+    }
+
+    private fun sha256(text: String): String {
+        val digest = MessageDigest.getInstance("SHA-256").digest(text.toByteArray(Charsets.UTF_8))
+        return digest.joinToString("") { "%02x".format(it) }
+    }
+}
@@ -6,18 +6,57 @@ import ai.makestar.papago.domain.GlossaryMultiLangTokenRepository
 import ai.makestar.papago.domain.GlossaryToken
 import ai.makestar.papago.domain.GlossaryTokenRepository
 import org.slf4j.LoggerFactory
+import org.springframework.jdbc.core.JdbcTemplate
 import org.springframework.stereotype.Service
 
 @Service
 class TokenIndexService(
     private val glossaryTokenRepository: GlossaryTokenRepository,
     private val multiLangTokenRepository: GlossaryMultiLangTokenRepository,
-    private val tokenizationService: TokenizationService
+    private val tokenizationService: TokenizationService,
+    private val jdbcTemplate: JdbcTemplate
 ) {
     private val logger = LoggerFactory.getLogger(TokenIndexService::class.java)
 
     companion object {
         private val MULTI_LANG_COLUMNS = listOf("en", "ja", "zh-hans", "zh-hant", "es", "de", "fr")
+        private const val INSERT_BATCH_SIZE = 5000
+    }
+
+    /**
+     * Bulk-load both token tables from a precompiled snapshot instead of tokenizing.
+     * [glossaryIds] maps each snapshot row ordinal to the id of the saved Glossary.
+     * Uses plain JDBC batch inserts; per-entity JPA saves are far too slow at this volume.
+     */
+    fun loadSnapshotIndex(snapshot: GlossarySnapshot, glossaryIds: List<Long>) {
+        val koRows = snapshot.koTokens.flatMap { (token, ordinals) -> ordinals.map { token to glossaryIds[it] } }
+        jdbcTemplate.batchUpdate(
+            "INSERT INTO glossary_token (token, glossary_id, token_length) VALUES (?, ?, ?)",
+            koRows,
+            INSERT_BATCH_SIZE
+        ) { ps, (token, glossaryId) ->
+            ps.setString(1, token)
+            ps.setLong(2, glossaryId)
+            ps.setInt(3, token.length)
+        }
+
+        var multiCount = 0
+        for ((lang, table) in snapshot.multiLangTokens) {
+            val langRows = table.flatMap { (token, ordinals) -> ordinals.map { token to glossaryIds[it] } }
+            jdbcTemplate.batchUpdate(
+                "INSERT INTO glossary_multi_lang_token (token, lang, glossary_id, token_length) VALUES (?, ?, ?, ?)",
+                langRows,
+                INSERT_BATCH_SIZE
+            ) { ps, (token, glossaryId) ->
+                ps.setString(1, token)
+                ps.setString(2, lang)
+                ps.setLong(3, glossaryId)
+                ps.setInt(4, token.length)
+            }
+            multiCount += langRows.size
+        }
+
+        logger.info("Loaded token indexes from snapshot: ${koRows.size} tokens, $multiCount multi-lang tokens.")
     }
 
     fun buildTokenIndex(glossaries: List<Glossary>) {
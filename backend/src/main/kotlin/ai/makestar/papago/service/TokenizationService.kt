@@ -137,6 +137,12 @@ class TokenizationService(
     }
 
     companion object {
+        /**
+         * Bump whenever tokenization output changes, together with TOKENIZER_VERSION in
+         * backend/scripts/glossary_index.py, so stale precompiled snapshots are rejected.
+         */
+        const val TOKENIZER_VERSION = 1
+
         private val SPLIT_PATTERN = Regex("[\\s,.!?;:()\\[\\]{}\"'~·…/\\\\|@#\$%^&*+=<>]+")
     }
 }
@@ -27,7 +27,8 @@ class TranslationService(
     private val consistencyService: ConsistencyService,
     private val glossaryExtractionService: GlossaryExtractionService,
     private val cacheManager: CacheManager,
-    @Value("\${api.claude.key}") private val claudeApiKey: String
+    @Value("\${api.claude.key}") private val claudeApiKey: String,
+    @Value("\${api.claude.base-url}") private val claudeBaseUrl: String
 ) {
     private val webClient = WebClient.builder().build()
     private val logger = LoggerFactory.getLogger(TranslationService::class.java)
@@ -355,7 +356,7 @@ class TranslationService(
         val systemPrompt = "You are a professional $sourceLangName-to-$targetLangName translator. Return ONLY the translated text."
         return try {
             val response = webClient.post()
-                .uri("https://api.anthropic.com/v1/messages")
+                .uri("$claudeBaseUrl/v1/messages")
                 .header("x-api-key", claudeApiKey)
                 .header("anthropic-version", "2023-06-01")
                 .header("Content-Type", "application/json")
@@ -459,7 +460,7 @@ Rules:
 
         return try {
             val response = webClient.post()
-                .uri("https://api.anthropic.com/v1/messages")
+                .uri("$claudeBaseUrl/v1/messages")
                 .header("x-api-key", claudeApiKey)
                 .header("anthropic-version", "2023-06-01")
                 .header("Content-Type", "application/json")
@@ -827,7 +828,7 @@ Rules:
 
         return try {
             val response = webClient.post()
-                .uri("https://api.anthropic.com/v1/messages")
+                .uri("$claudeBaseUrl/v1/messages")
                 .header("x-api-key", claudeApiKey)
                 .header("anthropic-version", "2023-06-01")
                 .header("Content-Type", "application/json")
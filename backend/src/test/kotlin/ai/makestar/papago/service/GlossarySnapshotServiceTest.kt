@@ -0,0 +1,216 @@
+package ai.makestar.papago.service
+
+import ai.makestar.papago.domain.Glossary
+import ai.makestar.papago.domain.GlossaryMultiLangToken
+import ai.makestar.papago.domain.GlossaryMultiLangTokenRepository
+import ai.makestar.papago.domain.GlossaryRepository
+import ai.makestar.papago.domain.GlossaryToken
+import ai.makestar.papago.domain.GlossaryTokenRepository
+import com.fasterxml.jackson.databind.ObjectMapper
+import com.fasterxml.jackson.module.kotlin.KotlinModule
+import io.kotest.core.spec.style.DescribeSpec
+import io.kotest.matchers.collections.shouldContainExactly
+import io.kotest.matchers.collections.shouldContainExactlyInAnyOrder
+import io.kotest.matchers.nulls.shouldNotBeNull
+import io.kotest.matchers.shouldBe
+import io.mockk.Runs
+import io.mockk.every
+import io.mockk.just
+import io.mockk.mockk
+import io.mockk.slot
+import org.springframework.core.io.ClassPathResource
+import org.springframework.jdbc.core.JdbcTemplate
+import org.springframework.jdbc.core.ParameterizedPreparedStatementSetter
+import java.io.ByteArrayInputStream
+import java.io.ByteArrayOutputStream
+import java.io.InputStream
+import java.sql.PreparedStatement
+import java.util.zip.GZIPOutputStream
+
+// Regenerate the snapshot after changing the sheet or the tokenizer (from backend/scripts):
+// python build_glossary_snapshot.py --input ../src/test/resources/data/glossary_snapshot_fixture_sheet.json \
+//     --output ../src/test/resources/data/glossary_snapshot_fixture.json.gz
+private const val FIXTURE_SHEET = "data/glossary_snapshot_fixture_sheet.json"
+private const val FIXTURE_SNAPSHOT = "data/glossary_snapshot_fixture.json.gz"
+
+class GlossarySnapshotServiceTest : DescribeSpec({
+    val objectMapper = ObjectMapper().registerModule(KotlinModule.Builder().build())
+    val snapshotService = GlossarySnapshotService(objectMapper, "")
+    val sheetJson = ClassPathResource(FIXTURE_SHEET).inputStream.bufferedReader().readText()
+
+    fun fixtureSnapshot(): GlossarySnapshot =
+        snapshotService.load(sheetJson, ClassPathResource(FIXTURE_SNAPSHOT).inputStream).shouldNotBeNull()
+
+    fun gzipped(snapshot: GlossarySnapshot): InputStream {
+        val bytes = ByteArrayOutputStream()
+        GZIPOutputStream(bytes).use { objectMapper.writeValue(it, snapshot) }
+        return ByteArrayInputStream(bytes.toByteArray())
+    }
+
+    // Saved ids deliberately out of order, so only positional mapping gives the right ids
+    fun savedIds(count: Int): List<Long> = (0 until count).map { 1000L - 7L * it }
+
+    fun savingRepository(): GlossaryRepository {
+        val repository = mockk<GlossaryRepository>()
+        every { repository.saveAll(any<Iterable<Glossary>>()) } answers {
+            val glossaries = firstArg<Iterable<Glossary>>().toList()
+            glossaries.zip(savedIds(glossaries.size)) { glossary, id -> glossary.withId(id) }
+        }
+        return repository
+    }
+
+    fun initializer(glossaryRepository: GlossaryRepository, tokenIndexService: TokenIndexService) =
+        GlossaryInitializer(
+            glossaryRepository,
+            mockk<GlossaryTokenRepository>(),
+            mockk<GlossaryMultiLangTokenRepository>(),
+            tokenIndexService,
+            snapshotService,
+            objectMapper,
+            ""
+        )
+
+    describe("load") {
+        it("should accept the snapshot built from the sheet") {
+            val snapshot = fixtureSnapshot()
+            snapshot.glossaries.size shouldBe 9
+            snapshot.koTokens.isEmpty() shouldBe false
+        }
+
+        it("should return null for a different format") {
+            val snapshot = fixtureSnapshot()
+            snapshotService.load(sheetJson, gzipped(snapshot.copy(format = "other"))) shouldBe null
+            val nextVersion = snapshot.copy(version = GlossarySnapshotService.SNAPSHOT_VERSION + 1)
+            snapshotService.load(sheetJson, gzipped(nextVersion)) shouldBe null
+        }
+
+        it("should return null for a different tokenizer version") {
+            val snapshot = fixtureSnapshot().copy(tokenizerVersion = TokenizationService.TOKENIZER_VERSION + 1)
+            snapshotService.load(sheetJson, gzipped(snapshot)) shouldBe null
+        }
+
+        it("should return null for a different sheet") {
+            snapshotService.load(sheetJson.replace("장바구니", "카트"), gzipped(fixtureSnapshot())) shouldBe null
+        }
+
+        it("should return null for a file that is not a snapshot") {
+            snapshotService.load(sheetJson, ByteArrayInputStream(sheetJson.toByteArray())) shouldBe null
+        }
+    }
+
+    describe("initFromSnapshot") {
+        it("should map row ordinals to the saved ids in order") {
+            val snapshot = fixtureSnapshot()
+            val tokenIndexService = mockk<TokenIndexService>()
+            val ids = slot<List<Long>>()
+            every { tokenIndexService.loadSnapshotIndex(snapshot, capture(ids)) } just Runs
+
+            initializer(savingRepository(), tokenIndexService).initFromSnapshot(snapshot)
+
+            ids.captured shouldContainExactly savedIds(snapshot.glossaries.size)
+        }
+    }
+
+    describe("snapshot path") {
+        it("should build the same glossaries and token tables as tokenizing the sheet") {
+            val tokenizationService = TokenizationService(KoreanMorphologyService())
+            val tokenRepository = mockk<GlossaryTokenRepository>()
+            val multiLangRepository = mockk<GlossaryMultiLangTokenRepository>()
+            val jdbcTemplate = mockk<JdbcTemplate>()
+            val tokenIndexService = TokenIndexService(tokenRepository, multiLangRepository, tokenizationService, jdbcTemplate)
+
+            // Existing path: parse the sheet, save it, tokenize every saved row
+            val koTokens = mutableListOf<GlossaryToken>()
+            val multiLangTokens = mutableListOf<GlossaryMultiLangToken>()
+            every { tokenRepository.saveAll(any<Iterable<GlossaryToken>>()) } answers {
+                firstArg<Iterable<GlossaryToken>>().toList().also { koTokens += it }
+            }
+            every { multiLangRepository.saveAll(any<Iterable<GlossaryMultiLangToken>>()) } answers {
+                firstArg<Iterable<GlossaryMultiLangToken>>().toList().also { multiLangTokens += it }
+            }
+            val parsingRepository = savingRepository()
+            val parsed = initializer(parsingRepository, tokenIndexService).parseGlossaries(sheetJson).shouldNotBeNull()
+            val saved = parsingRepository.saveAll(parsed)
+            tokenIndexService.buildTokenIndex(saved)
+            tokenIndexService.buildMultiLangIndex(saved)
+
+            // Snapshot path: the rows the JDBC batches would insert
+            val inserted = recordBatchInserts(jdbcTemplate)
+            val snapshotGlossaries = mutableListOf<Glossary>()
+            val snapshotRepository = mockk<GlossaryRepository>()
+            every { snapshotRepository.saveAll(any<Iterable<Glossary>>()) } answers {
+                val glossaries = firstArg<Iterable<Glossary>>().toList()
+                glossaries.zip(savedIds(glossaries.size)) { glossary, id -> glossary.withId(id) }
+                    .also { snapshotGlossaries += it }
+            }
+            initializer(snapshotRepository, tokenIndexService).initFromSnapshot(fixtureSnapshot())
+
+            snapshotGlossaries.map { it.id to it.fields() } shouldContainExactly saved.map { it.id to it.fields() }
+            inserted.getValue("glossary_token") shouldContainExactlyInAnyOrder
+                koTokens.map { listOf(it.token, it.glossaryId, it.tokenLength) }
+            inserted.getValue("glossary_multi_lang_token") shouldContainExactlyInAnyOrder
+                multiLangTokens.map { listOf(it.token, it.lang, it.glossaryId, it.tokenLength) }
+        }
+    }
+})
+
+/**
+ * Stub [JdbcTemplate.batchUpdate] and collect, per table, the parameters its
+ * statement setter binds for every row.
+ */
+private fun recordBatchInserts(jdbcTemplate: JdbcTemplate): Map<String, List<List<Any>>> {
+    val inserted = mutableMapOf<String, MutableList<List<Any>>>()
+    val params = sortedMapOf<Int, Any>()
+    val statement = mockk<PreparedStatement>()
+    every { statement.setString(any(), any()) } answers { params[firstArg<Int>()] = secondArg<String>() }
+    every { statement.setLong(any(), any()) } answers { params[firstArg<Int>()] = secondArg<Long>() }
+    every { statement.setInt(any(), any()) } answers { params[firstArg<Int>()] = secondArg<Int>() }
+
+    every {
+        jdbcTemplate.batchUpdate(
+            any<String>(),
+            any<Collection<Any>>(),
+            any<Int>(),
+            any<ParameterizedPreparedStatementSetter<Any>>()
+        )
+    } answers {
+        val table = firstArg<String>().substringAfter("INSERT INTO ").substringBefore(" ")
+        val rows = inserted.getOrPut(table) { mutableListOf() }
+        val setter = arg<ParameterizedPreparedStatementSetter<Any>>(3)
+        for (row in secondArg<Collection<Any>>()) {
+            params.clear()
+            setter.setValues(statement, row)
+            rows += params.values.toList()
+        }
+        emptyArray<IntArray>()
+    }
+    return inserted
+}
+
+private fun Glossary.withId(id: Long) = Glossary(
+    id = id,
+    pageUrl = pageUrl,
+    keyName = keyName,
+    ko = ko,
+    en = en,
+    zhHans = zhHans,
+    ja = ja,
+    es = es,
+    zhHant = zhHant,
+    zhHantFromEn = zhHantFromEn,
+    zhHantFromKo = zhHantFromKo,
+    zhHansFromEn = zhHansFromEn,
+    zhHansFromKo = zhHansFromKo,
+    zhHantTaiwan = zhHantTaiwan,
+    zhHansChina = zhHansChina,
+    enNorthAmerica = enNorthAmerica,
+    jaJapan = jaJapan,
+    de = de,
+    fr = fr
+)
+
+private fun Glossary.fields() = listOf(
+    pageUrl, keyName, ko, en, zhHans, ja, es, zhHant,
+    zhHantFromEn, zhHantFromKo, zhHansFromEn, zhHansFromKo,
+    zhHantTaiwan, zhHansChina, enNorthAmerica, jaJapan, de, fr
+)